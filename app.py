@@ -1,5 +1,8 @@
 import streamlit as st
 
+from ui.dev_panel import dev_panel
+from ui.layout import global_css
+
 # Main page configuration
 st.set_page_config(
     page_title = "Nutrition Paradox Dashboard",
@@ -10,17 +13,7 @@ st.set_page_config(
 
 
 # Apply global CSS for WHO-style font
-st.markdown("""
-    <style>
-    body {
-        font-family: Frutiger Bold Condensed, 'Segoe UI',  Tahoma, Geneva, Verdana, sans-serif;
-        color: #0072BB ;
-    }
-    h1, h2, h3 {
-        color: #009EDB  !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+global_css()
 
 # ----------------------------
 # Navigation Setup
@@ -32,4 +25,7 @@ queries_page = st.Page("pages/queries.py", title="📊 Query Dashboard")
 # Create navigation
 pg = st.navigation([home_page, queries_page])
 # Run the selected page
-pg.run()
\ No newline at end of file
+pg.run()
+
+# Latest query/render timings in the sidebar (DEV_PANEL=1)
+dev_panel()
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""Run all catalog queries on two backends, check the results match and compare latency.
+
+By default the reference is MySQL (from .env) and the candidate is the
+DuckDB file; --build first copies the MySQL tables into it so both hold
+the same data:
+
+    python benchmarks/backend_parity.py --build --repeat 5
+
+Without a MySQL server, --stand-in SCALE compares DuckDB against the SQLite
+stand-in of query_benchmark.py, both loaded with the same synthetic data:
+
+    python benchmarks/backend_parity.py --stand-in 10
+
+Timings are uncached: each run goes straight to the backend and includes
+the Arrow -> DataFrame conversion. Exits non-zero if any result differs.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from database import backends, gho, synthetic  # noqa: E402
+from database.catalog import QUERIES, bind  # noqa: E402
+from database.db import fetch_arrow  # noqa: E402
+
+
+class SQLiteStandIn:
+    name = 'sqlite'
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(backends.to_qmark(query, params), params or ())
+            return fetch_arrow(cursor)
+        finally:
+            cursor.close()
+
+
+def compare_frames(expected, got):
+    """'same', 'order' (same rows, ties ordered differently) or a short description of the difference."""
+    expected = expected.reset_index(drop=True)
+    got = got.reset_index(drop=True)
+    if list(expected.columns) != list(got.columns):
+        return f'columns {list(expected.columns)} != {list(got.columns)}'
+    if len(expected) != len(got):
+        return f'{len(expected)} rows != {len(got)} rows'
+    try:
+        pd.testing.assert_frame_equal(expected, got, check_dtype=False, rtol=1e-9)
+        return 'same'
+    except AssertionError:
+        pass
+    columns = list(expected.columns)
+    try:
+        pd.testing.assert_frame_equal(expected.sort_values(columns).reset_index(drop=True),
+                                      got.sort_values(columns).reset_index(drop=True),
+                                      check_dtype=False, rtol=1e-9)
+        return 'order'
+    except AssertionError as e:
+        return str(e).strip().splitlines()[0]
+
+
+def timed(backend, query, repeat):
+    sql, params = bind(query.id)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = backend.execute(sql, params).to_pandas()
+        timings.append(time.perf_counter() - start)
+    return df, statistics.median(timings) * 1000
+
+
+def run(reference, candidate, repeat):
+    results = {}
+    for query in QUERIES.values():
+        expected, reference_ms = timed(reference, query, repeat)
+        got, candidate_ms = timed(candidate, query, repeat)
+        results[query.id] = {
+            'rows': len(expected),
+            'parity': compare_frames(expected, got),
+            f'{reference.name}_ms': reference_ms,
+            f'{candidate.name}_ms': candidate_ms,
+        }
+    return results
+
+
+def stand_in(scale, seed, workdir):
+    from benchmarks.query_benchmark import build_database
+
+    files = os.path.join(workdir, 'tables')
+    os.makedirs(files)
+    for table in gho.TABLE_COLUMNS:
+        synthetic.write_parquet(os.path.join(files, f'{table}.parquet'),
+                                synthetic.iter_frames(table, seed, units=scale), table)
+    reference = SQLiteStandIn(build_database(os.path.join(workdir, 'stand_in.sqlite'), scale, seed))
+    path = os.path.join(workdir, 'nutrition.duckdb')
+    backends.build(files, path)
+    return reference, backends.DuckDBBackend(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duckdb', default=backends.DUCKDB_PATH, help='DuckDB file to compare against MySQL')
+    parser.add_argument('--build', action='store_true', help='rebuild the DuckDB file from MySQL first')
+    parser.add_argument('--stand-in', type=int, metavar='SCALE',
+                        help='compare against a SQLite stand-in with synthetic data at this scale instead of MySQL')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per query and backend (median is reported)')
+    parser.add_argument('--out', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.stand_in:
+            reference, candidate = stand_in(args.stand_in, args.seed, workdir)
+        else:
+            from database.db import get_pool
+
+            if args.build:
+                backends.build('mysql', args.duckdb)
+            reference, candidate = backends.MySQLBackend(get_pool()), backends.DuckDBBackend(args.duckdb)
+        results = run(reference, candidate, args.repeat)
+
+    ref_key, cand_key = f'{reference.name}_ms', f'{candidate.name}_ms'
+    print(f"{'query':<16} {'rows':>7} {reference.name + ' ms':>10} {candidate.name + ' ms':>10} {'speedup':>8}  parity")
+    for query_id, r in results.items():
+        speedup = r[ref_key] / r[cand_key] if r[cand_key] else float('inf')
+        print(f"{query_id:<16} {r['rows']:>7} {r[ref_key]:>10.2f} {r[cand_key]:>10.2f} {speedup:>7.1f}x  {r['parity']}")
+    total_ref = sum(r[ref_key] for r in results.values())
+    total_cand = sum(r[cand_key] for r in results.values())
+    print(f"{'all queries':<16} {'':>7} {total_ref:>10.2f} {total_cand:>10.2f} {total_ref / total_cand:>7.1f}x")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'reference': reference.name, 'candidate': candidate.name, 'queries': results}, f, indent=2)
+    mismatches = [query_id for query_id, r in results.items() if r['parity'] not in ('same', 'order')]
+    if mismatches:
+        print(f"Results differ for: {', '.join(mismatches)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark chart render time as the number of labelled points grows.
+
+Renders a labelled line, a labelled horizontal bar chart and a labelled
+scatter at increasing sizes. Each is rendered twice: once with the old
+per-row ``ax.text`` loop, once through charts/render.py, which labels with
+bar_label and drops labels that would overlap.
+
+    python benchmarks/chart_label_benchmark.py --points 10 100 1000 5000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from charts.render import CHART_DPI, draw  # noqa: E402
+
+
+def frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Year': np.arange(n),
+        'Country': [f'Unit {i}' for i in range(n)],
+        'Avg_Obesity': rng.uniform(0, 40, n).round(1),
+        'Avg_Malnutrition': rng.uniform(0, 30, n).round(1),
+    })
+
+
+# Old style: one ax.text per row, every category tick labelled.
+def legacy_line(df):
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.plot(df['Year'], df['Avg_Obesity'], marker='o', color='steelblue')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('%')
+    ax.set_title('line')
+    ax.grid(alpha=0.3)
+    for _, row in df.iterrows():
+        ax.text(row['Year'], row['Avg_Obesity'] + 0.1, f"{row['Avg_Obesity']:.1f}%", ha='center', va='bottom', fontsize=8)
+    return fig
+
+
+def legacy_barh(df):
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    bars = ax.barh(df['Country'], df['Avg_Obesity'], color='steelblue')
+    ax.set_xlabel('%')
+    ax.set_title('barh')
+    ax.grid(axis='x', alpha=0.3)
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width + 0.1, bar.get_y() + bar.get_height() / 2, f'{width:.1f}%', va='center', ha='left', fontsize=9)
+    return fig
+
+
+def legacy_scatter(df):
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    points = ax.scatter(df['Avg_Obesity'], df['Avg_Malnutrition'], c=df['Avg_Obesity'] - df['Avg_Malnutrition'],
+                        cmap='viridis', s=100, edgecolor='k')
+    ax.set_xlabel('%')
+    ax.set_ylabel('%')
+    ax.set_title('scatter')
+    ax.grid(alpha=0.3)
+    for _, row in df.iterrows():
+        ax.text(row['Avg_Obesity'], row['Avg_Malnutrition'], row['Country'], ha='center', va='bottom', fontsize=8)
+    fig.colorbar(points, ax=ax, label='gap')
+    return fig
+
+
+CASES = {
+    'line': (legacy_line, lambda df: draw(df, 'line', x='Year', series=(('Avg_Obesity', None, 'steelblue'),),
+                                          xlabel='Year', ylabel='%', title='line', point_labels=True)),
+    'barh': (legacy_barh, lambda df: draw(df, 'barh', figsize=(8, 6), y='Country', x='Avg_Obesity',
+                                          xlabel='%', title='barh')),
+    'scatter': (legacy_scatter, lambda df: draw(df.assign(Gap=df['Avg_Obesity'] - df['Avg_Malnutrition']), 'scatter',
+                                                figsize=(8, 6), x='Avg_Obesity', y='Avg_Malnutrition', c='Gap',
+                                                text='Country', xlabel='%', ylabel='%', title='scatter',
+                                                colorbar_label='gap')),
+}
+
+
+def timed(build, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fig = build(df)
+        fig.savefig(io.BytesIO(), format='png', dpi=CHART_DPI, bbox_inches='tight')
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=3, help='renders per case (fastest is reported)')
+    args = parser.parse_args()
+
+    print(f"{'chart':<8} {'points':>7} {'per-row ms':>11} {'batched ms':>11} {'speedup':>8}")
+    for name, (legacy, batched) in CASES.items():
+        for n in args.points:
+            df = frame(n)
+            old = timed(legacy, df, args.repeat)
+            new = timed(batched, df, args.repeat)
+            print(f"{name:<8} {n:>7} {old * 1000:>11.1f} {new * 1000:>11.1f} {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
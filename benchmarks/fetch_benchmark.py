@@ -0,0 +1,106 @@
+"""Compare the dict-row fetch path with the streamed Arrow path.
+
+Each case runs in a fresh subprocess against a stand-in cursor that produces
+WHO-shaped rows on demand, so the timings and peak RSS cover only the
+client-side fetch and DataFrame build, not MySQL itself.
+
+    python benchmarks/fetch_benchmark.py
+    python benchmarks/fetch_benchmark.py --sizes 10000,1000000 --batch-size 50000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ['Country', 'Region', 'Year', 'Gender', 'age_group', 'Mean_Estimate', 'CI_Width', 'obesity_level']
+REGIONS = ['Africa', 'Americas', 'Europe', 'Eastern Mediterranean', 'South-East Asia', 'Western Pacific']
+GENDERS = ['Both', 'Male', 'Female']
+AGE_GROUPS = ['Adult', 'Child/Adolescent']
+LEVELS = ['Low', 'Moderate', 'High']
+
+
+# ------------------------------
+# Stand-in Cursor
+# ------------------------------
+class FakeCursor:
+    """Serves ``rows`` generated rows like a mysql.connector cursor would."""
+
+    def __init__(self, rows, dictionary=False):
+        self.rows = rows
+        self.dictionary = dictionary
+        self.description = [(name,) for name in COLUMNS]
+        self._next = 0
+
+    def _row(self, i):
+        row = (
+            f'Country {i % 5000}',
+            REGIONS[i % len(REGIONS)],
+            2012 + i % 11,
+            GENDERS[i % 3],
+            AGE_GROUPS[i % 2],
+            (i * 7919 % 4000) / 100.0,
+            (i * 104729 % 1500) / 100.0,
+            LEVELS[i % 3],
+        )
+        return dict(zip(COLUMNS, row)) if self.dictionary else row
+
+    def fetchmany(self, size):
+        end = min(self._next + size, self.rows)
+        batch = [self._row(i) for i in range(self._next, end)]
+        self._next = end
+        return batch
+
+    def fetchall(self):
+        return self.fetchmany(self.rows - self._next)
+
+
+# ------------------------------
+# Single Case (runs in a subprocess)
+# ------------------------------
+def run_case(mode, rows, batch_size):
+    from database.db import fetch_arrow, fetch_dicts
+
+    start = time.perf_counter()
+    if mode == 'dict':
+        df = fetch_dicts(FakeCursor(rows, dictionary=True))
+    else:
+        df = fetch_arrow(FakeCursor(rows), batch_size).to_pandas()
+    elapsed = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    assert len(df) == rows
+    return {'mode': mode, 'rows': rows, 'seconds': elapsed, 'peak_rss_mb': peak_rss_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,1000000,10000000')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--case', nargs=2, metavar=('MODE', 'ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        mode, rows = args.case
+        print(json.dumps(run_case(mode, int(rows), args.batch_size)))
+        return
+
+    print(f"{'rows':>10} {'mode':>6} {'seconds':>9} {'peak RSS MB':>12}")
+    for rows in [int(size) for size in args.sizes.split(',')]:
+        for mode in ('dict', 'arrow'):
+            proc = subprocess.run(
+                [sys.executable, __file__, '--batch-size', str(args.batch_size), '--case', mode, str(rows)],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{rows:>10} {mode:>6} failed: {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(proc.stdout)
+            print(f"{rows:>10} {mode:>6} {result['seconds']:>9.3f} {result['peak_rss_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Memory of query results as plain and as compact DataFrames, at scaled data sizes.
+
+Every catalog query, each keyset query read in full, and the two fact-table
+reads of the columnar engine are run on the SQLite stand-in of
+query_benchmark.py. Each Arrow result is turned into a DataFrame twice:
+with Arrow's plain ``to_pandas()`` and with database.frames.to_frame, which
+uses categoricals and narrow integers. The deep memory of both frames is
+reported, along with how long each took to build:
+
+    python benchmarks/frame_memory_benchmark.py --scales 1 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import columnar  # noqa: E402
+from database.backends import to_qmark  # noqa: E402
+from database.catalog import QUERIES, bind, page  # noqa: E402
+from database.db import CACHE_MAX_BYTES, fetch_arrow  # noqa: E402
+from database.frames import frame_memory, to_frame  # noqa: E402
+from query_benchmark import open_database  # noqa: E402
+
+
+def results():
+    """(label, sql, params) for every result measured."""
+    for query_id in QUERIES:
+        yield (query_id,) + bind(query_id)
+    for query_id, query in QUERIES.items():
+        if query.keyset:
+            sql, params = page(query_id, size=1)
+            yield (f'{query_id} (all rows)', sql.rsplit('\nLIMIT', 1)[0], params)
+    for table, sql in columnar.TABLE_QUERIES.items():
+        yield (f'{table} (fact rows)', sql, None)
+
+
+def build(convert, table, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = convert(table)
+        seconds.append(time.perf_counter() - start)
+    return df, statistics.median(seconds) * 1000
+
+
+def run(scales, repeat, seed, workdir):
+    rows = []
+    for scale in scales:
+        conn, built = open_database(workdir, scale, seed)
+        if built:
+            print(f"built scale {scale} in {built:.1f}s")
+        for label, sql, params in results():
+            cursor = conn.execute(to_qmark(sql, params), params or ())
+            table = fetch_arrow(cursor)
+            plain, plain_ms = build(lambda t: t.to_pandas(), table, repeat)
+            compact, compact_ms = build(to_frame, table, repeat)
+            rows.append({'scale': scale, 'result': label, 'rows': len(plain),
+                         'plain_bytes': frame_memory(plain)['bytes'], 'compact_bytes': frame_memory(compact)['bytes'],
+                         'plain_ms': plain_ms, 'compact_ms': compact_ms})
+        conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--repeat', type=int, default=3, help='builds per result (median time is reported)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='keep built databases here and reuse them (default: a temporary directory)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rows = run(args.scales, args.repeat, args.seed, args.workdir or tmp)
+
+    print(f"{'scale':>6} {'result':<30} {'rows':>9} {'plain KB':>10} {'compact KB':>10} {'saved':>6} "
+          f"{'plain ms':>9} {'compact ms':>10}")
+    for r in rows:
+        saved = 1 - r['compact_bytes'] / r['plain_bytes'] if r['plain_bytes'] else 0.0
+        print(f"{r['scale']:>6} {r['result']:<30} {r['rows']:>9} {r['plain_bytes'] / 1024:>10.1f} "
+              f"{r['compact_bytes'] / 1024:>10.1f} {saved:>6.0%} {r['plain_ms']:>9.2f} {r['compact_ms']:>10.2f}")
+    for scale in args.scales:
+        catalog = [r for r in rows if r['scale'] == scale and r['result'] in QUERIES]
+        plain = sum(r['plain_bytes'] for r in catalog)
+        compact = sum(r['compact_bytes'] for r in catalog)
+        print(f"scale {scale}: all {len(catalog)} dashboard results take {plain / 1024:.1f} KB plain, "
+              f"{compact / 1024:.1f} KB compact; a {CACHE_MAX_BYTES / 1024 ** 2:.0f} MB cache holds "
+              f"{CACHE_MAX_BYTES // max(plain, 1):,} vs {CACHE_MAX_BYTES // max(compact, 1):,} such sets")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark the GHO ingest pipeline on synthetic indicator files.
+
+Writes a GHO-shaped JSON file per indicator into a temporary directory and
+times streaming parse + vectorized cleaning. With --load the same files are
+bulk-loaded into the database configured in .env (use a throwaway schema).
+
+    python benchmarks/ingest_benchmark.py --rows 1000000
+    python benchmarks/ingest_benchmark.py --rows 2000000 --load --method infile
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import gho  # noqa: E402
+
+SPATIAL = [('COUNTRY', f'C{i:02d}', 'Africa') for i in range(200)] + [('GLOBAL', 'GLOBAL', None), ('REGION', 'AFR', None)]
+
+
+def write_fixture(path, indicator, rows, seed=0):
+    """Stream ``rows`` synthetic records to ``path`` without holding them in memory."""
+    rng = random.Random(seed)
+    sexes = list(gho.GENDERS)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"@odata.context": "synthetic", "value": [\n')
+        for i in range(rows):
+            kind, code, parent = SPATIAL[i % len(SPATIAL)]
+            mean = round(rng.uniform(0, 45), 1)
+            spread = round(rng.uniform(0.2, 8), 1)
+            record = {
+                'Id': i, 'IndicatorCode': indicator, 'SpatialDimType': kind, 'SpatialDim': code,
+                'ParentLocation': parent, 'TimeDim': 2012 + i % 11, 'Dim1': sexes[i % 3],
+                'NumericValue': mean, 'Low': round(mean - spread / 2, 1), 'High': round(mean + spread / 2, 1),
+                'Date': '2024-01-01T00:00:00+01:00',
+            }
+            f.write(('' if i == 0 else ',\n') + json.dumps(record))
+        f.write('\n]}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000, help='records per indicator')
+    parser.add_argument('--indicators', nargs='+', default=['NCD_BMI_30C'], choices=list(gho.INDICATORS))
+    parser.add_argument('--load', action='store_true', help='also bulk-load into the configured database')
+    parser.add_argument('--method', choices=['executemany', 'infile'], default='executemany')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as source:
+        for indicator in args.indicators:
+            write_fixture(os.path.join(source, f'{indicator}.json'), indicator, args.rows)
+
+        start = time.perf_counter()
+        rows = 0
+        for indicator in args.indicators:
+            with open(os.path.join(source, f'{indicator}.json'), encoding='utf-8') as fp:
+                for frame in gho.iter_clean_batches(fp, indicator):
+                    rows += len(frame)
+        elapsed = time.perf_counter() - start
+        print(f"parse + clean: {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+        if args.load:
+            from database.loader import load_connection, load_indicators
+
+            conn = load_connection(local_infile=args.method == 'infile')
+            try:
+                start = time.perf_counter()
+                counts = load_indicators(conn, source, args.indicators, args.method)
+                elapsed = time.perf_counter() - start
+            finally:
+                conn.close()
+            total = sum(counts.values())
+            print(f"load ({args.method}): {total} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Time keyset pages against fetching a whole result, at scaled data sizes.
+
+Every catalog query with a `-- keyset:` declaration is run three ways on the
+SQLite stand-in from query_benchmark.py:
+
+    full    the query without its LIMIT, every row fetched
+    first   the first page (database.catalog.page)
+    slowest the slowest page met while walking every page in order
+
+The walk also checks that the pages, concatenated, are exactly the full
+sorted result. At most --size + 1 rows are fetched per page, so the first
+rows arrive in about the same time at any scale.
+
+    python benchmarks/paging_benchmark.py --scales 1 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.backends import to_qmark  # noqa: E402
+from database.catalog import QUERIES, page  # noqa: E402
+from query_benchmark import open_database  # noqa: E402
+
+KEYSET_QUERIES = [query_id for query_id, query in QUERIES.items() if query.keyset]
+
+
+def fetch(conn, sql, params):
+    start = time.perf_counter()
+    cursor = conn.execute(to_qmark(sql, params), params)
+    rows = cursor.fetchall()
+    columns = [d[0] for d in cursor.description]
+    return rows, columns, time.perf_counter() - start
+
+
+def timed(conn, sql, params, repeat):
+    runs = [fetch(conn, sql, params) for _ in range(repeat)]
+    rows, columns, _ = runs[-1]
+    return rows, columns, statistics.median(seconds for _, _, seconds in runs)
+
+
+def walk(conn, query_id, size):
+    """Every page in order: (rows, page count, slowest page seconds)."""
+    keyset = QUERIES[query_id].keyset
+    rows, pages, slowest, after = [], 0, 0.0, None
+    while True:
+        sql, params = page(query_id, after=after, size=size)
+        chunk, columns, seconds = fetch(conn, sql, params)
+        pages += 1
+        slowest = max(slowest, seconds)
+        rows += chunk[:size]
+        if len(chunk) <= size:
+            return rows, pages, slowest
+        last = chunk[size - 1]
+        after = tuple(last[columns.index(column)] for column, _ in keyset)
+
+
+def run(scales, size, repeat, seed, workdir):
+    results = {}
+    for scale in scales:
+        conn, built = open_database(workdir, scale, seed)
+        if built:
+            print(f"built scale {scale} in {built:.1f}s")
+        for query_id in KEYSET_QUERIES:
+            sql, params = page(query_id, size=size)
+            full_sql = sql.rsplit('\nLIMIT', 1)[0]
+            full, _, full_seconds = timed(conn, full_sql, params, repeat)
+            _, _, first_seconds = timed(conn, sql, params, repeat)
+            walked, pages, slowest = walk(conn, query_id, size)
+            results[(scale, query_id)] = {
+                'rows': len(full),
+                'pages': pages,
+                'full_ms': full_seconds * 1000,
+                'first_ms': first_seconds * 1000,
+                'slowest_ms': slowest * 1000,
+                'pages_match': walked == full,
+            }
+        conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--size', type=int, default=100, help='rows per page')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of the full query and first page (median)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='keep built databases here and reuse them (default: a temporary directory)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(args.scales, args.size, args.repeat, args.seed, args.workdir or tmp)
+
+    print(f"{'scale':>6} {'query':<16} {'rows':>9} {'pages':>6} {'full ms':>9} {'first ms':>9} "
+          f"{'slowest ms':>10}  pages match")
+    for (scale, query_id), r in results.items():
+        print(f"{scale:>6} {query_id:<16} {r['rows']:>9} {r['pages']:>6} {r['full_ms']:>9.2f} "
+              f"{r['first_ms']:>9.2f} {r['slowest_ms']:>10.2f}  {'yes' if r['pages_match'] else 'NO'}")
+    if not all(r['pages_match'] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
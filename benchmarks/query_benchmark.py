@@ -0,0 +1,256 @@
+"""Benchmark every dashboard query at scaled data sizes.
+
+Loads database/synthetic.py data at each scale into an embedded SQLite
+database (no MySQL or network needed), with the schema and indexes
+translated from database/migrations.py and nutrition_combined populated
+from database/materialize.py. Scale 1 is the real WHO volume (~200
+countries x 11 years x 3 genders x 2 age groups per table); scale N splits
+every country into N subnational units. Every catalog query is then timed in four
+separate phases, as the dashboard runs it on a cache miss:
+
+    db      cursor.execute (SQLite computes aggregates before the first row)
+    fetch   database.db.fetch_arrow, rows -> Arrow
+    frame   Arrow -> pandas DataFrame
+    chart   charts.render.render with the page's spec, PNG encode included
+
+Results are written as JSON, and two result files can be compared:
+
+    python benchmarks/query_benchmark.py --scales 1 100 --out after.json
+    python benchmarks/query_benchmark.py --compare before.json after.json
+
+Scale 10000 means ~130M rows per table: it needs tens of GB of disk and
+hours to build. Use --workdir to keep the built databases between runs.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from charts.render import clear_chart_cache, render  # noqa: E402
+from charts.specs import CHARTS, chart_args  # noqa: E402
+from database import gho, materialize, migrations, synthetic  # noqa: E402
+from database.backends import to_qmark  # noqa: E402
+from database.catalog import QUERIES, bind  # noqa: E402
+from database.db import fetch_arrow  # noqa: E402
+
+PHASES = ['db', 'fetch', 'frame', 'chart']
+
+
+# ------------------------------
+# Embedded Stand-in
+# ------------------------------
+def sqlite_schema():
+    """(tables, indexes) of the fact tables and nutrition_combined, from the migrations, rewritten for SQLite."""
+    wanted = set(migrations.FACT_TABLES) | {materialize.COMBINED_TABLE}
+    tables, indexes = [], []
+    for migration in migrations.MIGRATIONS:
+        for step in migration.statements:
+            if not isinstance(step, str) or 'MODIFY' in step:
+                continue
+            table = re.search(r'(?:CREATE TABLE IF NOT EXISTS|ALTER TABLE)\s+(\w+)', step).group(1)
+            if table not in wanted:
+                continue
+            for name, columns in re.findall(r'INDEX (\w+) \(([^)]*)\)', step):
+                indexes.append(f"CREATE INDEX {name} ON {table} ({' '.join(columns.split())})")
+            if step.lstrip().startswith('CREATE TABLE'):
+                tables.append(re.sub(r',\s*INDEX \w+ \([^)]*\)', '', step))
+    for table in migrations.FACT_TABLES:
+        indexes.append(f"CREATE UNIQUE INDEX uq_{table}_key ON {table} ({', '.join(migrations.incremental.NATURAL_KEY)})")
+    return tables, indexes
+
+
+def build_database(path, scale, seed):
+    conn = sqlite3.connect(path)
+    tables, indexes = sqlite_schema()
+    for statement in tables:
+        conn.execute(statement)
+    for table in migrations.FACT_TABLES:
+        columns = gho.TABLE_COLUMNS[table]
+        insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        for chunk in synthetic.iter_frames(table, seed, units=scale):
+            conn.executemany(insert, chunk.astype(object).where(chunk.notna(), None).itertuples(index=False))
+    conn.execute(f"INSERT INTO {materialize.COMBINED_TABLE} ({materialize.COMBINED_COLUMNS}) "
+                 f"{materialize.COMBINED_SELECT}")
+    for statement in indexes:
+        conn.execute(statement)
+    conn.commit()
+    conn.execute('ANALYZE')
+    return conn
+
+
+def open_database(workdir, scale, seed):
+    path = os.path.join(workdir, f'who_x{scale}_seed{seed}.sqlite')
+    if os.path.exists(path):
+        return sqlite3.connect(path), 0.0
+    start = time.perf_counter()
+    conn = build_database(path + '.part', scale, seed)
+    conn.close()
+    os.replace(path + '.part', path)
+    return sqlite3.connect(path), time.perf_counter() - start
+
+
+def table_rows(conn):
+    tables = list(migrations.FACT_TABLES) + [materialize.COMBINED_TABLE]
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+
+
+# ------------------------------
+# Timing
+# ------------------------------
+def time_query(conn, query, repeat):
+    """Median milliseconds per phase over ``repeat`` cold runs of one query."""
+    timings = {phase: [] for phase in PHASES}
+    rows = 0
+    sql, params = bind(query.id)
+    sql = to_qmark(sql, params)
+    for _ in range(repeat):
+        clear_chart_cache()
+        cursor = conn.cursor()
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        executed = time.perf_counter()
+        table = fetch_arrow(cursor)
+        fetched = time.perf_counter()
+        df = table.to_pandas()
+        built = time.perf_counter()
+        cursor.close()
+        timings['db'].append(executed - start)
+        timings['fetch'].append(fetched - executed)
+        timings['frame'].append(built - fetched)
+        # The page only draws non-empty results.
+        if query.id in CHARTS and not df.empty:
+            frame, kind, options = chart_args(query.id, df)
+            start = time.perf_counter()
+            render(frame, kind, **options)
+            timings['chart'].append(time.perf_counter() - start)
+        rows = len(df)
+    result = {'rows': rows}
+    for phase, values in timings.items():
+        result[f'{phase}_ms'] = statistics.median(values) * 1000 if values else None
+    result['total_ms'] = sum(result[f'{phase}_ms'] or 0.0 for phase in PHASES)
+    return result
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {'commit': git('rev-parse', 'HEAD') or None, 'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+
+
+def run(scales, queries, repeat, seed, workdir):
+    results = {
+        'meta': {
+            **git_revision(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': f'sqlite {sqlite3.sqlite_version}',
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'scales': {},
+    }
+    for scale in scales:
+        conn, build_seconds = open_database(workdir, scale, seed)
+        rows = table_rows(conn)
+        print(f"scale {scale}x: {rows['obesity']:,} obesity / {rows['malnutrition']:,} malnutrition rows"
+              + (f', built in {build_seconds:.1f}s' if build_seconds else ' (reused)'), file=sys.stderr)
+        timed = {}
+        for query in queries:
+            timed[query.id] = time_query(conn, query, repeat)
+            print(f"  {query.id:<16} {timed[query.id]['total_ms']:>10.1f}ms", file=sys.stderr)
+        conn.close()
+        results['scales'][str(scale)] = {'table_rows': rows, 'build_seconds': build_seconds, 'queries': timed}
+    return results
+
+
+# ------------------------------
+# Reporting
+# ------------------------------
+def fmt_ms(value):
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+
+def print_results(results):
+    for scale, data in results['scales'].items():
+        print(f"\nscale {scale}x ({data['table_rows']['obesity']:,} rows per fact table)")
+        print(f"{'query':<16} {'rows':>9}" + ''.join(f'{phase + " ms":>10}' for phase in PHASES) + f"{'total ms':>10}")
+        for query_id, r in data['queries'].items():
+            print(f"{query_id:<16} {r['rows']:>9}" + ''.join(f' {fmt_ms(r[f"{phase}_ms"])}' for phase in PHASES)
+                  + f" {fmt_ms(r['total_ms'])}")
+
+
+def ratio(old, new):
+    if not old or new is None:
+        return f"{'-':>8}"
+    return f"{new / old:>7.2f}x"
+
+
+def compare(before_path, after_path, threshold):
+    with open(before_path, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(after_path, encoding='utf-8') as f:
+        after = json.load(f)
+    print(f"before: {before['meta']['commit']}  after: {after['meta']['commit']}  (after / before, <1 is faster)")
+    regressions = 0
+    for scale, data in after['scales'].items():
+        if scale not in before['scales']:
+            continue
+        old_queries = before['scales'][scale]['queries']
+        print(f"\nscale {scale}x")
+        print(f"{'query':<16}" + ''.join(f'{phase:>9}' for phase in PHASES) + f"{'total':>9}{'ms':>10}")
+        for query_id, new in data['queries'].items():
+            old = old_queries.get(query_id)
+            if old is None:
+                continue
+            flag = ''
+            if new['total_ms'] > old['total_ms'] * (1 + threshold):
+                flag = '  slower'
+                regressions += 1
+            print(f"{query_id:<16}" + ''.join(f" {ratio(old[f'{p}_ms'], new[f'{p}_ms'])}" for p in PHASES)
+                  + f" {ratio(old['total_ms'], new['total_ms'])} {fmt_ms(new['total_ms'])}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 100, 10000])
+    parser.add_argument('--queries', nargs='+', choices=list(QUERIES), help='default: every catalog query')
+    parser.add_argument('--repeat', type=int, default=3, help='cold runs per query (median is reported)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='keep built databases here and reuse them (default: a temporary directory)')
+    parser.add_argument('--out', help='write results as JSON to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.10, help='flag queries this much slower in --compare')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    queries = [QUERIES[query_id] for query_id in args.queries] if args.queries else list(QUERIES.values())
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(args.scales, queries, args.repeat, args.seed, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(args.scales, queries, args.repeat, args.seed, workdir)
+    print_results(results)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
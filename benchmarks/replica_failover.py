@@ -0,0 +1,285 @@
+"""Check read routing over a primary and replicas against fake MySQL servers.
+
+Each fake server answers the catalog queries from the SQLite stand-in of
+query_benchmark.py, with a latency of its own. It also answers what the
+router asks every host: SHOW REPLICA STATUS with a configurable lag, the
+data_version row, SET SESSION and KILL QUERY. A server can be stopped,
+which refuses new connections and drops open ones with error 2013 the way
+a crashed mysqld does. No MySQL or network is needed.
+
+These scenarios run in order on a primary and two replicas, all through
+database.replicas.ReplicatedBackend:
+
+    balance    concurrent reads spread over both replicas, none on the primary
+    latency    a replica 10x slower gets a smaller share
+    lag        a replica past DB_REPLICA_MAX_LAG stops serving
+    failover   a replica stopped mid-run: its queries finish elsewhere
+    recovery   the stopped replica is back after its next health check
+    version    after a load, replicas serve again only once they have replayed it
+    primary    the primary stopped: reads carry on, the version check fails
+    end-to-end every catalog query through run_query matches SQLite
+
+    python benchmarks/replica_failover.py --reads 200
+
+Exits non-zero if any scenario fails.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import backends, db, replicas  # noqa: E402
+from database.backends import to_qmark  # noqa: E402
+from database.cache import DATA_VERSION_QUERY  # noqa: E402
+from database.catalog import QUERIES, bind  # noqa: E402
+from query_benchmark import open_database  # noqa: E402
+
+MAX_LAG = 30
+CHECK_INTERVAL = 1.0
+
+
+class ServerError(Exception):
+    def __init__(self, errno, message):
+        super().__init__(f'{errno}: {message}')
+        self.errno = errno
+
+
+class FakeServer:
+    """A MySQL server stand-in over one SQLite file."""
+
+    def __init__(self, name, path, latency, lag=None):
+        self.name = name
+        self.path = path
+        self.latency = latency
+        self.lag = lag              # None: not a replica
+        self.version = 1
+        self.up = True
+        self.executed = 0
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def connect(self):
+        if not self.up:
+            raise ServerError(2003, f"Can't connect to MySQL server on '{self.name}'")
+        with self._lock:
+            self._next_id += 1
+            return FakeConnection(self, self._next_id)
+
+
+class FakeConnection:
+    def __init__(self, server, connection_id):
+        self.server = server
+        self.connection_id = connection_id
+        self.sqlite = sqlite3.connect(server.path, check_same_thread=False)
+        self.autocommit = True
+        self.unread_result = False
+
+    def cursor(self, prepared=False):
+        return FakeCursor(self)
+
+    def ping(self, reconnect=False):
+        if not self.server.up:
+            raise ServerError(2013, 'Lost connection to MySQL server')
+
+    def is_connected(self):
+        return self.server.up
+
+    def close(self):
+        self.sqlite.close()
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self._rows = []
+
+    def _answer(self, names, rows):
+        self.description = [(name,) for name in names]
+        self._rows = list(rows)
+
+    def execute(self, sql, params=None):
+        server = self.conn.server
+        if not server.up:
+            raise ServerError(2013, 'Lost connection to MySQL server during query')
+        if sql.startswith(('SET SESSION', 'KILL QUERY')):
+            self._answer([], [])
+        elif sql == 'SHOW REPLICA STATUS':
+            self._answer(['Seconds_Behind_Source'], [] if server.lag is None else [(server.lag,)])
+        elif sql == DATA_VERSION_QUERY:
+            self._answer(['version'], [(server.version,)])
+        else:
+            time.sleep(server.latency)
+            cursor = self.conn.sqlite.execute(to_qmark(sql, params), params or ())
+            self._answer([d[0] for d in cursor.description], cursor.fetchall())
+            with server._lock:
+                server.executed += 1
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def close(self):
+        pass
+
+
+# ------------------------------
+# Scenarios
+# ------------------------------
+STATEMENTS = [bind(query_id) for query_id in QUERIES]
+
+
+def reads(backend, servers, count, threads):
+    """Run ``count`` catalog queries on ``threads`` threads; returns per-server executions and failures."""
+    before = {server.name: server.executed for server in servers}
+    failures = []
+
+    def one(i):
+        sql, params = STATEMENTS[i % len(STATEMENTS)]
+        try:
+            backend.execute(sql, params)
+        except Exception as e:
+            failures.append(e)
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(count)))
+    return Counter({server.name: server.executed - before[server.name] for server in servers}), failures
+
+
+def check_all(backend):
+    for host in backend.hosts:
+        backend.check(host)
+
+
+def run(path, count, threads):
+    primary = FakeServer('primary', path, latency=0.002)
+    r1 = FakeServer('replica-1', path, latency=0.002, lag=0)
+    r2 = FakeServer('replica-2', path, latency=0.002, lag=0)
+    servers = (primary, r1, r2)
+    backend = replicas.ReplicatedBackend(
+        ('primary', backends.MySQLBackend(db.ConnectionPool(size=8, connect=primary.connect))),
+        [(server.name, backends.MySQLBackend(db.ConnectionPool(size=8, connect=server.connect)))
+         for server in servers[1:]],
+        max_lag=MAX_LAG, check_interval=CHECK_INTERVAL)
+    check_all(backend)
+    results = []
+
+    def scenario(name, ok, executed, failures, note=''):
+        shares = ', '.join(f'{server} {executed[server]}' for server in ('primary', 'replica-1', 'replica-2'))
+        results.append((name, ok and not failures, shares, len(failures), note))
+
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('balance', executed['primary'] == 0 and min(executed['replica-1'], executed['replica-2']) > count / 4,
+             executed, failures)
+
+    r2.latency = 0.02
+    reads(backend, servers, len(STATEMENTS), 1)      # let the latency average see the change
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('latency', executed['primary'] == 0 and executed['replica-1'] > executed['replica-2'],
+             executed, failures, 'replica-2 10x slower')
+    r2.latency = 0.002
+
+    r2.lag = 120
+    check_all(backend)
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('lag', executed['replica-2'] == 0 and executed['primary'] == 0, executed, failures,
+             'replica-2 120 s behind')
+
+    r1.up = False       # open connections die with 2013, new ones are refused
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('failover', executed['replica-1'] == 0 and executed['primary'] > 0, executed, failures,
+             'replica-1 stopped, replica-2 still lagging')
+
+    r1.up, r2.lag = True, 0
+    check_all(backend)
+    time.sleep(CHECK_INTERVAL)      # latency averages from before the outage are dropped
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('recovery', executed['primary'] == 0 and min(executed['replica-1'], executed['replica-2']) > 0,
+             executed, failures)
+
+    primary.version = 2
+    backend.data_version()
+    behind, _ = reads(backend, servers, len(STATEMENTS), 1)
+    r1.version = r2.version = 2
+    check_all(backend)
+    executed, failures = reads(backend, servers, count, threads)
+    scenario('version', behind['primary'] == len(STATEMENTS) and executed['primary'] == 0, executed + behind,
+             failures, 'reads on the primary until the replicas replay the load')
+
+    primary.up = False
+    executed, failures = reads(backend, servers, count, threads)
+    try:
+        backend.data_version()
+        version_failed = False
+    except Exception as e:
+        version_failed = replicas.host_lost(e)
+    scenario('primary', executed['primary'] == 0 and version_failed, executed, failures,
+             'the cache keeps serving while the version check fails')
+    primary.up = True
+    check_all(backend)
+
+    db._backend = backend
+    db.invalidate_cache()
+    reference = sqlite3.connect(path)
+    mismatched = []
+    before = Counter({server.name: server.executed for server in servers})
+    for query_id, (sql, params) in zip(QUERIES, STATEMENTS):
+        df = db.run_query(sql, params)
+        expected = reference.execute(to_qmark(sql, params), params or ()).fetchall()
+        if [tuple(row) for row in df.astype(object).itertuples(index=False)] != expected:
+            mismatched.append(query_id)
+    executed = Counter({server.name: server.executed for server in servers}) - before
+    scenario('end-to-end', not mismatched and executed['primary'] == 0, executed, [],
+             f'mismatched: {", ".join(mismatched)}' if mismatched else f'{len(QUERIES)} queries match SQLite')
+    reference.close()
+    return results, backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reads', type=int, default=200, help='queries per scenario')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent readers')
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='keep built databases here and reuse them (default: a temporary directory)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        open_database(workdir, args.scale, args.seed)[0].close()
+        path = os.path.join(workdir, f'who_x{args.scale}_seed{args.seed}.sqlite')
+        results, backend = run(path, args.reads, args.threads)
+        stats = backend.stats()
+        backend.close()
+
+    print(f"{'scenario':<11} {'ok':<3} {'failed':>6}  executions per server")
+    for name, ok, shares, failed, note in results:
+        print(f"{name:<11} {'yes' if ok else 'NO':<3} {failed:>6}  {shares}{f'  ({note})' if note else ''}")
+    print(f"\nfailovers {stats['failovers']}, reads without a usable replica {stats['primary_fallbacks']}")
+    print(f"{'host':<10} {'role':<8} {'queries':>7} {'errors':>6} {'avg ms':>7} {'max ms':>7} {'down':>5} {'back':>5}")
+    for host in stats['hosts']:
+        print(f"{host['host']:<10} {host['role']:<8} {host['queries']:>7} {host['errors']:>6} "
+              f"{host['latency_avg_ms'] or 0:>7.2f} {host['latency_max_ms']:>7.2f} "
+              f"{host['marked_down']:>5} {host['recovered']:>5}")
+    if not all(ok for _, ok, _, _, _ in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
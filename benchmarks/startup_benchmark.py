@@ -0,0 +1,96 @@
+"""Time cold start and reruns of the Streamlit app.
+
+Each sample runs in a fresh interpreter through streamlit's AppTest. It
+records the time to first paint of app.py (the home page), of the query
+dashboard's landing view, and of the median rerun of each. With --ref the
+same is measured on another git revision, extracted into a temporary
+directory, for a before/after comparison.
+
+    python benchmarks/startup_benchmark.py --ref HEAD~1 --samples 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, statistics, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+
+def reruns(at, n):
+    # Streamlit does some one-off work on the first reruns of a page; keep it out of the median.
+    for _ in range(2):
+        at.run()
+    timings = []
+    for _ in range(n):
+        t = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - t)
+    return statistics.median(timings)
+
+at = AppTest.from_file('app.py', default_timeout=120)
+at.run()
+home_first = time.perf_counter() - start
+home_rerun = reruns(at, {reruns})
+
+t = time.perf_counter()
+at.switch_page('pages/queries.py').run()
+queries_first = time.perf_counter() - t
+queries_rerun = reruns(at, {reruns})
+assert not at.exception, at.exception
+print(json.dumps({{'home_first': home_first, 'home_rerun': home_rerun,
+                  'queries_first': queries_first, 'queries_rerun': queries_rerun}}))
+"""
+
+METRICS = [
+    ('home_first', 'app.py first paint (incl. imports)'),
+    ('home_rerun', 'home rerun'),
+    ('queries_first', 'query dashboard first paint'),
+    ('queries_rerun', 'query dashboard rerun'),
+]
+
+
+def sample(tree, reruns):
+    env = dict(os.environ, PYTHONPATH=tree)
+    out = subprocess.run([sys.executable, '-c', CHILD.format(reruns=reruns)], cwd=tree, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(tree, samples, reruns):
+    runs = [sample(tree, reruns) for _ in range(samples)]
+    return {key: statistics.median(run[key] for run in runs) for key, _ in METRICS}
+
+
+def extract(ref, target):
+    archive = subprocess.run(['git', 'archive', ref], cwd=ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', target], input=archive, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ref', help='git revision to compare against (e.g. HEAD~1)')
+    parser.add_argument('--samples', type=int, default=3, help='fresh interpreters per tree (median is reported)')
+    parser.add_argument('--reruns', type=int, default=5, help='reruns timed per page and sample')
+    args = parser.parse_args()
+
+    results = {'working tree': measure(ROOT, args.samples, args.reruns)}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as tree:
+            extract(args.ref, tree)
+            results = {args.ref: measure(tree, args.samples, args.reruns), **results}
+
+    labels = list(results)
+    print(f"{'':<38}" + ''.join(f'{label:>16}' for label in labels))
+    for key, title in METRICS:
+        print(f'{title:<38}' + ''.join(f'{results[label][key] * 1000:>14.1f}ms' for label in labels))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Simulate a thundering herd on one dashboard query, with and without single-flight.
+
+--sessions threads stand in for Streamlit sessions that open the same
+catalog query at the same instant, with the cache just emptied (a shared
+link right after a data load). They all call database.db.run_query against
+the SQLite stand-in of query_benchmark.py, and every execution is delayed
+by --latency ms to stand in for MySQL's round trip and work.
+
+With DB_SINGLE_FLIGHT on, each round should reach the backend once and
+every other session should share that result:
+
+    python benchmarks/thundering_herd.py --sessions 50 --rounds 5
+
+Exits non-zero if single-flight let more than one execution through per
+round or any session got a different result.
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import db  # noqa: E402
+from database.backends import to_qmark  # noqa: E402
+from database.catalog import QUERIES, bind  # noqa: E402
+from query_benchmark import open_database  # noqa: E402
+
+
+class SlowStandIn:
+    """SQLite stand-in backend: one connection per thread, a fixed delay per query, executions counted."""
+    name = 'sqlite'
+
+    def __init__(self, path, latency):
+        self.path = path
+        self.latency = latency
+        self.executions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def execute(self, query, params=None, timeout=None, cancel=None):
+        with self._lock:
+            self.executions += 1
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+        time.sleep(self.latency)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(to_qmark(query, params), params or ())
+            return db.fetch_arrow(cursor)
+        finally:
+            cursor.close()
+
+    def data_version(self):
+        return None
+
+
+def herd(query_id, sessions):
+    """Release ``sessions`` threads at once on one query; returns (frames, per-session seconds, wall seconds)."""
+    sql, params = bind(query_id)
+    barrier = threading.Barrier(sessions + 1)
+    frames, seconds = [None] * sessions, [None] * sessions
+
+    def session(i):
+        barrier.wait()
+        start = time.perf_counter()
+        frames[i] = db.run_query(sql, params)
+        seconds[i] = time.perf_counter() - start
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return frames, seconds, time.perf_counter() - start
+
+
+def run(backend, query_id, sessions, rounds, single_flight):
+    db.SINGLE_FLIGHT = single_flight
+    before, flights_before = backend.executions, db.single_flight_stats()
+    walls, waits, same = [], [], True
+    for _ in range(rounds):
+        db.invalidate_cache()
+        frames, seconds, wall = herd(query_id, sessions)
+        walls.append(wall)
+        waits += seconds
+        same = same and all(frame.equals(frames[0]) for frame in frames)
+    flights = db.single_flight_stats()
+    return {
+        'executions': backend.executions - before,
+        'collapsed': flights['collapsed'] - flights_before['collapsed'],
+        'wall_ms': statistics.median(walls) * 1000,
+        'p50_ms': statistics.median(waits) * 1000,
+        'max_ms': max(waits) * 1000,
+        'same': same,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=50, help='concurrent sessions per round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=100, help='ms added to every backend execution')
+    parser.add_argument('--query', default='obesity_1', choices=list(QUERIES))
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='keep built databases here and reuse them (default: a temporary directory)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        open_database(workdir, args.scale, args.seed)[0].close()
+        path = os.path.join(workdir, f'who_x{args.scale}_seed{args.seed}.sqlite')
+        backend = db._backend = SlowStandIn(path, args.latency / 1000)
+        results = {mode: run(backend, args.query, args.sessions, args.rounds, mode == 'single-flight')
+                   for mode in ('off', 'single-flight')}
+
+    print(f"{args.sessions} sessions x {args.rounds} rounds on {args.query}, {args.latency:g} ms per execution")
+    print(f"{'mode':<14} {'executions':>10} {'collapsed':>9} {'round ms':>9} {'p50 ms':>8} {'max ms':>8}  same result")
+    for mode, r in results.items():
+        print(f"{mode:<14} {r['executions']:>10} {r['collapsed']:>9} {r['wall_ms']:>9.1f} {r['p50_ms']:>8.1f} "
+              f"{r['max_ms']:>8.1f}  {'yes' if r['same'] else 'NO'}")
+    shared = results['single-flight']
+    if shared['executions'] != args.rounds or not all(r['same'] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
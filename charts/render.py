@@ -0,0 +1,335 @@
+"""Render dashboard charts to PNG/SVG bytes, cached by data and chart spec.
+
+Figures are built on ``matplotlib.figure.Figure`` directly rather than
+through pyplot, so nothing is registered in pyplot's global figure list.
+A rendered figure is garbage once its bytes are written. The page reruns
+on every widget interaction; when the result set and the spec match a
+previous render, the cached bytes are returned without touching
+matplotlib.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import PolyCollection
+from matplotlib.container import BarContainer
+from matplotlib.figure import Figure
+from matplotlib.transforms import offset_copy
+
+CHART_CACHE_MAX_BYTES = int(float(os.getenv('CHART_CACHE_MAX_MB', '64')) * 1024 * 1024)
+CHART_DPI = int(os.getenv('CHART_DPI', '150'))
+# From this many bars on, draw them as one PolyCollection instead of a patch per bar.
+BAR_COLLECTION_MIN = 100
+# Past this many points, line markers are thinned to one per 1% of the axes diagonal.
+MARKER_MAX = 200
+
+
+# ------------------------------
+# Labels
+# ------------------------------
+# Value labels are the one part of a chart whose cost grows with the
+# number of rows: each is a separate Text artist to lay out and rasterize.
+# Labels that would land on top of each other are dropped before any
+# artist is created, so their number is bounded by what fits in the axes
+# rather than by the size of the result set.
+def cull_labels(ax, x, y, texts, size):
+    """Indices of the labels at data points (x, y) that don't overlap, earlier labels winning."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    candidates = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(candidates) == 0:
+        return candidates
+    ax.autoscale_view()
+    pixels = ax.transData.transform(np.column_stack([x[candidates], y[candidates]]))
+    scale = size * ax.figure.dpi / 72
+    widths = np.fromiter((len(texts[i]) for i in candidates), dtype=np.float64, count=len(candidates)) * 0.6 * scale
+    height = 1.2 * scale
+
+    # First pass, vectorized: keep one label per label-sized grid cell.
+    cell_w = max(widths.max(), 1.0)
+    cells = np.floor(pixels / [cell_w, height]).astype(np.int64)
+    packed = (cells[:, 0] - cells[:, 0].min()) * (cells[:, 1].max() - cells[:, 1].min() + 1) + cells[:, 1]
+    _, first = np.unique(packed, return_index=True)
+    first.sort()
+
+    # Second pass, exact: greedy box test over the few survivors.
+    kept = []
+    for i in first:
+        if kept:
+            dx = np.abs(pixels[kept, 0] - pixels[i, 0]) * 2 < widths[kept] + widths[i]
+            dy = np.abs(pixels[kept, 1] - pixels[i, 1]) < height
+            if np.any(dx & dy):
+                continue
+        kept.append(i)
+    return candidates[kept]
+
+
+def bar_labels(ax, bars, fmt, size, padding=3):
+    """Label the bars of one BarContainer with a single bar_label call."""
+    values = np.asarray(bars.datavalues, dtype=np.float64)
+    centers = np.array([(p.get_x() + p.get_width() / 2, p.get_y() + p.get_height() / 2) for p in bars.patches])
+    if len(values) == 0:
+        return
+    texts = [fmt.format(v) for v in values]
+    if bars.orientation == 'horizontal':
+        keep = cull_labels(ax, values, centers[:, 1], texts, size)
+    else:
+        keep = cull_labels(ax, centers[:, 0], values, texts, size)
+    subset = BarContainer([bars.patches[i] for i in keep], datavalues=values[keep], orientation=bars.orientation)
+    ax.bar_label(subset, labels=[texts[i] for i in keep], padding=padding, fontsize=size)
+
+
+def draw_bars(ax, positions, values, thickness, color, horizontal, fmt, size, padding=3, label=None):
+    """Draw labelled bars centred on ``positions``."""
+    positions = np.asarray(positions, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    color = list(color) if isinstance(color, tuple) else color
+    if len(values) < BAR_COLLECTION_MIN:
+        bars = (ax.barh if horizontal else ax.bar)(positions, values, thickness, color=color, label=label)
+        bar_labels(ax, bars, fmt, size, padding)
+        return
+
+    lo, hi = positions - thickness / 2, positions + thickness / 2
+    base = np.zeros_like(values)
+    if horizontal:
+        corners = [(base, lo), (values, lo), (values, hi), (base, hi)]
+    else:
+        corners = [(lo, base), (lo, values), (hi, values), (hi, base)]
+    verts = np.stack([np.column_stack(corner) for corner in corners], axis=1)
+    bars = PolyCollection(verts, facecolors=color, label=label)
+    (bars.sticky_edges.x if horizontal else bars.sticky_edges.y).append(0)
+    ax.add_collection(bars)
+    ax.autoscale_view()
+
+    texts = [fmt.format(v) for v in values]
+    x, y = (values, positions) if horizontal else (positions, values)
+    shift = {'x': padding} if horizontal else {'y': padding}
+    transform = offset_copy(ax.transData, fig=ax.figure, units='points', **shift)
+    align = {'ha': 'left', 'va': 'center'} if horizontal else {'ha': 'center', 'va': 'bottom'}
+    for i in cull_labels(ax, x, y, texts, size):
+        ax.text(x[i], y[i], texts[i], transform=transform, fontsize=size, **align)
+
+
+def category_ticks(ax, axis, positions, texts, size=10):
+    """Label category ticks, keeping every k-th one when they don't all fit."""
+    positions = np.asarray(positions, dtype=np.float64)
+    texts = [str(t) for t in texts]
+    stride = 1
+    if len(positions) > 1:
+        ax.autoscale_view()
+        ends = np.zeros((2, 2))
+        ends[:, 1 if axis == 'y' else 0] = positions[[0, -1]]
+        pixels = ax.transData.transform(ends)[:, 1 if axis == 'y' else 0]
+        spacing = abs(pixels[1] - pixels[0]) / (len(positions) - 1)
+        scale = size * ax.figure.dpi / 72
+        needed = 1.2 * scale if axis == 'y' else 0.6 * scale * max(map(len, texts)) + scale
+        stride = max(1, int(np.ceil(needed / spacing))) if spacing > 0 else len(positions)
+    set_ticks = ax.set_yticks if axis == 'y' else ax.set_xticks
+    set_ticks(positions[::stride], texts[::stride])
+
+
+def point_labels(ax, x, y, texts, size, offset=2):
+    """Label data points, ``offset`` points above each, skipping labels that would collide."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    transform = offset_copy(ax.transData, fig=ax.figure, y=offset, units='points')
+    for i in cull_labels(ax, x, y, texts, size):
+        ax.text(x[i], y[i], texts[i], transform=transform, ha='center', va='bottom', fontsize=size)
+
+
+# ------------------------------
+# Chart Kinds
+# ------------------------------
+# Each takes a Figure, the result set and the spec's options and draws into
+# the figure. Options are plain values (strings, numbers, tuples) so the
+# spec can be hashed.
+def _barh(fig, df, y, x, xlabel, title, color='steelblue', label_fmt='{:.1f}%'):
+    ax = fig.subplots()
+    draw_bars(ax, np.arange(len(df)), df[x], 0.8, color, True, label_fmt, 9)
+    category_ticks(ax, 'y', np.arange(len(df)), df[y])
+    ax.set_xlabel(xlabel)
+    ax.set_title(title)
+    ax.grid(axis='x', alpha=0.3)
+
+
+def _pivot_bar(fig, df, index, columns, values, ylabel, title, legend_title, colors=('steelblue', 'orange')):
+    ax = fig.subplots()
+    pivot = df.pivot(index=index, columns=columns, values=values).fillna(0)
+    pivot.plot(kind='bar', ax=ax, color=list(colors))
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend(title=legend_title)
+    ax.grid(axis='y', alpha=0.3)
+    for container in ax.containers:
+        bar_labels(ax, container, '{:g}', 10, padding=0)
+
+
+def _paired_bar(fig, df, category, series, xlabel, ylabel, title, width=0.35):
+    # series: ((column, label, color), (column, label, color))
+    ax = fig.subplots()
+    for offset, (column, label, color) in enumerate(series):
+        draw_bars(ax, np.arange(len(df)) + offset * width, df[column], width, color, False, '{:.1f}%', 8,
+                  padding=2, label=label)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    category_ticks(ax, 'x', np.arange(len(df)) + width / 2, df[category])
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _draw_lines(ax, df, x, series, labelled, label_size):
+    for column, label, color in series:
+        ax.plot(df[x], df[column], marker='o', color=color, label=label,
+                markevery=0.01 if len(df) > MARKER_MAX else None)
+        if labelled:
+            point_labels(ax, df[x], df[column], [f'{v:.1f}%' for v in df[column]], label_size)
+
+
+def _line(fig, df, x, series, xlabel, ylabel, title, point_labels=False, label_size=8, by=None, groups=None):
+    # series: ((column, label, color), ...). With ``by``, one line per group in ``groups``.
+    ax = fig.subplots()
+    if by is not None:
+        column = series[0][0]
+        for group in groups:
+            subset = df[df[by] == group]
+            ax.plot(subset[x], subset[column], marker='o', label=group,
+                    markevery=0.01 if len(subset) > MARKER_MAX else None)
+    else:
+        _draw_lines(ax, df, x, series, point_labels, label_size)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if by is not None or any(label for _, label, _ in series):
+        ax.legend()
+    ax.grid(alpha=0.3)
+
+
+def _scatter(fig, df, x, y, c, xlabel, ylabel, title, text, colorbar_label, cmap='viridis'):
+    ax = fig.subplots()
+    points = ax.scatter(df[x], df[y], c=df[c], cmap=cmap, s=100, edgecolor='k')
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(alpha=0.3)
+    point_labels(ax, df[x], df[y], df[text].astype(str).tolist(), 8, offset=0)
+    fig.colorbar(points, ax=ax, label=colorbar_label)
+
+
+def _panel_lines(fig, df, split, panels, x, series, xlabel, ylabel):
+    # panels: ((value of ``split``, title), ...), stacked with a shared x axis.
+    axes = fig.subplots(len(panels), 1, sharex=True, squeeze=False)[:, 0]
+    for ax, (value, title) in zip(axes, panels):
+        _draw_lines(ax, df[df[split] == value], x, series, True, 8)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid(alpha=0.3)
+    axes[-1].set_xlabel(xlabel)
+
+
+KINDS = {
+    'barh': _barh,
+    'pivot_bar': _pivot_bar,
+    'paired_bar': _paired_bar,
+    'line': _line,
+    'scatter': _scatter,
+    'panel_lines': _panel_lines,
+}
+
+
+# ------------------------------
+# Cache
+# ------------------------------
+class ChartCache:
+    """LRU of rendered chart bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'render_seconds': 0.0}
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return data
+
+    def put(self, key, data, seconds):
+        with self._lock:
+            self._stats['render_seconds'] += seconds
+            if len(data) > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['avg_render_ms'] = 1000 * stats['render_seconds'] / stats['misses'] if stats['misses'] else 0.0
+        return stats
+
+
+_cache = ChartCache()
+
+
+def chart_key(df, kind, fmt, spec):
+    digest = hashlib.sha1()
+    digest.update(repr((kind, fmt, sorted(spec.items()), list(df.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def draw(df, kind, figsize=(8, 4), **spec):
+    """Build the chart as a Figure (not registered with pyplot)."""
+    fig = Figure(figsize=figsize)
+    KINDS[kind](fig, df, **spec)
+    return fig
+
+
+def render(df, kind, fmt='png', **spec):
+    """Return the chart as PNG or SVG bytes, from the cache when the data and spec are unchanged."""
+    key = chart_key(df, kind, fmt, spec)
+    data = _cache.get(key)
+    if data is not None:
+        return data
+    start = time.perf_counter()
+    fig = draw(df, kind, **spec)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=CHART_DPI, bbox_inches='tight')
+    data = buffer.getvalue()
+    _cache.put(key, data, time.perf_counter() - start)
+    return data
+
+
+def chart_stats():
+    return _cache.stats()
+
+
+def clear_chart_cache():
+    _cache.clear()
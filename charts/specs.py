@@ -0,0 +1,136 @@
+"""Chart for each dashboard query, keyed by catalog id.
+
+pages/queries.py and benchmarks/query_benchmark.py both draw from here, so
+the benchmark renders exactly what the dashboard shows. Imports nothing
+heavy: the page loads it before pandas and matplotlib are needed.
+"""
+from collections import namedtuple
+
+from database.catalog import defaults
+
+# kind and options are passed to charts.render.render; prepare, if set,
+# derives the columns the chart needs from the query result. Titles may
+# name the query's parameters ({year}, {country}, ...), and ``groups`` may
+# be the name of a list parameter; chart_args fills in the values used.
+ChartSpec = namedtuple('ChartSpec', ['kind', 'options', 'prepare'])
+
+
+def _country_year(df):
+    return df.assign(Label=df['Country'].astype(str) + ' (' + df['Year'].astype(str) + ')')
+
+
+def _gap(df):
+    return df.assign(Gap=df['Avg_Obesity'] - df['Avg_Malnutrition'])
+
+
+def _spec(kind, prepare=None, **options):
+    return ChartSpec(kind, options, prepare)
+
+
+BOTH = (('Avg_Obesity', 'Obesity', 'steelblue'), ('Avg_Malnutrition', 'Malnutrition', 'orange'))
+
+CHARTS = {
+    # ------------------------------
+    # Obesity
+    # ------------------------------
+    'obesity_1': _spec('barh', y='Region', x='Avg_Obesity', figsize=(8, 4), color='steelblue',
+                       xlabel='Average Obesity (%)', title='Top 5 Regions by Obesity ({year})'),
+    'obesity_3': _spec('line', x='Year', series=(('Mean_Estimate', None, 'steelblue'),),
+                       xlabel='Year', ylabel='Obesity (%)', title='Obesity Trend in {country} (2012–2022)',
+                       point_labels=True),
+    'obesity_4': _spec('barh', y='Gender', x='Avg_Obesity', figsize=(6, 3),
+                       color=('steelblue', 'orange'), xlabel='Average Obesity (%)',
+                       title='Average Obesity by Gender (2012–2022)'),
+    'obesity_5': _spec('pivot_bar', index='obesity_level', columns='age_group', values='Country_Count',
+                       ylabel='Number of Countries', title='Country Count by Obesity Level and Age Group',
+                       legend_title='Age Group'),
+    'obesity_6a': _spec('barh', y='Country', x='CI_Width', figsize=(6, 4), color='steelblue',
+                        xlabel='CI Width', title='Top 5 Least Reliable Countries ({year})', label_fmt='{:.2f}'),
+    'obesity_6b': _spec('barh', y='Country', x='Avg_CI_Width', figsize=(6, 4), color='orange',
+                        xlabel='Average CI Width', title='Top 5 Most Consistent Countries', label_fmt='{:.2f}'),
+    'obesity_7': _spec('barh', y='age_group', x='Avg_Obesity', figsize=(6, 3),
+                       color=('steelblue', 'orange'), xlabel='Average Obesity (%)',
+                       title='Average Obesity by Age Group (2012–2022)'),
+    'obesity_8': _spec('barh', y='Country', x='Avg_Obesity', figsize=(8, 6), color='steelblue',
+                       xlabel='Average Obesity (%)',
+                       title='Top 10 Countries with Consistent Low Obesity '
+                             '(Avg < {max_obesity:g}%, CI < {max_ci_width:.1f})'),
+    'obesity_9': _spec('barh', _country_year, y='Label', x='Difference', figsize=(8, 6), color='steelblue',
+                       xlabel='Difference (Female - Male) %',
+                       title='Top 10 Countries: Female Obesity > Male by >{min_difference:g}%'),
+    'obesity_10': _spec('line', x='Year', series=(('Avg_Obesity', None, 'steelblue'),),
+                        xlabel='Year', ylabel='Average Obesity (%)',
+                        title='Global Average Obesity per Year (2012–2022)', point_labels=True, label_size=9),
+
+    # ------------------------------
+    # Malnutrition
+    # ------------------------------
+    'malnutrition_1': _spec('barh', y='age_group', x='Avg_Malnutrition', figsize=(6, 3),
+                            color=('steelblue', 'orange'), xlabel='Average Malnutrition (%)',
+                            title='Average Malnutrition by Age Group (2012–2022)'),
+    'malnutrition_2': _spec('barh', y='Country', x='Mean_Estimate', figsize=(8, 4), color='steelblue',
+                            xlabel='Malnutrition (%)', title='Top 5 Countries with Highest Malnutrition ({year})'),
+    'malnutrition_3': _spec('line', x='Year', series=(('Avg_Malnutrition', None, 'steelblue'),),
+                            xlabel='Year', ylabel='Average Malnutrition (%)',
+                            title='Malnutrition Trend in {region} (2012–2022)', point_labels=True),
+    'malnutrition_4': _spec('barh', y='Gender', x='Avg_Malnutrition', figsize=(6, 3),
+                            color=('steelblue', 'orange'), xlabel='Average Malnutrition (%)',
+                            title='Average Malnutrition by Gender (2012–2022)'),
+    'malnutrition_5': _spec('pivot_bar', index='malnutrition_level', columns='age_group', values='Avg_CI_Width',
+                            ylabel='Average CI Width', title='Average CI Width by Malnutrition Level and Age Group',
+                            legend_title='Age Group'),
+    'malnutrition_6': _spec('line', x='Year', series=(('Malnutrition', None, None),),
+                            by='Country', groups='countries', xlabel='Year', ylabel='Malnutrition (%)',
+                            title='Yearly Malnutrition Change in {countries} (2012–2022)'),
+    'malnutrition_7': _spec('barh', y='Region', x='Avg_Malnutrition', figsize=(8, 4), color='steelblue',
+                            xlabel='Average Malnutrition (%)',
+                            title='Top 5 Regions with Lowest Malnutrition (2012–2022)'),
+    'malnutrition_8': _spec('barh', y='Country', x='Increase', figsize=(8, 6), color='steelblue',
+                            xlabel='Increase in Malnutrition (%)',
+                            title='Top 10 Countries with Increasing Malnutrition (2012–2022)'),
+    'malnutrition_9': _spec('line', x='Year',
+                            series=(('Min_Malnutrition', 'Min', 'steelblue'), ('Max_Malnutrition', 'Max', 'orange')),
+                            xlabel='Year', ylabel='Malnutrition (%)',
+                            title='Min/Max Malnutrition Levels by Year (2012–2022)'),
+    'malnutrition_10': _spec('barh', _country_year, y='Label', x='CI_Width', figsize=(8, 6), color='steelblue',
+                             xlabel='CI Width', title='Top 10 Countries with High CI_Width (CI > {min_ci_width:.1f})',
+                             label_fmt='{:.2f}'),
+
+    # ------------------------------
+    # Combined
+    # ------------------------------
+    'combined_1': _spec('paired_bar', category='Country',
+                        series=(('Obesity', 'Obesity', 'steelblue'), ('Malnutrition', 'Malnutrition', 'orange')),
+                        xlabel='Country', ylabel='Percentage (%)',
+                        title='Obesity vs Malnutrition in {year} (Adult, Both)'),
+    'combined_2': _spec('paired_bar', category='Gender', series=BOTH,
+                        xlabel='Gender', ylabel='Percentage (%)',
+                        title='Gender-Based Disparity in Obesity and Malnutrition ({year})'),
+    'combined_3': _spec('paired_bar', category='Region', series=BOTH,
+                        xlabel='Region', ylabel='Percentage (%)',
+                        title='Average Obesity and Malnutrition: {region} vs {other_region} (2012–2022)'),
+    'combined_4': _spec('scatter', _gap, x='Avg_Obesity', y='Avg_Malnutrition', c='Gap', text='Country',
+                        figsize=(8, 6), xlabel='Average Obesity (%)', ylabel='Average Malnutrition (%)',
+                        title='Countries with High Obesity & Low Malnutrition (2012–2022)',
+                        colorbar_label='Obesity - Malnutrition'),
+    'combined_5': _spec('panel_lines', split='age_group',
+                        panels=(('Adult', 'Adults: Obesity vs Malnutrition (2012–2022)'),
+                                ('Child/Adolescent', 'Children: Obesity vs Malnutrition (2012–2022)')),
+                        x='Year', series=BOTH, figsize=(8, 6), xlabel='Year', ylabel='Percentage (%)'),
+}
+
+
+def chart_args(query_id, df, values=None):
+    """(frame, kind, options) to pass to charts.render.render for a query result.
+
+    ``values`` are the parameter values the query ran with (defaults otherwise).
+    """
+    spec = CHARTS[query_id]
+    values = {**defaults(query_id), **(values or {})}
+    options = dict(spec.options)
+    if 'title' in options:
+        text = {name: ', '.join(map(str, v)) if isinstance(v, (list, tuple)) else v for name, v in values.items()}
+        options['title'] = options['title'].format(**text)
+    if isinstance(options.get('groups'), str):
+        options['groups'] = values[options['groups']]
+    return (spec.prepare(df) if spec.prepare else df), spec.kind, options
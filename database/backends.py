@@ -0,0 +1,415 @@
+"""Query backends behind database.db.run_query.
+
+``mysql`` (the default) runs queries over the connection pool. ``duckdb`` is
+an embedded, file-backed columnar engine that runs in the Streamlit process,
+so a single-node deployment has no network round trips at all. The catalog
+SQL runs on it unchanged; parameter placeholders go through ``to_qmark``.
+
+    python -m database.backends build --from mysql              # copy the MySQL tables
+    python -m database.backends build --from synthetic/         # <table>.parquet / .csv files
+
+Both backends return Arrow tables, so everything above them (cache,
+DataFrame build, charts) is shared.
+"""
+import argparse
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from database import gho, materialize
+from database.cache import read_data_version
+from database.watchdog import guard, timeout_error
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUCKDB_PATH = os.getenv('DB_DUCKDB_PATH', os.path.join(ROOT, 'data', 'nutrition.duckdb'))
+DUCKDB_THREADS = int(os.getenv('DB_DUCKDB_THREADS', '0'))   # 0 = DuckDB's default (all cores)
+CATALOG = 'nutrition'
+PREPARED_PER_CONNECTION = int(os.getenv('DB_PREPARED_PER_CONNECTION', '64'))  # statements kept prepared per connection
+
+ER_PARSE_ERROR = 1064
+ER_UNKNOWN_SYSTEM_VARIABLE = 1193
+ER_QUERY_TIMEOUT = 3024         # max_execution_time exceeded
+
+# When the server enforces the time limit itself, KILL QUERY is only sent
+# if it hasn't stopped the query this many seconds later.
+KILL_GRACE = 1.0
+
+# Fact tables are stored sorted on the leading columns of the MySQL filter
+# index, so DuckDB's per-row-group min/max skips most of the table.
+SORT_KEY = 'Gender, age_group, Year, Region, Country'
+COLUMN_TYPES = {'Year': 'SMALLINT', 'Mean_Estimate': 'DOUBLE', 'LowerBound': 'DOUBLE',
+                'UpperBound': 'DOUBLE', 'CI_Width': 'DOUBLE'}
+
+
+# ------------------------------
+# Dialect Shim
+# ------------------------------
+# String literals and comments are matched first so placeholders inside them are left alone.
+_TOKENS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|--[^\n]*|%s|%%")
+
+
+def to_qmark(query, params=None):
+    """Rewrite mysql.connector's ``%s`` placeholders (and ``%%``) as DuckDB's ``?``.
+
+    The connector only interpolates when parameters are given, so a query
+    without them is passed through as-is.
+    """
+    if not params:
+        return query
+    return _TOKENS.sub(lambda m: {'%s': '?', '%%': '%'}.get(m.group(0), m.group(0)), query)
+
+
+# ------------------------------
+# MySQL
+# ------------------------------
+class MySQLBackend:
+    """Queries over the connection pool.
+
+    Queries with parameters (every catalog query, via ``catalog.bind``) run
+    as server-side prepared statements. Each pooled connection keeps its
+    statements prepared, so a query is parsed once per connection and later
+    runs only send the parameter values.
+
+    A time limit is set as the session's ``max_execution_time``, so the
+    server stops the SELECT itself. Past the limit, or on cancellation, the
+    watchdog sends KILL QUERY from a separate connection. MariaDB has no
+    ``max_execution_time``, so there KILL QUERY does both jobs.
+    """
+
+    name = 'mysql'
+
+    def __init__(self, pool, prepared_max=PREPARED_PER_CONNECTION):
+        self.pool = pool
+        self.prepared_max = prepared_max
+        self.server_timeouts = True
+        self._statements = weakref.WeakKeyDictionary()   # connection -> OrderedDict(sql -> (sql, cursor))
+        self._time_limits = weakref.WeakKeyDictionary()  # connection -> max_execution_time in ms
+        self._killer = None
+        self._kill_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stats = {'prepared': 0, 'prepared_reused': 0, 'kills': 0}
+
+    def _prepared(self, conn, query):
+        # A connection is only used by one thread at a time, so its own
+        # statements need no lock once looked up.
+        with self._lock:
+            statements = self._statements.get(conn)
+            if statements is None:
+                statements = self._statements[conn] = OrderedDict()
+        entry = statements.get(query)
+        if entry is not None:
+            statements.move_to_end(query)
+            with self._lock:
+                self._stats['prepared_reused'] += 1
+            return entry
+        # The prepared cursors skip re-preparing only when execute() gets the
+        # same string object again, so the first one is kept with the cursor.
+        entry = statements[query] = (query, conn.cursor(prepared=True))
+        with self._lock:
+            self._stats['prepared'] += 1
+        if len(statements) > self.prepared_max:
+            _, (_, cursor) = statements.popitem(last=False)
+            cursor.close()      # deallocates the statement on the server
+        return entry
+
+    def _forget(self, conn, query):
+        with self._lock:
+            statements = self._statements.get(conn)
+        entry = statements.pop(query, None) if statements is not None else None
+        if entry is not None:
+            try:
+                entry[1].close()
+            except Exception:
+                pass
+
+    def _limit(self, conn, timeout):
+        """Set ``conn``'s max_execution_time for ``timeout`` seconds; False if the server can't enforce it."""
+        if not self.server_timeouts:
+            return False
+        ms = int(timeout * 1000) if timeout else 0
+        if self._time_limits.get(conn, 0) != ms:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"SET SESSION max_execution_time = {ms}")
+            except Exception as e:
+                if getattr(e, 'errno', None) != ER_UNKNOWN_SYSTEM_VARIABLE:
+                    raise
+                self.server_timeouts = False
+                return False
+            finally:
+                cursor.close()
+            self._time_limits[conn] = ms
+        return bool(ms)
+
+    def _kill(self, connection_id):
+        # From a connection of its own: the pool may be exhausted by the very
+        # queries that need killing.
+        with self._kill_lock:
+            for attempt in range(2):
+                if self._killer is None:
+                    self._killer = self.pool.connect()
+                try:
+                    cursor = self._killer.cursor()
+                    cursor.execute(f"KILL QUERY {int(connection_id)}")
+                    cursor.close()
+                    break
+                except Exception:
+                    self.pool.close_quietly(self._killer)
+                    self._killer = None
+                    if attempt:
+                        raise
+        with self._lock:
+            self._stats['kills'] += 1
+
+    def _execute(self, conn, query, params):
+        from database.db import fetch_arrow
+
+        if params is None:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                return fetch_arrow(cursor)
+            finally:
+                cursor.close()
+        operation, cursor = self._prepared(conn, query)
+        try:
+            cursor.execute(operation, tuple(params))
+            return fetch_arrow(cursor)
+        except Exception:
+            self._forget(conn, query)
+            raise
+
+    def execute(self, query, params=None, timeout=None, cancel=None):
+        with self.pool.connection() as conn:
+            limit = timeout + KILL_GRACE if self._limit(conn, timeout) else timeout
+            connection_id = conn.connection_id
+            try:
+                with guard(lambda: self._kill(connection_id), limit, cancel):
+                    return self._execute(conn, query, params)
+            except Exception as e:
+                if getattr(e, 'errno', None) == ER_QUERY_TIMEOUT:
+                    raise timeout_error(timeout) from e
+                raise
+
+    def iter_batches(self, query, params=None, batch_size=None):
+        """Yield record batches; the connection stays checked out until the iterator is done."""
+        from database.db import FETCH_BATCH_SIZE, fetch_batches
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            finished = False
+            try:
+                cursor.execute(query, params or ())
+                yield from fetch_batches(cursor, batch_size or FETCH_BATCH_SIZE)
+                finished = True
+            finally:
+                if not finished and conn.unread_result:
+                    # Drain what the server already sent so the connection can be reused.
+                    conn.consume_results()
+                cursor.close()
+
+    def explain(self, query, params=None, analyze=False):
+        """The plan as text: EXPLAIN ANALYZE (runs the query) or EXPLAIN FORMAT=TREE."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                try:
+                    cursor.execute(f"EXPLAIN {'ANALYZE' if analyze else 'FORMAT=TREE'} {query}", params or ())
+                    return '\n'.join(row[0] for row in cursor.fetchall())
+                except Exception as e:
+                    if getattr(e, 'errno', None) != ER_PARSE_ERROR:
+                        raise
+                # Servers without tree output (MySQL < 8.0.16, MariaDB): tabular EXPLAIN.
+                cursor.execute(f"EXPLAIN {query}", params or ())
+                names = [column[0] for column in cursor.description]
+                return '\n'.join(' | '.join(f'{name}={value}' for name, value in zip(names, row))
+                                 for row in cursor.fetchall())
+            finally:
+                cursor.close()
+
+    def data_version(self):
+        with self.pool.connection() as conn:
+            return read_data_version(conn)
+
+    def stats(self):
+        with self._lock:
+            prepared = dict(self._stats)
+        return {'backend': self.name, **prepared, **self.pool.stats()}
+
+
+# ------------------------------
+# DuckDB
+# ------------------------------
+def _arrow_table(cursor):
+    # DuckDB 1.4 renamed fetch_arrow_table/fetch_record_batch.
+    return cursor.to_arrow_table() if hasattr(cursor, 'to_arrow_table') else cursor.fetch_arrow_table()
+
+
+def _arrow_reader(cursor, batch_size):
+    if hasattr(cursor, 'to_arrow_reader'):
+        return cursor.to_arrow_reader(batch_size)
+    return cursor.fetch_record_batch(batch_size)
+
+
+def _file_identity(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class DuckDBBackend:
+    """Read-only DuckDB database file, reopened when a rebuild replaces it.
+
+    ``build`` writes a new file next to the old one and renames it into
+    place, so the file's identity is the data version: the query cache sees
+    it change and the next query opens the new file.
+    """
+
+    name = 'duckdb'
+
+    def __init__(self, path=DUCKDB_PATH, threads=DUCKDB_THREADS):
+        import duckdb
+
+        self._duckdb = duckdb
+        self.path = path
+        self.threads = threads
+        self._conn = None
+        self._identity = None
+        self._lock = threading.Lock()
+        self._stats = {'queries': 0, 'opens': 0}
+
+    def _connection(self):
+        identity = _file_identity(self.path)
+        with self._lock:
+            if self._conn is None or identity != self._identity:
+                # duckdb.connect(path) would hand back the cached instance still
+                # holding the replaced file, so attach it to a fresh in-memory
+                # instance instead. The old one is left to the garbage collector:
+                # other threads may still be reading from cursors on it.
+                conn = self._duckdb.connect(':memory:', config={'threads': self.threads} if self.threads else {})
+                quoted = self.path.replace("'", "''")
+                conn.execute(f"ATTACH '{quoted}' AS {CATALOG} (READ_ONLY)")
+                self._conn = conn
+                self._identity = identity
+                self._stats['opens'] += 1
+            self._stats['queries'] += 1
+            return self._conn
+
+    @contextmanager
+    def cursor(self):
+        # A DuckDB connection must not be shared between threads; cursors are
+        # cheap per-query handles on the same instance.
+        cursor = self._connection().cursor()
+        try:
+            cursor.execute(f"USE {CATALOG}")
+            yield cursor
+        finally:
+            cursor.close()
+
+    def execute(self, query, params=None, timeout=None, cancel=None):
+        with self.cursor() as cursor, guard(cursor.interrupt, timeout, cancel):
+            cursor.execute(to_qmark(query, params), list(params or ()))
+            return _arrow_table(cursor)
+
+    def iter_batches(self, query, params=None, batch_size=None):
+        from database.db import FETCH_BATCH_SIZE
+
+        with self.cursor() as cursor:
+            cursor.execute(to_qmark(query, params), list(params or ()))
+            yield from _arrow_reader(cursor, batch_size or FETCH_BATCH_SIZE)
+
+    def explain(self, query, params=None, analyze=False):
+        with self.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {'ANALYZE ' if analyze else ''}{to_qmark(query, params)}", list(params or ()))
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def data_version(self):
+        return ('file',) + _file_identity(self.path)
+
+    def stats(self):
+        with self._lock:
+            return {'backend': self.name, 'path': self.path, **self._stats}
+
+
+# ------------------------------
+# Building the DuckDB File
+# ------------------------------
+def _table_ddl(table):
+    columns = ', '.join(f"{column} {COLUMN_TYPES.get(column, 'VARCHAR')}" for column in gho.TABLE_COLUMNS[table])
+    return f"CREATE TABLE {table}_staging ({columns})"
+
+
+def _stage_from_mysql(conn, table):
+    from database.db import get_pool
+
+    source = MySQLBackend(get_pool())
+    for batch in source.iter_batches(f"SELECT {', '.join(gho.TABLE_COLUMNS[table])} FROM {table}"):
+        # DuckDB reads the Arrow batch straight from the local variable.
+        conn.execute(f"INSERT INTO {table}_staging SELECT * FROM batch")
+
+
+def _stage_from_files(conn, table, directory):
+    columns = ', '.join(gho.TABLE_COLUMNS[table])
+    parquet = os.path.join(directory, f'{table}.parquet')
+    if os.path.exists(parquet):
+        conn.execute(f"INSERT INTO {table}_staging SELECT {columns} FROM read_parquet(?)", [parquet])
+    else:
+        conn.execute(f"INSERT INTO {table}_staging SELECT {columns} FROM read_csv(?, header = true)",
+                     [os.path.join(directory, f'{table}.csv')])
+
+
+def build(source, path=DUCKDB_PATH):
+    """Build the DuckDB file from MySQL (``source='mysql'``) or a directory of table files.
+
+    Returns rows per table. The new file replaces ``path`` atomically.
+    """
+    import duckdb
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    partial = path + '.building'
+    if os.path.exists(partial):
+        os.remove(partial)
+    conn = duckdb.connect(partial)
+    try:
+        for table in gho.TABLE_COLUMNS:
+            conn.execute(_table_ddl(table))
+            if source == 'mysql':
+                _stage_from_mysql(conn, table)
+            else:
+                _stage_from_files(conn, table, source)
+            conn.execute(f"CREATE TABLE {table} AS SELECT * FROM {table}_staging ORDER BY {SORT_KEY}")
+            conn.execute(f"DROP TABLE {table}_staging")
+        # Same pre-joined table the MySQL Combined queries read, without the B-tree indexes.
+        conn.execute(re.sub(r',\s*INDEX \w+ \([^)]*\)', '', materialize.COMBINED_DDL))
+        conn.execute(f"INSERT INTO {materialize.COMBINED_TABLE} ({materialize.COMBINED_COLUMNS}) "
+                     f"{materialize.COMBINED_SELECT} ORDER BY o.Gender, o.age_group, o.Year")
+        tables = list(gho.TABLE_COLUMNS) + [materialize.COMBINED_TABLE]
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables}
+        conn.execute("CHECKPOINT")
+    finally:
+        conn.close()
+    os.replace(partial, path)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_parser = sub.add_parser('build', help='(re)build the DuckDB file')
+    build_parser.add_argument('--from', dest='source', required=True,
+                              help="'mysql' or a directory of <table>.parquet / <table>.csv files")
+    build_parser.add_argument('--path', default=DUCKDB_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = build(args.source, args.path)
+    for table, rows in counts.items():
+        print(f"{table:<20} {rows:>12,} rows")
+    print(f"Built {args.path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,352 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from database.watchdog import CHECK_INTERVAL, QueryCancelledError, QueryTimeoutError, cancelled_error, timeout_error
+
+# ------------------------------
+# Data Version
+# ------------------------------
+# Loaders bump this single row whenever `obesity` or `malnutrition` change,
+# which is far cheaper to poll than checksumming both tables.
+DATA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        id TINYINT PRIMARY KEY,
+        version BIGINT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+DATA_VERSION_QUERY = "SELECT version FROM data_version WHERE id = 1"
+CHECKSUM_QUERY = "CHECKSUM TABLE obesity, malnutrition"
+
+NO_SUCH_TABLE = 1146
+
+
+def read_data_version(conn):
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.execute(DATA_VERSION_QUERY)
+            row = cursor.fetchone()
+            if row is not None:
+                return ('version', row[0])
+        except Exception as e:
+            if getattr(e, 'errno', None) != NO_SUCH_TABLE:
+                raise
+        # No version row yet: fall back to the table checksums.
+        cursor.execute(CHECKSUM_QUERY)
+        return ('checksum',) + tuple(row[1] for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def create_data_version_table(conn):
+    # DDL commits implicitly in MySQL, so run this before opening a load transaction.
+    cursor = conn.cursor()
+    try:
+        cursor.execute(DATA_VERSION_DDL)
+    finally:
+        cursor.close()
+
+
+def bump_data_version(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO data_version (id, version) VALUES (1, 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1"
+        )
+        cursor.execute(DATA_VERSION_QUERY)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+# ------------------------------
+# Cache Keys
+# ------------------------------
+_WHITESPACE = re.compile(r'\s+')
+_CACHEABLE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+
+def normalize_sql(query):
+    return _WHITESPACE.sub(' ', query).strip().rstrip(';').rstrip()
+
+
+def cache_key(query, params=None):
+    """Return the cache key for a read query, or None if it must not be cached."""
+    if not _CACHEABLE.match(query):
+        return None
+    if isinstance(params, dict):
+        params = tuple(sorted(params.items()))
+    elif params is not None:
+        params = tuple(params)
+    return (normalize_sql(query), params)
+
+
+def frame_size(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# ------------------------------
+# Query Result Cache
+# ------------------------------
+class QueryCache:
+    """LRU cache of query results shared by every session in the process.
+
+    Entries expire after ``ttl`` seconds and the least recently used ones are
+    evicted once the cached frames exceed ``max_bytes``. Every
+    ``version_check`` seconds ``version_fn`` is polled and the whole cache is
+    dropped when the data version it returns changes. Cached frames are shared
+    between callers and must be treated as read-only.
+
+    With ``stale_ttl`` set, expired and invalidated entries stay until LRU
+    eviction or until they are ``stale_ttl`` seconds old. ``get`` never
+    returns them, but ``get_stale`` does, for when the database can't answer.
+    """
+
+    def __init__(self, max_bytes, ttl, version_check, version_fn=None, stale_ttl=0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version_check = version_check
+        self.stale_ttl = stale_ttl
+        self._version_fn = version_fn
+        self._version = None
+        self._version_checked_at = None
+        self._version_lock = threading.Lock()
+        self._entries = OrderedDict()    # key -> (df, size, stored_at)
+        self._bytes = 0
+        self.generation = 0             # bumped on invalidation
+        self._invalidated_at = None     # entries stored before this are stale
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'version_checks': 0,
+            'stale_hits': 0,
+        }
+
+    def _check_version(self):
+        if self._version_fn is None:
+            return
+        now = time.monotonic()
+        checked_at = self._version_checked_at
+        if checked_at is not None and now - checked_at < self.version_check:
+            return
+        # Only one thread polls the database; the others keep serving.
+        if not self._version_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                version = self._version_fn()
+            except Exception:
+                # Keep serving what we have if the database can't be reached.
+                self._version_checked_at = time.monotonic()
+                return
+            self._version_checked_at = time.monotonic()
+            with self._lock:
+                self._stats['version_checks'] += 1
+            if version != self._version:
+                if self._version is not None:
+                    self.invalidate()
+                self._version = version
+        finally:
+            self._version_lock.release()
+
+    def get(self, key):
+        self._check_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            df, _, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.ttl or (self._invalidated_at is not None and stored_at <= self._invalidated_at):
+                if age > max(self.ttl, self.stale_ttl):
+                    self._drop(key)
+                if age > self.ttl:
+                    self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return df
+
+    def get_stale(self, key):
+        """(df, age in seconds) for ``key`` even if expired or invalidated, within ``stale_ttl``; else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self.stale_ttl:
+                return None
+            df, _, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.stale_ttl:
+                self._drop(key)
+                return None
+            self._stats['stale_hits'] += 1
+            return df, age
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def put(self, key, df, generation=None):
+        size = frame_size(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A result fetched before an invalidation may already be stale.
+            if generation is not None and generation != self.generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (df, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats['evictions'] += 1
+
+    def subscribe(self, callback):
+        """Call ``callback()`` whenever the cache is invalidated."""
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        with self._lock:
+            if self.stale_ttl > 0:
+                self._invalidated_at = time.monotonic()
+            else:
+                self._entries.clear()
+                self._bytes = 0
+            self.generation += 1
+            self._stats['invalidations'] += 1
+        for callback in self._listeners:
+            callback()
+
+    def entries(self):
+        """(key, df, bytes, age in seconds, stale) for every entry, most recently used first."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, df, size, now - stored_at,
+                     now - stored_at > self.ttl
+                     or (self._invalidated_at is not None and stored_at <= self._invalidated_at))
+                    for key, (df, size, stored_at) in reversed(self._entries.items())]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            now = time.monotonic()
+            stats['stale_entries'] = sum(
+                1 for _, _, stored_at in self._entries.values()
+                if now - stored_at > self.ttl
+                or (self._invalidated_at is not None and stored_at <= self._invalidated_at)
+            )
+            stats['bytes'] = self._bytes
+            stats['max_bytes'] = self.max_bytes
+            stats['data_version'] = self._version
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+# ------------------------------
+# Single Flight
+# ------------------------------
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while
+    it runs wait for it and get its result, or its exception. Nothing is
+    kept once the call returns: the cache holds results, this only holds
+    calls in progress.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}              # key -> _Flight
+        self._stats = {'executions': 0, 'collapsed': 0, 'errors': 0, 'retries': 0, 'max_waiters': 0}
+
+    def do(self, key, fn, *args, timeout=None, cancel=None):
+        """Return (result, True) if this call ran ``fn(*args)``, (result, False) if it shared another's.
+
+        A caller that waits gives up after its own ``timeout`` or once its
+        ``cancel`` event is set; the call it was waiting on carries on. If
+        that call timed out or was cancelled, the caller tries again itself
+        while its own deadline hasn't passed.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self._stats['executions'] += 1
+                else:
+                    flight.waiters += 1
+                    self._stats['collapsed'] += 1
+                    self._stats['max_waiters'] = max(self._stats['max_waiters'], flight.waiters)
+            if leader:
+                break
+            self._wait(flight, timeout, deadline, cancel)
+            if flight.error is None:
+                return flight.result, False
+            if not self._retry(flight.error, deadline, cancel):
+                raise flight.error
+            with self._lock:
+                self._stats['retries'] += 1
+        try:
+            flight.result = fn(*args)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, True
+
+    @staticmethod
+    def _retry(error, deadline, cancel):
+        """Whether another caller's timeout or cancel is no reason for this one to fail."""
+        if not isinstance(error, (QueryTimeoutError, QueryCancelledError)):
+            return False
+        if cancel is not None and cancel.is_set():
+            return False
+        return deadline is None or time.monotonic() < deadline
+
+    def _wait(self, flight, timeout, deadline, cancel):
+        while True:
+            waits = [CHECK_INTERVAL] if cancel is not None else []
+            if deadline is not None:
+                waits.append(max(deadline - time.monotonic(), 0))
+            if flight.done.wait(min(waits) if waits else None):
+                return
+            if cancel is not None and cancel.is_set():
+                raise cancelled_error()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise timeout_error(timeout)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._flights))
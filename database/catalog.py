@@ -0,0 +1,262 @@
+import os
+import re
+import threading
+from collections import namedtuple
+
+from database.cache import normalize_sql
+
+# ------------------------------
+# Query Catalog
+# ------------------------------
+# queries.sql is the single source of the dashboard SQL. Each statement is
+# introduced by a `-- name: <category>_<n>` line followed by a one-line
+# description comment and any `-- param:` / `-- keyset:` / `-- timeout:`
+# declarations.
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'queries.sql')
+
+CatalogQuery = namedtuple('CatalogQuery', ['id', 'category', 'description', 'template', 'params', 'keyset',
+                                           'timeout'])
+QueryParam = namedtuple('QueryParam', ['name', 'type', 'many', 'default'])
+
+CATEGORIES = {
+    'obesity': 'Obesity',
+    'malnutrition': 'Malnutrition',
+    'combined': 'Combined',
+}
+
+# type -> Python type of its values
+PARAM_TYPES = {
+    'year': int,
+    'number': float,
+    'country': str,
+    'region': str,
+}
+
+# Values the dashboard offers for each type; numbers are typed in.
+PARAM_CHOICES = {
+    'year': "SELECT Year FROM obesity UNION SELECT Year FROM malnutrition ORDER BY Year",
+    'country': "SELECT Country FROM obesity UNION SELECT Country FROM malnutrition ORDER BY Country",
+    'region': ("SELECT Region FROM obesity WHERE Region IS NOT NULL "
+               "UNION SELECT Region FROM malnutrition WHERE Region IS NOT NULL ORDER BY Region"),
+}
+
+_PARAM = re.compile(r'--\s*param:\s*(\w+)\s+(\w+)(\[\])?\s*=\s*(.+)$')
+_PLACEHOLDER = re.compile(r'%\((\w+)\)s')
+_KEYSET = re.compile(r'^(\w+)(?:\s+(ASC|DESC))?$', re.IGNORECASE)
+_LIMIT = re.compile(r'\s+LIMIT\s+\d+\s*$', re.IGNORECASE)
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def _parse_param(line):
+    match = _PARAM.match(line)
+    if match is None or match.group(2) not in PARAM_TYPES:
+        raise CatalogError(f"Bad parameter declaration: {line!r}")
+    name, type_name, many, default = match.groups()
+    convert = PARAM_TYPES[type_name]
+    if many:
+        return QueryParam(name, type_name, True, tuple(convert(v.strip()) for v in default.split(',')))
+    return QueryParam(name, type_name, False, convert(default.strip()))
+
+
+def _parse_keyset(query_id, line):
+    keyset = []
+    for part in line[len('-- keyset:'):].split(','):
+        match = _KEYSET.match(part.strip())
+        if match is None:
+            raise CatalogError(f"{query_id}: bad keyset column {part.strip()!r}")
+        keyset.append((match.group(1), (match.group(2) or '').upper() == 'DESC'))
+    return tuple(keyset)
+
+
+def _finish(query_id, lines):
+    description, params, keyset, timeout = [], [], (), None
+    while lines and lines[0].startswith('--'):
+        line = lines.pop(0)
+        if line.startswith('-- param:'):
+            params.append(_parse_param(line))
+        elif line.startswith('-- keyset:'):
+            keyset = _parse_keyset(query_id, line)
+        elif line.startswith('-- timeout:'):
+            timeout = float(line[len('-- timeout:'):])
+        else:
+            description.append(line[2:].strip())
+    # Drop the section banners and blank lines that trail each statement.
+    while lines and (not lines[-1].strip() or lines[-1].startswith('--')):
+        lines.pop()
+    template = '\n'.join(lines)
+    declared = {p.name for p in params}
+    used = set(_PLACEHOLDER.findall(template))
+    if used != declared:
+        raise CatalogError(f"{query_id}: placeholders {sorted(used)} don't match parameters {sorted(declared)}")
+    missing = [column for column, _ in keyset if not re.search(rf'\b{column}\b', template)]
+    if missing:
+        raise CatalogError(f"{query_id}: keyset columns {missing} aren't in the query")
+    category = CATEGORIES[query_id.split('_', 1)[0]]
+    return CatalogQuery(query_id, category, ' '.join(description), template, tuple(params), keyset, timeout)
+
+
+def load_catalog(path=CATALOG_PATH):
+    queries = {}
+    query_id, lines = None, []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip()
+            if line.startswith('-- name:'):
+                if query_id is not None:
+                    queries[query_id] = _finish(query_id, lines)
+                query_id, lines = line[len('-- name:'):].strip(), []
+            elif query_id is not None:
+                lines.append(line)
+    if query_id is not None:
+        queries[query_id] = _finish(query_id, lines)
+    return queries
+
+
+QUERIES = load_catalog()
+
+
+# ------------------------------
+# Binding Parameters
+# ------------------------------
+# Each placeholder becomes a positional %s (one per item for lists), the
+# form both mysql.connector's prepared cursors and the DuckDB shim take. The
+# SQL text therefore only changes with list lengths, so a handful of
+# statements per query are prepared no matter which values users pick.
+_bound = {}                 # (query_id, list lengths) -> (sql, [(name, length or None)])
+_by_sql = {}                # normalized sql -> (query_id, layout)
+_bind_lock = threading.Lock()
+
+
+def defaults(query_id):
+    return {p.name: p.default for p in QUERIES[query_id].params}
+
+
+def _coerce(param, value):
+    convert = PARAM_TYPES[param.type]
+    if param.many:
+        values = tuple(convert(v) for v in value)
+        if not values:
+            raise CatalogError(f"{param.name} needs at least one value")
+        return values
+    return convert(value)
+
+
+def _statement(query, lengths):
+    key = (query.id, tuple(sorted(lengths.items())))
+    statement = _bound.get(key)
+    if statement is None:
+        layout = []
+
+        def expand(match):
+            name = match.group(1)
+            length = lengths.get(name)
+            layout.append((name, length))
+            return '%s' if length is None else ', '.join(['%s'] * length)
+
+        sql = _PLACEHOLDER.sub(expand, query.template)
+        with _bind_lock:
+            statement = _bound.setdefault(key, (sql, layout))
+            _by_sql.setdefault(normalize_sql(statement[0]), (query.id, statement[1]))
+    return statement
+
+
+def bind(query_id, values=None):
+    """(sql, params) for a catalog query; missing values fall back to the declared defaults."""
+    query = QUERIES[query_id]
+    values = {**defaults(query_id), **(values or {})}
+    unknown = set(values) - {p.name for p in query.params}
+    if unknown:
+        raise CatalogError(f"{query_id} has no parameter {', '.join(sorted(unknown))}")
+    values = {p.name: _coerce(p, values[p.name]) for p in query.params}
+    lengths = {p.name: len(values[p.name]) for p in query.params if p.many}
+    sql, layout = _statement(query, lengths)
+    params = []
+    for name, length in layout:
+        params.extend(values[name] if length is not None else [values[name]])
+    return sql, tuple(params)
+
+
+def unbind(query, params):
+    """(query_id, values) for SQL and params produced by ``bind``, or None for any other query."""
+    match = _by_sql.get(normalize_sql(query))
+    if match is None:
+        return None
+    query_id, layout = match
+    params = list(params or ())
+    if len(params) != sum(1 if length is None else length for _, length in layout):
+        return None
+    values = {}
+    for name, length in layout:
+        if length is None:
+            values[name] = params.pop(0)
+        else:
+            values[name], params = tuple(params[:length]), params[length:]
+    return query_id, values
+
+
+# ------------------------------
+# Keyset Pages
+# ------------------------------
+# A query with a `-- keyset:` declaration can be read in full, one page at a
+# time. Its declared sort columns end in a unique tie-breaker, so the last
+# row of a page identifies where the next one starts. The page SQL seeks
+# past that row instead of counting an OFFSET, so every page costs about
+# the same however deep it is. The query's own LIMIT is dropped.
+_pages = {}                 # normalized page sql -> query_id, for lookup() only
+
+
+def _after(keyset, after):
+    """WHERE clause and params for rows sorting after ``after`` (one value per keyset column)."""
+    terms, params = [], []
+    for i, (column, descending) in enumerate(keyset):
+        equal = [f"{name} = %s" for name, _ in keyset[:i]]
+        terms.append('(' + ' AND '.join(equal + [f"{column} {'<' if descending else '>'} %s"]) + ')')
+        params.extend(after[:i + 1])
+    return ' OR '.join(terms), params
+
+
+def page(query_id, values=None, after=None, size=100):
+    """(sql, params) for up to ``size + 1`` rows of a keyset query, starting after the ``after`` key.
+
+    The extra row only tells the caller whether another page follows.
+    """
+    query = QUERIES[query_id]
+    if not query.keyset:
+        raise CatalogError(f"{query_id} has no keyset")
+    sql, params = bind(query_id, values)
+    source = _LIMIT.sub('', sql.strip().rstrip(';').rstrip())
+    lines = [f"SELECT * FROM (\n{source}\n) AS page_source"]
+    params = list(params)
+    if after is not None:
+        where, after_params = _after(query.keyset, list(after))
+        lines.append(f"WHERE {where}")
+        params.extend(after_params)
+    order = ', '.join(f"{column}{' DESC' if descending else ''}" for column, descending in query.keyset)
+    lines.append(f"ORDER BY {order}")
+    lines.append(f"LIMIT {int(size) + 1}")
+    sql = '\n'.join(lines)
+    _pages.setdefault(normalize_sql(sql), query_id)
+    return sql, tuple(params)
+
+
+def get_sql(query_id):
+    """SQL of a catalog query bound with its default values (placeholders left in)."""
+    return bind(query_id)[0]
+
+
+def lookup(query):
+    """Return the catalog id of a SQL string, or None if it isn't a catalog query."""
+    normalized = normalize_sql(query)
+    match = _by_sql.get(normalized)
+    return match[0] if match else _pages.get(normalized)
+
+
+def category_queries(category):
+    return [q for q in QUERIES.values() if q.category == category]
+
+
+for _query_id in QUERIES:
+    bind(_query_id)
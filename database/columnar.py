@@ -0,0 +1,571 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# In-Memory Columnar Engine
+# ------------------------------
+# Both fact tables are small enough to keep in memory as NumPy columns. The
+# engine answers every catalog query with vectorized filters, group-bys,
+# top-k and a precomputed obesity x malnutrition join, and returns frames
+# with the same columns, rows and ordering as the SQL in queries.sql.
+# Averages are sums divided by counts in scan order, as in MySQL, so they
+# agree with the database up to floating-point rounding.
+
+DIMENSIONS = ['Country', 'Region', 'Gender', 'age_group']
+MEASURES = ['Mean_Estimate', 'CI_Width']
+LEVELS = {'obesity': 'obesity_level', 'malnutrition': 'malnutrition_level'}
+JOIN_KEYS = ['Country', 'Year', 'Gender', 'age_group']
+
+TABLE_QUERIES = {
+    table: f"SELECT Country, Region, Year, Gender, age_group, Mean_Estimate, CI_Width, {level} FROM {table}"
+    for table, level in LEVELS.items()
+}
+
+
+def _fold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def _encode(*columns):
+    """Dictionary-encode the same dimension across tables with one shared dictionary.
+
+    Strings that differ only in case share a code and keep the first spelling
+    seen, as they group and compare under MySQL's case-insensitive collations.
+    Returns one int64 code array per input (-1 for NULL), the labels and a
+    rank per label that sorts like ORDER BY does.
+    """
+    combined = pd.concat([pd.Series(c, dtype=object) for c in columns], ignore_index=True)
+    codes, spellings = pd.factorize(combined, use_na_sentinel=True)
+    folded = {}
+    merge = np.array([folded.setdefault(_fold(v), len(folded)) for v in spellings], dtype=np.int64)
+    codes = np.append(merge, -1)[codes]     # NULL's -1 picks the appended -1
+    # factorize numbers spellings by first appearance, so the first of each group is the first seen.
+    _, first = np.unique(merge, return_index=True)
+    labels = np.asarray(spellings, dtype=object)[first]
+    order = sorted(range(len(labels)), key=lambda i: str(labels[i]).casefold())
+    rank = np.empty(len(labels), dtype=np.int64)
+    rank[order] = np.arange(len(labels))
+    split = np.cumsum([len(c) for c in columns])[:-1]
+    return np.split(codes, split), labels, rank
+
+
+class Column:
+    """A dictionary-encoded string column."""
+
+    def __init__(self, codes, labels, rank):
+        self.codes = codes
+        self.labels = labels
+        self.rank = rank
+        self._lookup = {_fold(label): i for i, label in enumerate(labels)}
+
+    def code(self, value):
+        # Case-insensitive, as the SQL backends compare; -2 never matches, not even NULL.
+        return self._lookup.get(_fold(value), -2)
+
+    def eq(self, value):
+        return self.codes == self.code(value)
+
+    def isin(self, values):
+        return np.isin(self.codes, [self.code(v) for v in values])
+
+    def notnull(self):
+        return self.codes >= 0
+
+    def decode(self, codes):
+        out = np.empty(len(codes), dtype=object)
+        valid = codes >= 0
+        out[valid] = self.labels[codes[valid]]
+        out[~valid] = None
+        return out
+
+    def sort_key(self, codes):
+        # NULLs sort first, as in MySQL.
+        return np.where(codes >= 0, self.rank[np.maximum(codes, 0)], -1)
+
+
+class Table:
+    def __init__(self, n, columns, year, measures):
+        self.n = n
+        self.columns = columns      # name -> Column
+        self.year = year
+        self.measures = measures    # name -> float64 array
+
+    def take(self, idx):
+        columns = {name: Column(c.codes[idx], c.labels, c.rank) for name, c in self.columns.items()}
+        measures = {name: m[idx] for name, m in self.measures.items()}
+        return Table(len(idx), columns, self.year[idx], measures)
+
+    def __getitem__(self, name):
+        if name == 'Year':
+            return self.year
+        if name in self.measures:
+            return self.measures[name]
+        return self.columns[name]
+
+    def key(self, name):
+        """Integer group-by key for a column."""
+        column = self[name]
+        return column.codes if isinstance(column, Column) else column
+
+
+class Result:
+    """Columns of an intermediate result plus the keys used to sort them."""
+
+    def __init__(self):
+        self.values = {}
+        self.sort_keys = {}
+
+    def add(self, name, values, sort_key=None):
+        self.values[name] = values
+        self.sort_keys[name] = values if sort_key is None else sort_key
+
+    def __len__(self):
+        return len(next(iter(self.values.values()))) if self.values else 0
+
+    def filter(self, mask):
+        out = Result()
+        for name in self.values:
+            out.add(name, self.values[name][mask], self.sort_keys[name][mask])
+        return out
+
+    def frame(self, columns, order=(), limit=None):
+        """Sort by ``order`` [(column, descending)], apply LIMIT and build the frame."""
+        if order and len(self):
+            keys = []
+            for name, descending in reversed(order):
+                key = np.asarray(self.sort_keys[name], dtype=np.float64)
+                null = np.isnan(key)
+                if descending:
+                    key = -key
+                # NULLs first ascending, last descending.
+                keys.append(np.where(null, np.inf if descending else -np.inf, key))
+            idx = np.lexsort(keys)
+        else:
+            idx = np.arange(len(self))
+        if limit is not None:
+            idx = idx[:limit]
+        return pd.DataFrame({name: self.values[name][idx] for name in columns}, columns=columns)
+
+
+def _groups(table, mask, by):
+    """Group the rows selected by ``mask`` on the ``by`` columns.
+
+    Returns the selected row indices, the group index of each of those rows,
+    the number of groups and the key values of each group.
+    """
+    rows = np.flatnonzero(mask)
+    if not by:
+        return rows, np.zeros(len(rows), dtype=np.int64), 1, []
+    if not len(rows):
+        return rows, rows, 0, [np.empty(0, dtype=np.int64) for _ in by]
+    parts = [np.asarray(table.key(name), dtype=np.int64)[rows] for name in by]
+    # Pack the keys into one int64 (shifted so NULL codes are non-negative)
+    # so a single 1-D unique finds the groups.
+    lows = [int(p.min()) for p in parts]
+    bases = [int(p.max()) - low + 1 for p, low in zip(parts, lows)]
+    packed = np.zeros(len(rows), dtype=np.int64)
+    for part, low, base in zip(parts, lows, bases):
+        packed = packed * base + (part - low)
+    unique, inverse = np.unique(packed, return_inverse=True)
+    keys = []
+    for low, base in reversed(list(zip(lows, bases))):
+        keys.append(unique % base + low)
+        unique = unique // base
+    return rows, inverse.reshape(-1), len(keys[0]), keys[::-1]
+
+
+class Aggregator:
+    def __init__(self, table, mask, by):
+        self.table = table
+        self.by = by
+        self.rows, self.group, self.n, self.keys = _groups(table, mask, by)
+        self._order = np.argsort(self.group, kind='stable')
+        self._starts = np.searchsorted(self.group[self._order], np.arange(self.n))
+
+    def _values(self, name, mask, table):
+        """Values of the grouped rows and which of them count (non-NULL and in ``mask``)."""
+        values = np.asarray((self.table if table is None else table)[name][self.rows], dtype=np.float64)
+        valid = ~np.isnan(values)
+        if mask is not None:
+            valid &= mask[self.rows]
+        return values, valid
+
+    def count(self, mask=None):
+        weights = None if mask is None else mask[self.rows].astype(np.float64)
+        return np.bincount(self.group, weights=weights, minlength=self.n).astype(np.int64)
+
+    def sum(self, name, mask=None, table=None):
+        values, valid = self._values(name, mask, table)
+        return np.bincount(self.group, weights=np.where(valid, values, 0.0), minlength=self.n)
+
+    def avg(self, name, mask=None, table=None):
+        values, valid = self._values(name, mask, table)
+        total = np.bincount(self.group, weights=np.where(valid, values, 0.0), minlength=self.n)
+        count = np.bincount(self.group, weights=valid.astype(np.float64), minlength=self.n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+    def _reduce(self, ufunc, name, mask, table, empty):
+        values, valid = self._values(name, mask, table)
+        if not self.n:
+            return np.empty(0)
+        if not len(values):
+            return np.full(self.n, np.nan)
+        values = np.where(valid, values, empty)
+        out = ufunc.reduceat(values[self._order], self._starts)
+        return np.where(out == empty, np.nan, out)
+
+    def min(self, name, mask=None, table=None):
+        return self._reduce(np.minimum, name, mask, table, np.inf)
+
+    def max(self, name, mask=None, table=None):
+        return self._reduce(np.maximum, name, mask, table, -np.inf)
+
+    def count_distinct(self, name):
+        codes = np.asarray(self.table.key(name), dtype=np.int64)[self.rows]
+        valid = codes >= 0
+        base = int(codes.max(initial=0)) + 1
+        pairs = np.unique(self.group[valid] * base + codes[valid])
+        return np.bincount(pairs // base, minlength=self.n).astype(np.int64)
+
+    def result(self):
+        out = Result()
+        for name, key in zip(self.by, self.keys):
+            column = self.table[name]
+            if isinstance(column, Column):
+                out.add(name, column.decode(key), column.sort_key(key))
+            else:
+                out.add(name, key.astype(column.dtype))
+        return out
+
+
+def _rows(table, mask, columns, rename=None):
+    """Project the rows selected by ``mask`` without grouping."""
+    rows = np.flatnonzero(mask)
+    out = Result()
+    for name in columns:
+        column = table[name]
+        alias = (rename or {}).get(name, name)
+        if isinstance(column, Column):
+            codes = column.codes[rows]
+            out.add(alias, column.decode(codes), column.sort_key(codes))
+        else:
+            out.add(alias, column[rows])
+    return out
+
+
+def _inner_join(left, right):
+    """Vectorized equi-join on integer keys; returns matching (left, right) row pairs."""
+    order = np.argsort(right, kind='stable')
+    sorted_right = right[order]
+    lo = np.searchsorted(sorted_right, left, side='left')
+    hi = np.searchsorted(sorted_right, left, side='right')
+    counts = hi - lo
+    left_idx = np.repeat(np.arange(len(left)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    right_idx = order[np.repeat(lo, counts) + offsets]
+    return left_idx, right_idx
+
+
+class ColumnarEngine:
+    """Answers the catalog queries from in-memory columns instead of MySQL."""
+
+    def __init__(self, obesity, malnutrition):
+        encoded = {}
+        for name in DIMENSIONS:
+            encoded[name] = _encode(obesity[name], malnutrition[name])
+        self.tables = {}
+        for i, (table_name, frame) in enumerate([('obesity', obesity), ('malnutrition', malnutrition)]):
+            columns = {}
+            for name in DIMENSIONS:
+                codes, labels, rank = encoded[name]
+                columns[name] = Column(codes[i], labels, rank)
+            level = LEVELS[table_name]
+            (level_codes,), labels, rank = _encode(frame[level])
+            columns[level] = Column(level_codes, labels, rank)
+            year = frame['Year'].to_numpy(dtype=np.int64)
+            measures = {name: pd.to_numeric(frame[name]).to_numpy(dtype=np.float64) for name in MEASURES}
+            self.tables[table_name] = Table(len(frame), columns, year, measures)
+        self._build_join()
+        self._handlers = {
+            'obesity_1': lambda year: self._top_regions('obesity', 'Avg_Obesity', year),
+            'obesity_2': lambda year: self._top_countries('obesity', year),
+            'obesity_3': self._obesity_3,
+            'obesity_4': lambda: self._avg_by('obesity', 'Gender', 'Avg_Obesity'),
+            'obesity_5': self._obesity_5,
+            'obesity_6a': self._obesity_6a,
+            'obesity_6b': self._obesity_6b,
+            'obesity_7': lambda: self._avg_by('obesity', 'age_group', 'Avg_Obesity'),
+            'obesity_8': self._obesity_8,
+            'obesity_9': self._obesity_9,
+            'obesity_10': self._obesity_10,
+            'malnutrition_1': lambda: self._avg_by('malnutrition', 'age_group', 'Avg_Malnutrition'),
+            'malnutrition_2': lambda year: self._top_countries('malnutrition', year),
+            'malnutrition_3': self._malnutrition_3,
+            'malnutrition_4': lambda: self._avg_by('malnutrition', 'Gender', 'Avg_Malnutrition'),
+            'malnutrition_5': self._malnutrition_5,
+            'malnutrition_6': self._malnutrition_6,
+            'malnutrition_7': self._malnutrition_7,
+            'malnutrition_8': self._malnutrition_8,
+            'malnutrition_9': self._malnutrition_9,
+            'malnutrition_10': self._malnutrition_10,
+            'combined_1': self._combined_1,
+            'combined_2': self._combined_2,
+            'combined_3': self._combined_3,
+            'combined_4': self._combined_4,
+            'combined_5': self._combined_5,
+        }
+
+    @classmethod
+    def from_frames(cls, frames):
+        return cls(frames['obesity'], frames['malnutrition'])
+
+    # ------------------------------
+    # Public API
+    # ------------------------------
+    def supports(self, query_id):
+        return query_id in self._handlers
+
+    def run(self, query_id, values=None):
+        """Result of a catalog query for the parameter values ``bind`` was given."""
+        return self._handlers[query_id](**(values or {}))
+
+    def _build_join(self):
+        o, m = self.tables['obesity'], self.tables['malnutrition']
+        years, _, _ = _encode(o.year, m.year)
+        keys = []
+        for t, year_codes in ((o, years[0]), (m, years[1])):
+            parts = [t.columns['Country'].codes, year_codes, t.columns['Gender'].codes, t.columns['age_group'].codes]
+            keys.append((parts, np.all(np.stack(parts) >= 0, axis=0)))
+        # Mixed-radix key over the shared dictionaries; NULL keys never join.
+        radix = [max(int(np.max(np.concatenate([keys[0][0][i], keys[1][0][i]]), initial=0)) + 1, 1)
+                 for i in range(len(JOIN_KEYS))]
+        packed = []
+        for parts, valid in keys:
+            key = np.zeros(len(valid), dtype=np.int64)
+            for part, base in zip(parts, radix):
+                key = key * base + part
+            packed.append(np.where(valid, key, -1))
+        o_valid, m_valid = np.flatnonzero(packed[0] >= 0), np.flatnonzero(packed[1] >= 0)
+        li, ri = _inner_join(packed[0][o_valid], packed[1][m_valid])
+        self.join_o = o.take(o_valid[li])
+        self.join_m = m.take(m_valid[ri])
+
+    # ------------------------------
+    # Shared Shapes
+    # ------------------------------
+    def _avg_by(self, table_name, by, alias):
+        t = self.tables[table_name]
+        agg = Aggregator(t, t['Region'].notnull(), [by])
+        out = agg.result()
+        out.add(alias, agg.avg('Mean_Estimate'))
+        return out.frame([by, alias], order=[(alias, True)])
+
+    def _adult_both(self, t):
+        return t['Gender'].eq('Both') & t['age_group'].eq('Adult')
+
+    def _top_regions(self, table_name, alias, year):
+        t = self.tables[table_name]
+        agg = Aggregator(t, (t.year == year) & t['Region'].notnull(), ['Region'])
+        out = agg.result()
+        out.add(alias, agg.avg('Mean_Estimate'))
+        return out.frame(['Region', alias], order=[(alias, True)], limit=5)
+
+    def _top_countries(self, table_name, year):
+        t = self.tables[table_name]
+        mask = (t.year == year) & self._adult_both(t) & t['Region'].notnull()
+        out = _rows(t, mask, ['Country', 'Mean_Estimate'])
+        return out.frame(['Country', 'Mean_Estimate'], order=[('Mean_Estimate', True)], limit=5)
+
+    # ------------------------------
+    # Obesity
+    # ------------------------------
+    def _obesity_3(self, country):
+        t = self.tables['obesity']
+        out = _rows(t, t['Country'].eq(country) & self._adult_both(t), ['Year', 'Mean_Estimate'])
+        return out.frame(['Year', 'Mean_Estimate'], order=[('Year', False)])
+
+    def _obesity_5(self):
+        t = self.tables['obesity']
+        agg = Aggregator(t, t['Region'].notnull(), ['obesity_level', 'age_group'])
+        out = agg.result()
+        out.add('Country_Count', agg.count_distinct('Country'))
+        return out.frame(['obesity_level', 'age_group', 'Country_Count'],
+                         order=[('age_group', False), ('obesity_level', False)])
+
+    def _obesity_6a(self, year):
+        t = self.tables['obesity']
+        mask = (t.year == year) & self._adult_both(t) & t['Region'].notnull()
+        out = _rows(t, mask, ['Country', 'CI_Width', 'Mean_Estimate'])
+        return out.frame(['Country', 'CI_Width', 'Mean_Estimate'], order=[('CI_Width', True)], limit=5)
+
+    def _obesity_6b(self):
+        t = self.tables['obesity']
+        agg = Aggregator(t, self._adult_both(t) & t['Region'].notnull(), ['Country'])
+        out = agg.result()
+        out.add('Avg_CI_Width', agg.avg('CI_Width'))
+        return out.frame(['Country', 'Avg_CI_Width'], order=[('Avg_CI_Width', False)], limit=5)
+
+    def _obesity_8(self, max_obesity, max_ci_width):
+        t = self.tables['obesity']
+        agg = Aggregator(t, t['Region'].notnull() & self._adult_both(t), ['Country'])
+        out = agg.result()
+        out.add('Avg_Obesity', agg.avg('Mean_Estimate'))
+        out.add('Avg_CI_Width', agg.avg('CI_Width'))
+        out = out.filter((out.values['Avg_Obesity'] < max_obesity) & (out.values['Avg_CI_Width'] < max_ci_width))
+        return out.frame(['Country', 'Avg_Obesity', 'Avg_CI_Width'],
+                         order=[('Avg_Obesity', False), ('Avg_CI_Width', False)], limit=10)
+
+    def _obesity_9(self, min_difference):
+        t = self.tables['obesity']
+        mask = t['Region'].notnull() & t['Gender'].isin(['Female', 'Male']) & t['age_group'].eq('Adult')
+        agg = Aggregator(t, mask, ['Country', 'Year'])
+        out = agg.result()
+        female = agg.max('Mean_Estimate', t['Gender'].eq('Female'))
+        male = agg.max('Mean_Estimate', t['Gender'].eq('Male'))
+        out.add('Female_Obesity', female)
+        out.add('Male_Obesity', male)
+        out.add('Difference', female - male)
+        out = out.filter(out.values['Difference'] > min_difference)
+        return out.frame(['Country', 'Year', 'Female_Obesity', 'Male_Obesity', 'Difference'],
+                         order=[('Difference', True)], limit=10)
+
+    def _obesity_10(self):
+        t = self.tables['obesity']
+        agg = Aggregator(t, t['Country'].eq('Global') & self._adult_both(t), ['Year'])
+        out = agg.result()
+        out.add('Avg_Obesity', agg.avg('Mean_Estimate'))
+        return out.frame(['Year', 'Avg_Obesity'], order=[('Year', False)])
+
+    # ------------------------------
+    # Malnutrition
+    # ------------------------------
+    def _malnutrition_3(self, region):
+        t = self.tables['malnutrition']
+        agg = Aggregator(t, t['Region'].eq(region) & self._adult_both(t), ['Year'])
+        out = agg.result()
+        out.add('Avg_Malnutrition', agg.avg('Mean_Estimate'))
+        return out.frame(['Year', 'Avg_Malnutrition'], order=[('Year', False)])
+
+    def _malnutrition_5(self):
+        t = self.tables['malnutrition']
+        agg = Aggregator(t, t['Region'].notnull(), ['malnutrition_level', 'age_group'])
+        out = agg.result()
+        out.add('Avg_CI_Width', agg.avg('CI_Width'))
+        return out.frame(['malnutrition_level', 'age_group', 'Avg_CI_Width'],
+                         order=[('age_group', False), ('malnutrition_level', False)])
+
+    def _malnutrition_6(self, countries):
+        t = self.tables['malnutrition']
+        mask = t['Country'].isin(countries) & self._adult_both(t)
+        out = _rows(t, mask, ['Country', 'Year', 'Mean_Estimate'], rename={'Mean_Estimate': 'Malnutrition'})
+        return out.frame(['Country', 'Year', 'Malnutrition'], order=[('Country', False), ('Year', False)])
+
+    def _malnutrition_7(self):
+        t = self.tables['malnutrition']
+        agg = Aggregator(t, t['Region'].notnull() & self._adult_both(t), ['Region'])
+        out = agg.result()
+        out.add('Avg_Malnutrition', agg.avg('Mean_Estimate'))
+        return out.frame(['Region', 'Avg_Malnutrition'], order=[('Avg_Malnutrition', False)], limit=5)
+
+    def _malnutrition_8(self):
+        t = self.tables['malnutrition']
+        agg = Aggregator(t, t['Region'].notnull() & self._adult_both(t), ['Country'])
+        out = agg.result()
+        out.add('First_Year', agg.min('Year').astype(np.int64))
+        out.add('Last_Year', agg.max('Year').astype(np.int64))
+        low, high = agg.min('Mean_Estimate'), agg.max('Mean_Estimate')
+        out.add('Min_Malnutrition', low)
+        out.add('Max_Malnutrition', high)
+        out.add('Increase', high - low)
+        out = out.filter(out.values['Increase'] > 0)
+        return out.frame(['Country', 'First_Year', 'Last_Year', 'Min_Malnutrition', 'Max_Malnutrition', 'Increase'],
+                         order=[('Increase', True)], limit=10)
+
+    def _malnutrition_9(self):
+        t = self.tables['malnutrition']
+        agg = Aggregator(t, t['Region'].notnull() & self._adult_both(t), ['Year'])
+        out = agg.result()
+        out.add('Min_Malnutrition', agg.min('Mean_Estimate'))
+        out.add('Max_Malnutrition', agg.max('Mean_Estimate'))
+        return out.frame(['Year', 'Min_Malnutrition', 'Max_Malnutrition'], order=[('Year', False)])
+
+    def _malnutrition_10(self, min_ci_width):
+        t = self.tables['malnutrition']
+        mask = t['Region'].notnull() & self._adult_both(t) & (t['CI_Width'] > min_ci_width)
+        agg = Aggregator(t, mask, ['Country'])
+        out = agg.result()
+        out.add('Year', agg.max('Year').astype(np.int64))
+        out.add('Malnutrition', agg.avg('Mean_Estimate'))
+        out.add('CI_Width', agg.max('CI_Width'))
+        return out.frame(['Country', 'Year', 'Malnutrition', 'CI_Width'], order=[('CI_Width', True)], limit=10)
+
+    # ------------------------------
+    # Combined (served from the precomputed join)
+    # ------------------------------
+    def _joined_avg(self, mask, by):
+        o, m = self.join_o, self.join_m
+        agg = Aggregator(o, mask, by)
+        out = agg.result()
+        out.add('Avg_Obesity', agg.avg('Mean_Estimate'))
+        # Both sides of the join share row positions, so the obesity grouping
+        # applies to the malnutrition measures unchanged.
+        out.add('Avg_Malnutrition', agg.avg('Mean_Estimate', table=m))
+        return out
+
+    def _combined_1(self, year, countries):
+        o, m = self.join_o, self.join_m
+        mask = (o.year == year) & self._adult_both(o) & o['Country'].isin(countries)
+        out = _rows(o, mask, ['Country', 'Mean_Estimate'], rename={'Mean_Estimate': 'Obesity'})
+        out.add('Malnutrition', m['Mean_Estimate'][mask])
+        return out.frame(['Country', 'Obesity', 'Malnutrition'], order=[('Country', False)])
+
+    def _combined_2(self, year):
+        o, m = self.join_o, self.join_m
+        mask = ((o.year == year) & o['Gender'].isin(['Male', 'Female']) & o['age_group'].eq('Adult')
+                & o['Region'].notnull() & m['Region'].notnull())
+        out = self._joined_avg(mask, ['Gender'])
+        return out.frame(['Gender', 'Avg_Obesity', 'Avg_Malnutrition'], order=[('Gender', False)])
+
+    def _combined_3(self, region, other_region):
+        o, m = self.join_o, self.join_m
+        frames = []
+        for name in [region, other_region]:
+            mask = o['Region'].eq(name) & self._adult_both(o) & m['Region'].notnull()
+            out = self._joined_avg(mask, [])
+            out.add('Region', np.array([name], dtype=object))
+            frames.append(out.frame(['Region', 'Avg_Obesity', 'Avg_Malnutrition']))
+        return pd.concat(frames, ignore_index=True)
+
+    def _combined_4(self, min_obesity, max_malnutrition):
+        o, m = self.join_o, self.join_m
+        mask = self._adult_both(o) & o['Region'].notnull() & m['Region'].notnull()
+        out = self._joined_avg(mask, ['Country'])
+        out = out.filter((out.values['Avg_Obesity'] > min_obesity)
+                         & (out.values['Avg_Malnutrition'] < max_malnutrition))
+        return out.frame(['Country', 'Avg_Obesity', 'Avg_Malnutrition'],
+                         order=[('Avg_Obesity', True), ('Avg_Malnutrition', False)], limit=10)
+
+    def _combined_5(self):
+        o, m = self.join_o, self.join_m
+        mask = (o['Gender'].eq('Both') & o['age_group'].isin(['Adult', 'Child/Adolescent'])
+                & o['Region'].notnull() & m['Region'].notnull())
+        out = self._joined_avg(mask, ['Year', 'age_group'])
+        return out.frame(['Year', 'age_group', 'Avg_Obesity', 'Avg_Malnutrition'],
+                         order=[('Year', False), ('age_group', False)])
+
+
+# ------------------------------
+# Snapshots
+# ------------------------------
+# A Parquet copy of the last load lets the engine start while MySQL is down.
+def save_snapshot(frames, path):
+    os.makedirs(path, exist_ok=True)
+    for table, frame in frames.items():
+        frame.to_parquet(os.path.join(path, f'{table}.parquet'), index=False)
+
+
+def load_snapshot(path):
+    return {table: pd.read_parquet(os.path.join(path, f'{table}.parquet')) for table in LEVELS}
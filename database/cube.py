@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+# ------------------------------
+# Rollup Cube
+# ------------------------------
+# Per table, one cell per (Region, Year, Gender, age_group) holding the sum,
+# count, min and max of Mean_Estimate. Rows without a Region (WHO aggregates
+# such as 'Global') get their own cells keyed by Country in `Entity`. The
+# AVG/MIN/MAX dashboard queries roll these cells up, so their cost depends
+# on the number of cells, not on how many countries or subnational units
+# the fact tables hold.
+
+CELL_KEYS = ['Region', 'Entity', 'Year', 'Gender', 'age_group']
+TABLES = ['obesity', 'malnutrition']
+
+CELL_QUERIES = {
+    table: f"""
+        SELECT Region,
+               CASE WHEN Region IS NULL THEN Country END AS Entity,
+               Year, Gender, age_group,
+               SUM(Mean_Estimate) AS sum,
+               COUNT(Mean_Estimate) AS count,
+               MIN(Mean_Estimate) AS min,
+               MAX(Mean_Estimate) AS max
+        FROM {table}
+        GROUP BY Region, Entity, Year, Gender, age_group
+    """
+    for table in TABLES
+}
+
+
+def merge_cells(*parts):
+    cells = pd.concat(parts, ignore_index=True)
+    cells['sum'] = pd.to_numeric(cells['sum'])
+    return cells.groupby(CELL_KEYS, dropna=False).agg(
+        sum=('sum', 'sum'), count=('count', 'sum'), min=('min', 'min'), max=('max', 'max')
+    ).reset_index()
+
+
+class RollupCube:
+    """Answers the aggregate catalog queries from precomputed cells."""
+
+    def __init__(self, cells):
+        self.cells = {table: merge_cells(cells[table]) for table in TABLES}
+        self._handlers = {
+            'obesity_1': lambda year: self._avg('obesity', ['Region'], 'Avg_Obesity', year=year,
+                                                order=('Avg_Obesity', False), limit=5),
+            'obesity_4': lambda: self._avg('obesity', ['Gender'], 'Avg_Obesity', order=('Avg_Obesity', False)),
+            'obesity_7': lambda: self._avg('obesity', ['age_group'], 'Avg_Obesity', order=('Avg_Obesity', False)),
+            'obesity_10': lambda: self._avg('obesity', ['Year'], 'Avg_Obesity', entity='Global', adult_both=True,
+                                            order=('Year', True)),
+            'malnutrition_1': lambda: self._avg('malnutrition', ['age_group'], 'Avg_Malnutrition',
+                                                order=('Avg_Malnutrition', False)),
+            'malnutrition_3': lambda region: self._avg('malnutrition', ['Year'], 'Avg_Malnutrition', region=region,
+                                                      adult_both=True, order=('Year', True)),
+            'malnutrition_4': lambda: self._avg('malnutrition', ['Gender'], 'Avg_Malnutrition',
+                                                order=('Avg_Malnutrition', False)),
+            'malnutrition_7': lambda: self._avg('malnutrition', ['Region'], 'Avg_Malnutrition', adult_both=True,
+                                                order=('Avg_Malnutrition', True), limit=5),
+            'malnutrition_9': self._malnutrition_9,
+        }
+
+    def supports(self, query_id):
+        return query_id in self._handlers
+
+    def run(self, query_id, values=None):
+        return self._handlers[query_id](**(values or {}))
+
+    def _select(self, table, year=None, region=None, entity=None, adult_both=False):
+        cells = self.cells[table]
+        if entity is not None:
+            mask = cells['Entity'] == entity
+        elif region is not None:
+            mask = cells['Region'] == region
+        else:
+            mask = cells['Region'].notna()
+        if year is not None:
+            mask &= cells['Year'] == year
+        if adult_both:
+            mask &= (cells['Gender'] == 'Both') & (cells['age_group'] == 'Adult')
+        return cells[mask]
+
+    def _rollup(self, cells, by):
+        return cells.groupby(by, dropna=False, sort=True).agg(
+            sum=('sum', 'sum'), count=('count', 'sum'), min=('min', 'min'), max=('max', 'max')
+        ).reset_index()
+
+    def _avg(self, table, by, alias, order, limit=None, **where):
+        groups = self._rollup(self._select(table, **where), by)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            groups[alias] = np.where(groups['count'] > 0, groups['sum'] / groups['count'], np.nan)
+        column, ascending = order
+        # NULL averages sort first ascending and last descending, as in MySQL.
+        result = groups.sort_values(column, ascending=ascending, kind='stable',
+                                    na_position='first' if ascending else 'last')[by + [alias]]
+        if limit is not None:
+            result = result.head(limit)
+        return result.reset_index(drop=True)
+
+    def _malnutrition_9(self):
+        groups = self._rollup(self._select('malnutrition', adult_both=True), ['Year'])
+        groups = groups.rename(columns={'min': 'Min_Malnutrition', 'max': 'Max_Malnutrition'})
+        return groups.sort_values('Year')[['Year', 'Min_Malnutrition', 'Max_Malnutrition']].reset_index(drop=True)
@@ -1,30 +1,654 @@
 import pandas as pd
+import pyarrow as pa
 import mysql.connector
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from dotenv import load_dotenv
 
+from database import backends, columnar, cube, metrics, replicas
+from database.cache import QueryCache, SingleFlight, cache_key, frame_size
+from database.catalog import PARAM_CHOICES, QUERIES, CatalogError, bind, category_queries, lookup, page, unbind
+from database.frames import compact_frame, frame_memory, to_frame
+from database.slowlog import SlowQueryLog
+from database.watchdog import QueryTimeoutError
+
 # Load variables from .env
 load_dotenv()
+
+# Connection settings are read once at import time so that checking a
+# connection out of the pool never touches the environment again.
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST'),
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'database': os.getenv('DB_NAME'),
+}
+
+# Read replicas of the primary above, as host[:port]; same user, password and database.
+REPLICAS = [address.strip() for address in os.getenv('DB_REPLICAS', '').split(',') if address.strip()]
+REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', '30'))    # seconds behind before a replica stops serving
+REPLICA_CHECK = float(os.getenv('DB_REPLICA_CHECK', '5'))         # seconds between health checks of each host
+
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))      # max seconds to wait for a free connection
+POOL_RECYCLE = float(os.getenv('DB_POOL_RECYCLE', '3600'))    # reopen connections older than this
+POOL_PRE_PING = float(os.getenv('DB_POOL_PRE_PING', '5'))     # ping connections idle longer than this
+
+CACHE_MAX_BYTES = int(float(os.getenv('DB_CACHE_MAX_MB', '256')) * 1024 * 1024)
+CACHE_TTL = float(os.getenv('DB_CACHE_TTL', '3600'))
+CACHE_VERSION_CHECK = float(os.getenv('DB_CACHE_VERSION_CHECK', '10'))  # seconds between data-version polls
+CACHE_STALE_TTL = float(os.getenv('DB_CACHE_STALE_TTL', '86400'))  # max age of a result served on timeout; 0 = never
+SINGLE_FLIGHT = os.getenv('DB_SINGLE_FLIGHT', '1') == '1'    # identical concurrent cache misses share one query
+
+COMPACT_FRAMES = os.getenv('DB_COMPACT_FRAMES', '1') == '1'         # categorical/narrow dtypes for results
+QUERY_TIMEOUT = float(os.getenv('DB_QUERY_TIMEOUT', '30'))         # seconds per query unless it sets its own; 0 = none
+
+FETCH_BATCH_SIZE = int(os.getenv('DB_FETCH_BATCH_SIZE', '10000'))  # rows per fetchmany() / Arrow batch
+PAGE_ROWS = int(os.getenv('DB_PAGE_ROWS', '100'))                   # rows per keyset page (fetch_page)
+PREFETCH_WORKERS = int(os.getenv('DB_PREFETCH_WORKERS', '3'))       # 0 = off; keep below DB_POOL_SIZE
+
+BACKEND = os.getenv('DB_BACKEND', 'mysql')                # 'mysql' or 'duckdb' (embedded, see database/backends.py)
+ENGINE = os.getenv('DB_ENGINE', 'mysql')                  # 'mysql' or 'columnar'
+ENGINE_SNAPSHOT = os.getenv('DB_ENGINE_SNAPSHOT')        # directory for the columnar Parquet snapshot
+ROLLUP_CUBE = os.getenv('DB_ROLLUP_CUBE', '0') == '1'    # answer AVG/MIN/MAX queries from the rollup cube
+
+
 # ------------------------------
 # SQL Connection
 # ------------------------------
-def get_connection():
-    return mysql.connector.connect(
-        host=os.getenv('DB_HOST'),
-        user=os.getenv('DB_USER'),
-        password=os.getenv('DB_PASSWORD'),
-        database=os.getenv('DB_NAME')
-    )
+def get_connection(config=None):
+    """A connection to the primary, or to the host in ``config``."""
+    conn = mysql.connector.connect(**(config or DB_CONFIG))
+    # Pooled connections live across many queries; without autocommit every
+    # SELECT would keep reading from the snapshot taken by the first one.
+    conn.autocommit = True
+    return conn
+
+
+# ------------------------------
+# Connection Pool
+# ------------------------------
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Process-wide pool of MySQL connections.
+
+    Connections are opened lazily up to ``size``. On checkout an idle
+    connection is recycled if it is older than ``recycle`` seconds and pinged
+    if it has been idle longer than ``pre_ping`` seconds; a connection that
+    fails the ping is replaced with a fresh one.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT, recycle=POOL_RECYCLE,
+                 pre_ping=POOL_PRE_PING, connect=get_connection):
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._connect = connect
+        self._idle = deque()          # (conn, created_at, last_used_at)
+        self._created = {}            # id(conn) -> created_at, for checked-out connections
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'reconnects': 0,
+            'discarded': 0,
+        }
+
+    def _open_connection(self):
+        conn = self._connect()
+        self._stats['connections_opened'] += 1
+        return conn, time.monotonic()
+
+    def _is_healthy(self, conn, created_at, last_used_at):
+        now = time.monotonic()
+        if now - created_at > self.recycle:
+            return False
+        if now - last_used_at > self.pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def connect(self):
+        """A new connection outside the pool, for side work such as KILL QUERY."""
+        return self._connect()
+
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, created_at, last_used_at = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    # Reserve the slot before releasing the lock to connect.
+                    self._open += 1
+                    conn = None
+                    break
+                waited = True
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout:.1f}s "
+                        f"(pool size {self.size})"
+                    )
+                self._cond.wait(remaining)
+
+        try:
+            if conn is None:
+                conn, created_at = self._open_connection()
+            elif not self._is_healthy(conn, created_at, last_used_at):
+                self.close_quietly(conn)
+                conn, created_at = self._open_connection()
+                self._stats['reconnects'] += 1
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        wait_time = time.monotonic() - start
+        with self._cond:
+            self._created[id(conn)] = created_at
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+            self._stats['wait_time_total'] += wait_time
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], wait_time)
+        return conn
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            created_at = self._created.pop(id(conn), time.monotonic())
+            if discard:
+                self._open -= 1
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self.close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            # Query errors leave the connection usable; lost connections don't.
+            try:
+                discard = not conn.is_connected()
+            except Exception:
+                discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self.size
+            stats['open'] = self._open
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._open - len(self._idle)
+            checkouts = stats['checkouts']
+            stats['wait_time_avg'] = stats['wait_time_total'] / checkouts if checkouts else 0.0
+        return stats
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for conn, _, _ in idle:
+            self.close_quietly(conn)
+
+
+# Streamlit re-executes the page scripts on every rerun but imports this
+# module only once per process, so the pool is shared by every session.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def pool_stats():
+    return get_pool().stats()
+
+
+# ------------------------------
+# Query Backend
+# ------------------------------
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def replica_config(address):
+    host, _, port = address.partition(':')
+    config = dict(DB_CONFIG, host=host)
+    if port:
+        config['port'] = int(port)
+    return config
+
+
+def replicated_backend(addresses=REPLICAS):
+    """Reads over ``addresses``, each with a pool of its own; the primary takes over when none can."""
+    primary = (DB_CONFIG['host'] or 'primary', backends.MySQLBackend(get_pool()))
+    hosts = [(address, backends.MySQLBackend(ConnectionPool(connect=partial(get_connection, replica_config(address)))))
+             for address in addresses]
+    return replicas.ReplicatedBackend(primary, hosts, REPLICA_MAX_LAG, REPLICA_CHECK)
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if BACKEND == 'duckdb':
+                    _backend = backends.DuckDBBackend()
+                elif REPLICAS:
+                    _backend = replicated_backend()
+                else:
+                    _backend = backends.MySQLBackend(get_pool())
+    return _backend
+
+
+def backend_stats():
+    return get_backend().stats()
+
+
+def replica_stats():
+    """Health, lag and latency per database host; empty unless DB_REPLICAS is set."""
+    backend = get_backend()
+    return backend.host_stats() if isinstance(backend, replicas.ReplicatedBackend) else []
+
+
+# ------------------------------
+# Shared Query Cache
+# ------------------------------
+def current_data_version():
+    return get_backend().data_version()
+
+
+_cache = QueryCache(
+    max_bytes=CACHE_MAX_BYTES,
+    ttl=CACHE_TTL,
+    version_check=CACHE_VERSION_CHECK,
+    version_fn=current_data_version,
+    stale_ttl=CACHE_STALE_TTL,
+)
+
+
+# Sessions that miss the cache on the same query at the same time (a shared
+# link, a category prefetch racing a click) wait for one execution.
+_flights = SingleFlight()
+
+
+def cache_stats():
+    return _cache.stats()
+
+
+def single_flight_stats():
+    return _flights.stats()
+
+
+def invalidate_cache():
+    _cache.invalidate()
+
+
+def cache_report():
+    """Memory accounting for every cached result, largest first."""
+    report = []
+    for (query, params), df, size, age, stale in _cache.entries():
+        memory = frame_memory(df)
+        report.append({'query': lookup(query) or metrics.AD_HOC, 'params': params, 'rows': len(df),
+                       'bytes': size, 'plain_bytes': memory['plain_bytes'], 'age_seconds': age,
+                       'stale': stale, 'columns': memory['columns']})
+    return sorted(report, key=lambda entry: entry['bytes'], reverse=True)
+
+
+# ------------------------------
+# Columnar Engine
+# ------------------------------
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _load_engine():
+    try:
+        frames = {table: execute_query(sql) for table, sql in columnar.TABLE_QUERIES.items()}
+    except Exception:
+        # Keep serving the dashboard from the last snapshot during maintenance.
+        if ENGINE_SNAPSHOT and os.path.isdir(ENGINE_SNAPSHOT):
+            return columnar.ColumnarEngine.from_frames(columnar.load_snapshot(ENGINE_SNAPSHOT))
+        raise
+    if ENGINE_SNAPSHOT:
+        columnar.save_snapshot(frames, ENGINE_SNAPSHOT)
+    return columnar.ColumnarEngine.from_frames(frames)
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _load_engine()
+    return _engine
+
+
+# ------------------------------
+# Rollup Cube
+# ------------------------------
+_cube = None
+_cube_lock = threading.Lock()
+
+
+def get_cube():
+    global _cube
+    if _cube is None:
+        with _cube_lock:
+            if _cube is None:
+                # MySQL does the initial aggregation; only the cells come back.
+                _cube = cube.RollupCube({table: execute_query(sql) for table, sql in cube.CELL_QUERIES.items()})
+    return _cube
+
+
+def _drop_resident():
+    # Under the load locks: a load still running when the data changed is dropped once it finishes.
+    global _engine, _cube
+    with _engine_lock:
+        _engine = None
+    with _cube_lock:
+        _cube = None
+
+
+_cache.subscribe(_drop_resident)
+
+
+def _answer_in_memory(query, params):
+    """Answer a catalog query without MySQL when an in-memory structure can."""
+    bound = unbind(query, params)
+    if bound is None:
+        return None
+    query_id, values = bound
+    if ENGINE == 'columnar':
+        engine = get_engine()
+        if engine.supports(query_id):
+            return engine.run(query_id, values)
+    if ROLLUP_CUBE:
+        rollup = get_cube()
+        if rollup.supports(query_id):
+            return rollup.run(query_id, values)
+    return None
+
+
+# ------------------------------
+# Result Fetching
+# ------------------------------
+def fetch_dicts(cursor):
+    """Original fetch path: one dict per row, then a DataFrame from the list."""
+    return pd.DataFrame(cursor.fetchall())
+
+
+def fetch_batches(cursor, batch_size=FETCH_BATCH_SIZE):
+    """Stream an executed cursor as Arrow record batches of typed columns.
+
+    Only ``batch_size`` rows are held as Python tuples at a time. An empty
+    result yields one empty batch so callers still see the column names.
+    """
+    names = [column[0] for column in cursor.description]
+    empty = True
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        empty = False
+        columns = zip(*rows)
+        yield pa.RecordBatch.from_arrays([pa.array(column) for column in columns], names=names)
+    if empty:
+        yield pa.RecordBatch.from_arrays([pa.array([], pa.null()) for _ in names], names=names)
+
+
+def fetch_arrow(cursor, batch_size=FETCH_BATCH_SIZE):
+    # Types are inferred per batch, so a column can be null in one batch and
+    # double in the next (or int then double); promote them to a common type.
+    tables = [pa.Table.from_batches([batch]) for batch in fetch_batches(cursor, batch_size)]
+    return pa.concat_tables(tables, promote_options='permissive')
+
+
+def iter_query(query, params=None, batch_size=FETCH_BATCH_SIZE):
+    """Run a query and yield its result in Arrow record batches.
+
+    With MySQL the connection stays checked out until the iterator is
+    exhausted or closed, so consume it promptly.
+    """
+    yield from get_backend().iter_batches(query, params, batch_size)
+
+
+def iter_query_frames(query, params=None, batch_size=FETCH_BATCH_SIZE):
+    for batch in iter_query(query, params, batch_size):
+        yield batch.to_pandas()
 
 
 # ------------------------------
 # Function to Run Any SQL Query
 # ------------------------------
-def run_query(query, params=None):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(query, params or ())
-    result = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return pd.DataFrame(result)
+def execute_query(query, params=None, span=None, timeout=None, cancel=None, compact=False):
+    start = time.perf_counter()
+    table = get_backend().execute(query, params, timeout=timeout, cancel=cancel)
+    fetched = time.perf_counter()
+    df = to_frame(table) if compact else table.to_pandas()
+    if span is not None:
+        span['db_seconds'] = fetched - start
+        span['frame_seconds'] = time.perf_counter() - fetched
+    return df
+
+
+def _load(query, params, key, generation, span, timeout, cancel):
+    df = _answer_in_memory(query, params)
+    if df is None:
+        df = execute_query(query, params, span, timeout, cancel, compact=COMPACT_FRAMES)
+    else:
+        span['source'] = 'memory'
+        if COMPACT_FRAMES:
+            df = compact_frame(df)
+    _cache.put(key, df, generation)
+    return df
+
+
+def _run_query(query, params, span, timeout, cancel):
+    key = cache_key(query, params)
+    if key is None:
+        return execute_query(query, params, span, timeout, cancel, compact=COMPACT_FRAMES)
+    df = _cache.get(key)
+    if df is not None:
+        span['source'] = 'cache'
+        return df
+    generation = _cache.generation
+    args = (query, params, key, generation, span, timeout, cancel)
+    if not SINGLE_FLIGHT:
+        return _load(*args)
+    # Keyed by generation too, so nobody is handed a result from before an invalidation.
+    # A session whose leader timed out or was cancelled runs the query itself.
+    df, leader = _flights.do((key, generation), _load, *args, timeout=timeout, cancel=cancel)
+    if not leader:
+        span['source'] = 'shared'
+    return df
+
+
+def _stale(query, params, span):
+    """A cached result past its TTL or invalidated, marked with its age, or None."""
+    key = cache_key(query, params)
+    found = _cache.get_stale(key) if key is not None else None
+    if found is None:
+        return None
+    df, age = found
+    df = df.copy(deep=False)
+    df.attrs['stale_seconds'] = age
+    span['source'] = 'stale'
+    return df
+
+
+_slow_queries = SlowQueryLog()
+
+
+def slow_query_stats():
+    return _slow_queries.stats()
+
+
+def run_query(query, params=None, timeout=None, cancel=None):
+    """Run a query through the cache; returns a DataFrame.
+
+    ``timeout`` defaults to the catalog query's `-- timeout:`, else
+    DB_QUERY_TIMEOUT. Setting ``cancel`` (a threading.Event) interrupts the
+    query with QueryCancelledError. On a timeout, the last cached result
+    is returned instead if there is one, with ``df.attrs['stale_seconds']``
+    set. Otherwise QueryTimeoutError is raised.
+    """
+    with metrics.query_span(query) as span:
+        if timeout is None:
+            catalog_query = QUERIES.get(span['query_id'])
+            timeout = catalog_query.timeout if catalog_query and catalog_query.timeout else QUERY_TIMEOUT
+        try:
+            df = _run_query(query, params, span, timeout, cancel)
+        except (QueryTimeoutError, PoolTimeoutError):
+            df = _stale(query, params, span)
+            if df is None:
+                raise
+        span['rows'] = len(df)
+        span['bytes'] = frame_size(df)
+    if span['source'] == 'backend':
+        _slow_queries.observe(get_backend(), query, params, span)
+    return df
+
+
+# ------------------------------
+# Category Prefetch
+# ------------------------------
+# Clicking a category on the query dashboard starts all of its queries, and
+# the picker choices they need, on a few background threads. Their results
+# land in the shared cache while the user is still choosing, and their
+# database time overlaps instead of adding up one selection at a time.
+_prefetcher = None
+_prefetching = set()        # cache keys queued or running
+_prefetch_lock = threading.Lock()
+_prefetch_stats = {'queued': 0, 'skipped': 0, 'completed': 0, 'errors': 0}
+
+
+def _get_prefetcher():
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetch_lock:
+            if _prefetcher is None:
+                _prefetcher = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='prefetch')
+    return _prefetcher
+
+
+def _prefetch_one(key, query, params):
+    try:
+        run_query(query, params)
+        outcome = 'completed'
+    except Exception:
+        # Only counted: the query runs again, and raises, when a user opens it.
+        outcome = 'errors'
+    with _prefetch_lock:
+        _prefetching.discard(key)
+        _prefetch_stats[outcome] += 1
+
+
+def prefetch(statements):
+    """Run (sql, params) pairs in the background to warm the cache; returns the futures started.
+
+    Statements already queued or running are skipped, so repeated clicks
+    don't pile up work.
+    """
+    if PREFETCH_WORKERS <= 0:
+        return []
+    executor = _get_prefetcher()
+    futures = []
+    for query, params in statements:
+        key = cache_key(query, params)
+        if key is None:
+            continue
+        with _prefetch_lock:
+            if key in _prefetching:
+                _prefetch_stats['skipped'] += 1
+                continue
+            _prefetching.add(key)
+            _prefetch_stats['queued'] += 1
+        futures.append(executor.submit(_prefetch_one, key, query, params))
+    return futures
+
+
+def prefetch_category(category, values=None):
+    """Prefetch the catalog queries of ``category``, after the picker choices they need.
+
+    ``values`` maps query ids to parameter values; the rest run with their defaults.
+    """
+    values = values or {}
+    queries = category_queries(category)
+    types = sorted({p.type for query in queries for p in query.params if p.type in PARAM_CHOICES})
+    statements = [(PARAM_CHOICES[t], None) for t in types]
+    for query in queries:
+        try:
+            statements.append(bind(query.id, values.get(query.id)))
+        except CatalogError:
+            continue
+    return prefetch(statements)
+
+
+def prefetch_stats():
+    with _prefetch_lock:
+        return dict(_prefetch_stats, in_flight=len(_prefetching), workers=PREFETCH_WORKERS)
+
+
+# ------------------------------
+# Keyset Pages
+# ------------------------------
+def _scalar(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def fetch_page(query_id, values=None, after=None, size=PAGE_ROWS, cancel=None):
+    """One page of a keyset catalog query, past its LIMIT.
+
+    Returns the rows and the key to pass as ``after`` for the next page, or
+    None on the last page. Only ``size + 1`` rows are ever fetched.
+    """
+    sql, params = page(query_id, values, after, size)
+    df = run_query(sql, params, cancel=cancel)
+    if len(df) <= size:
+        return df, None
+    df = df.iloc[:size]
+    last = df.iloc[-1]
+    return df, tuple(_scalar(last[column]) for column, _ in QUERIES[query_id].keyset)
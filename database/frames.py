@@ -0,0 +1,94 @@
+"""Compact DataFrames for query results.
+
+Results live on in the shared cache and in every session showing them, so
+run_query builds them small:
+
+- string columns with few distinct values per row (Country, Region, Gender,
+  age_group, the *_level buckets) become categoricals: an integer code per
+  row and each distinct string once. Categories are sorted, so sorting and
+  pivoting order them as before;
+- integer columns get the narrowest of int16, int32 and int64 that holds
+  them (Year fits int16);
+- DECIMAL columns become float64 in Arrow, not one Python Decimal per cell.
+
+Floats stay float64: float32 would show 19.1 as 19.100000381 in tables and
+shift averages.
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+CATEGORY_MAX_RATIO = 0.5    # dictionary-encode strings with at most this many distinct values per row
+INT_TYPES = (pa.int16(), pa.int32(), pa.int64())
+
+
+def _int_type(column):
+    bounds = pc.min_max(column)
+    low, high = bounds['min'].as_py(), bounds['max'].as_py()
+    if low is None:
+        return column.type
+    for int_type in INT_TYPES:
+        info = np.iinfo(int_type.to_pandas_dtype())
+        if info.min <= low and high <= info.max:
+            return int_type
+    return column.type
+
+
+def _few_distinct(column):
+    return len(column) > 1 and pc.count_distinct(column).as_py() <= CATEGORY_MAX_RATIO * len(column)
+
+
+def compact_table(table):
+    """The Arrow table with the compact column types above; pass the result to ``to_frame``."""
+    columns = []
+    for column in table.columns:
+        column_type = column.type
+        if pa.types.is_decimal(column_type):
+            column = column.cast(pa.float64())
+        elif pa.types.is_integer(column_type) and len(column):
+            column = column.cast(_int_type(column))
+        elif (pa.types.is_string(column_type) or pa.types.is_large_string(column_type)) and _few_distinct(column):
+            column = column.dictionary_encode()
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def to_frame(table):
+    """Compact DataFrame of an Arrow query result."""
+    df = compact_table(table).to_pandas()
+    for name in df.columns[[str(dtype) == 'category' for dtype in df.dtypes]]:
+        # Arrow orders a dictionary by first appearance.
+        df[name] = df[name].cat.reorder_categories(sorted(df[name].cat.categories))
+    return df
+
+
+def compact_frame(df):
+    """``to_frame`` for a result that is already a DataFrame (the in-memory engines' answers)."""
+    return to_frame(pa.Table.from_pandas(df, preserve_index=False))
+
+
+# ------------------------------
+# Memory Accounting
+# ------------------------------
+def _plain_bytes(series):
+    """Bytes the column would take as built before: Python strings, int64, float64."""
+    if str(series.dtype) == 'category':
+        return int(series.astype(object).memory_usage(index=False, deep=True))
+    if series.dtype.kind in 'iuf':
+        return 8 * len(series)
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def frame_memory(df):
+    """Per-column dtype and bytes of a result, with what the plain dtypes would have taken."""
+    usage = df.memory_usage(index=False, deep=True)
+    columns = [{'column': name, 'dtype': str(df[name].dtype), 'bytes': int(usage[name]),
+                'plain_bytes': _plain_bytes(df[name])}
+               for name in df.columns]
+    index = int(df.index.memory_usage(deep=True))
+    return {
+        'rows': len(df),
+        'bytes': index + sum(c['bytes'] for c in columns),
+        'plain_bytes': index + sum(c['plain_bytes'] for c in columns),
+        'columns': columns,
+    }
@@ -0,0 +1,166 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pycountry
+
+# ------------------------------
+# WHO GHO Indicators
+# ------------------------------
+GHO_API = 'https://ghoapi.azureedge.net/api'
+
+INDICATORS = {
+    'NCD_BMI_30C': {'table': 'obesity', 'age_group': 'Adult'},
+    'NCD_BMI_PLUS2C': {'table': 'obesity', 'age_group': 'Child/Adolescent'},
+    'NCD_BMI_18C': {'table': 'malnutrition', 'age_group': 'Adult'},
+    'NCD_BMI_MINUS2C': {'table': 'malnutrition', 'age_group': 'Child/Adolescent'},
+}
+
+YEARS = (2012, 2022)
+
+TABLE_COLUMNS = {
+    table: ['Year', 'Gender', 'Mean_Estimate', 'LowerBound', 'UpperBound', 'age_group',
+            'Country', 'Region', 'CI_Width', f'{table}_level']
+    for table in ('obesity', 'malnutrition')
+}
+
+GENDERS = {'SEX_BTSX': 'Both', 'SEX_MLE': 'Male', 'SEX_FMLE': 'Female'}
+
+# Codes pycountry doesn't know: WHO regions, World Bank groups and the global aggregate.
+COUNTRY_OVERRIDES = {
+    'GLOBAL': 'Global',
+    'AFR': 'Africa',
+    'AMR': 'Americas',
+    'EMR': 'Eastern Mediterranean',
+    'EUR': 'Europe',
+    'SEAR': 'South-East Asia',
+    'WPR': 'Western Pacific',
+    'WB_HI': 'High income',
+    'WB_LI': 'Low income',
+    'WB_LMI': 'Lower middle income',
+    'WB_UMI': 'Upper middle income',
+}
+
+# (threshold, label) pairs checked from the top; anything lower is 'Low'.
+LEVELS = {
+    'obesity': [(30.0, 'High'), (25.0, 'Moderate')],
+    'malnutrition': [(20.0, 'High'), (10.0, 'Moderate')],
+}
+
+RECORD_FIELDS = ['IndicatorCode', 'SpatialDimType', 'SpatialDim', 'ParentLocation', 'TimeDim',
+                 'Dim1', 'NumericValue', 'Low', 'High', 'Date']
+
+
+# ------------------------------
+# Streaming JSON
+# ------------------------------
+def iter_gho_records(fp, chunk_size=1 << 16):
+    """Yield the objects of an OData ``{"value": [...]}`` response one at a time.
+
+    Reads ``fp`` (a text stream) in chunks, so memory use is bounded by the
+    chunk size and the largest single record, not by the response size.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    while True:
+        start = buf.find('"value"')
+        bracket = buf.find('[', start) if start >= 0 else -1
+        if bracket >= 0:
+            pos = bracket + 1
+            break
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        buf += chunk
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos < len(buf) and buf[pos] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                raise
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+        if pos > chunk_size:
+            buf, pos = buf[pos:], 0
+
+
+def iter_record_batches(records, batch_size=50000):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------------------------
+# Cleaning
+# ------------------------------
+_country_names = dict(COUNTRY_OVERRIDES)
+
+
+def country_name(code):
+    name = _country_names.get(code)
+    if name is None:
+        country = pycountry.countries.get(alpha_3=code)
+        name = country.name if country else code
+        _country_names[code] = name
+    return name
+
+
+def level_labels(values, table):
+    thresholds = LEVELS[table]
+    labels = np.select([values >= t for t, _ in thresholds], [label for _, label in thresholds], default='Low')
+    return np.where(np.isnan(values), None, labels)
+
+
+def clean_records(records, indicator):
+    """Turn raw GHO records for one indicator into rows of its fact table."""
+    spec = INDICATORS[indicator]
+    table = spec['table']
+    raw = pd.DataFrame.from_records(records, columns=RECORD_FIELDS)
+    years = pd.to_numeric(raw['TimeDim'], errors='coerce')
+    raw = raw[years.between(*YEARS) & raw['Dim1'].isin(list(GENDERS))]
+
+    # Map each distinct code once, then broadcast.
+    codes = raw['SpatialDim'].astype(str)
+    names = {code: country_name(code) for code in codes.unique()}
+    mean = pd.to_numeric(raw['NumericValue'], errors='coerce').to_numpy(dtype=np.float64)
+    low = pd.to_numeric(raw['Low'], errors='coerce').to_numpy(dtype=np.float64)
+    high = pd.to_numeric(raw['High'], errors='coerce').to_numpy(dtype=np.float64)
+    # Only countries belong to a region; regional and global aggregates get NULL.
+    is_country = (raw['SpatialDimType'] == 'COUNTRY').to_numpy()
+    region = raw['ParentLocation'].where(is_country & raw['ParentLocation'].notna(), None)
+
+    frame = pd.DataFrame({
+        'Year': pd.to_numeric(raw['TimeDim']).astype(np.int64).to_numpy(),
+        'Gender': raw['Dim1'].map(GENDERS).to_numpy(),
+        'Mean_Estimate': mean,
+        'LowerBound': low,
+        'UpperBound': high,
+        'age_group': spec['age_group'],
+        'Country': codes.map(names).to_numpy(),
+        'Region': region.to_numpy(dtype=object),
+        'CI_Width': high - low,
+        f'{table}_level': level_labels(mean, table),
+    })
+    frame = frame[TABLE_COLUMNS[table]]
+    # Newest GHO publication date in the batch; incremental loads keep it as a watermark.
+    published = pd.to_datetime(raw['Date'], utc=True, errors='coerce').max()
+    frame.attrs['published'] = None if pd.isna(published) else published
+    return frame
+
+
+def iter_clean_batches(fp, indicator, batch_size=50000):
+    for batch in iter_record_batches(iter_gho_records(fp), batch_size):
+        yield clean_records(batch, indicator)
@@ -0,0 +1,177 @@
+"""Concurrent download of the GHO indicators.
+
+Each indicator is split into one request per year, and all requests are
+issued concurrently under a bounded limit. Transient failures are retried
+with jittered exponential backoff. Responses are cached on disk with their
+ETag/Last-Modified so unchanged pages come back as cheap 304s. Bodies are
+parsed as they stream in.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from database import gho
+
+FETCH_CONCURRENCY = int(os.getenv('GHO_FETCH_CONCURRENCY', '8'))
+FETCH_RETRIES = int(os.getenv('GHO_FETCH_RETRIES', '4'))
+FETCH_TIMEOUT = float(os.getenv('GHO_FETCH_TIMEOUT', '60'))
+FETCH_CACHE_DIR = os.getenv('GHO_FETCH_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'nutrition_paradox', 'gho'))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Tee(io.TextIOBase):
+    """Text stream that copies everything read from ``source`` into ``sink``."""
+
+    def __init__(self, source, sink):
+        self.source = source
+        self.sink = sink
+
+    def read(self, size=-1):
+        chunk = self.source.read(size)
+        self.sink.write(chunk)
+        return chunk
+
+
+def backoff(attempt, base=0.5, cap=30.0):
+    # "Full jitter": spreads retries from many workers instead of syncing them up.
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class GHOFetcher:
+    def __init__(self, base_url=gho.GHO_API, concurrency=FETCH_CONCURRENCY, retries=FETCH_RETRIES,
+                 timeout=FETCH_TIMEOUT, cache_dir=FETCH_CACHE_DIR):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = {'requests': 0, 'retries': 0, 'not_modified': 0, 'rows': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+
+    # ------------------------------
+    # Conditional-request cache
+    # ------------------------------
+    def _cache_paths(self, url, params):
+        key = hashlib.sha1(json.dumps([url, sorted(params.items())]).encode()).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.meta'
+
+    def _validators(self, meta_path):
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path) as f:
+            meta = json.load(f)
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    # ------------------------------
+    # One request (runs in a worker thread)
+    # ------------------------------
+    def _get(self, indicator, params):
+        url = f'{self.base_url}/{indicator}'
+        body_path, meta_path = self._cache_paths(url, params)
+        headers = self._validators(meta_path) if os.path.exists(body_path) else {}
+        self._count('requests')
+        try:
+            response = self.session.get(url, params=params, headers=headers, stream=True, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e))
+
+        with response:
+            if response.status_code == 304:
+                self._count('not_modified')
+                with open(body_path, encoding='utf-8') as fp:
+                    return list(gho.iter_clean_batches(fp, indicator))
+            if response.status_code in RETRY_STATUSES:
+                retry_after = response.headers.get('Retry-After')
+                raise RetryableError(f'HTTP {response.status_code} for {response.url}',
+                                     float(retry_after) if retry_after and retry_after.isdigit() else None)
+            response.raise_for_status()
+
+            response.raw.decode_content = True
+            stream = io.TextIOWrapper(response.raw, encoding='utf-8')
+            os.makedirs(self.cache_dir, exist_ok=True)
+            partial = body_path + '.part'
+            try:
+                with open(partial, 'w', encoding='utf-8') as sink:
+                    frames = list(gho.iter_clean_batches(_Tee(stream, sink), indicator))
+            except (requests.RequestException, OSError, ValueError) as e:
+                raise RetryableError(f'interrupted download of {response.url}: {e}')
+            os.replace(partial, body_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'etag': response.headers.get('ETag'),
+                           'last_modified': response.headers.get('Last-Modified')}, f)
+            return frames
+
+    # ------------------------------
+    # Concurrency
+    # ------------------------------
+    async def _fetch(self, semaphore, indicator, params):
+        for attempt in range(self.retries + 1):
+            # The slot is held only while a request is in flight, not while
+            # backing off, so one flaky page can't starve the others.
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self._get, indicator, params)
+                except RetryableError as e:
+                    if attempt == self.retries:
+                        raise
+                    delay = e.retry_after if e.retry_after is not None else backoff(attempt)
+            self._count('retries')
+            await asyncio.sleep(delay)
+
+    def partitions(self, indicator, years=gho.YEARS):
+        return [{'$filter': f'TimeDim eq {year}'} for year in range(years[0], years[1] + 1)]
+
+    async def fetch_async(self, indicators=None):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        jobs = [(indicator, params)
+                for indicator in indicators or list(gho.INDICATORS)
+                for params in self.partitions(indicator)]
+        # Every fetch is let finish before a failure is raised: cancelling the
+        # tasks wouldn't stop their to_thread workers, whose cache writes
+        # would then land after the error was reported.
+        results = await asyncio.gather(*(self._fetch(semaphore, indicator, params) for indicator, params in jobs),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        frames = {}
+        for (indicator, _), page in zip(jobs, results):
+            frames.setdefault(indicator, []).extend(page)
+            self.stats['rows'] += sum(len(frame) for frame in page)
+        return frames
+
+    def fetch(self, indicators=None):
+        """Download and clean ``indicators``; returns {indicator: [DataFrame, ...]}."""
+        start = time.perf_counter()
+        frames = asyncio.run(self.fetch_async(indicators))
+        self.stats['seconds'] = time.perf_counter() - start
+        return frames
@@ -0,0 +1,187 @@
+"""Incremental GHO ingestion: upsert only the rows that changed.
+
+Each indicator keeps a watermark, the newest GHO publication date it was
+loaded from. A download that is no newer than the watermark is skipped
+outright. Otherwise the incoming rows are diffed against the stored rows
+on their natural key (Country, Year, Gender, age_group), and only new or
+changed rows are written with INSERT ... ON DUPLICATE KEY UPDATE. The data
+version is bumped only when something changed, so caches and
+nutrition_combined stay valid across no-op releases.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from database import gho, materialize
+from database.cache import bump_data_version, create_data_version_table
+
+NATURAL_KEY = ['Country', 'Year', 'Gender', 'age_group']
+NATURAL_KEY_INDEX = 'uq_{table}_key'     # added by migration 5
+
+INGEST_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS ingest_state (
+        indicator VARCHAR(32) PRIMARY KEY,
+        watermark VARCHAR(32),
+        row_count BIGINT,
+        loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+Changes = namedtuple('Changes', ['inserted', 'updated', 'unchanged', 'missing', 'skipped'])
+
+
+# ------------------------------
+# Watermarks
+# ------------------------------
+def create_ingest_state_table(conn):
+    # DDL commits implicitly in MySQL, so run this before opening a load transaction.
+    cursor = conn.cursor()
+    try:
+        cursor.execute(INGEST_STATE_DDL)
+    finally:
+        cursor.close()
+
+
+def read_watermarks(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT indicator, watermark FROM ingest_state")
+        return {indicator: pd.Timestamp(mark) for indicator, mark in cursor.fetchall() if mark}
+    finally:
+        cursor.close()
+
+
+def save_watermark(cursor, indicator, watermark, row_count):
+    cursor.execute(
+        "INSERT INTO ingest_state (indicator, watermark, row_count) VALUES (%s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE watermark = VALUES(watermark), row_count = VALUES(row_count)",
+        (indicator, watermark.isoformat() if watermark is not None else None, row_count),
+    )
+
+
+def latest(dates):
+    dates = [d for d in dates if d is not None]
+    return max(dates) if dates else None
+
+
+def published(frames):
+    return latest(frame.attrs.get('published') for frame in frames)
+
+
+# ------------------------------
+# Diff
+# ------------------------------
+def stored_rows(conn, indicator):
+    spec = gho.INDICATORS[indicator]
+    columns = gho.TABLE_COLUMNS[spec['table']]
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {spec['table']} WHERE age_group = %s",
+                       (spec['age_group'],))
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        cursor.close()
+
+
+def _same(a, b):
+    if a.dtype.kind in 'fi' or b.dtype.kind in 'fi':
+        a = pd.to_numeric(a, errors='coerce').to_numpy(dtype=np.float64)
+        b = pd.to_numeric(b, errors='coerce').to_numpy(dtype=np.float64)
+        return (a == b) | (np.isnan(a) & np.isnan(b))
+    return ((a == b) | (a.isna() & b.isna())).to_numpy()
+
+
+def diff_rows(incoming, stored):
+    """Split ``incoming`` into new and changed rows by natural key.
+
+    Returns ``(inserts, updates, unchanged_count, missing_count)``. Keys
+    only present in ``stored`` are counted as missing but never deleted.
+    A full reload removes them.
+    """
+    incoming = incoming.drop_duplicates(NATURAL_KEY, keep='last')
+    stored = stored.astype({'Year': np.int64})
+    merged = incoming.merge(stored, on=NATURAL_KEY, how='outer', suffixes=('', '_stored'), indicator=True)
+    values = [c for c in incoming.columns if c not in NATURAL_KEY]
+    both = merged[merged['_merge'] == 'both']
+    same = np.ones(len(both), dtype=bool)
+    for column in values:
+        same &= _same(both[column], both[f'{column}_stored'])
+
+    columns = list(incoming.columns)
+    inserts = merged.loc[merged['_merge'] == 'left_only', columns]
+    updates = both.loc[~same, columns]
+    return inserts, updates, int(same.sum()), int((merged['_merge'] == 'right_only').sum())
+
+
+# ------------------------------
+# Upsert
+# ------------------------------
+def require_natural_keys(conn, tables):
+    """Raise unless every table in ``tables`` has migration 5's unique natural key.
+
+    Without it ON DUPLICATE KEY UPDATE never matches and every changed row
+    would be appended as a duplicate.
+    """
+    cursor = conn.cursor()
+    try:
+        missing = []
+        for table in sorted(tables):
+            cursor.execute(
+                "SELECT COUNT(*) FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s AND NON_UNIQUE = 0",
+                (table, NATURAL_KEY_INDEX.format(table=table)),
+            )
+            if not cursor.fetchone()[0]:
+                missing.append(table)
+    finally:
+        cursor.close()
+    if missing:
+        raise RuntimeError(f"{', '.join(missing)} has no unique key on ({', '.join(NATURAL_KEY)}); "
+                           f"run python -m database.migrations before an incremental load")
+
+
+def upsert(cursor, table, frame, batch_size=5000):
+    from database.loader import row_values
+
+    columns = list(frame.columns)
+    assignments = ', '.join(f'{c} = VALUES({c})' for c in columns if c not in NATURAL_KEY)
+    sql = (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+           f"ON DUPLICATE KEY UPDATE {assignments}")
+    for start in range(0, len(frame), batch_size):
+        cursor.executemany(sql, row_values(frame.iloc[start:start + batch_size]))
+
+
+def upsert_indicators(conn, frames, force=False):
+    """Apply ``{indicator: [DataFrame, ...]}`` incrementally; returns Changes per indicator."""
+    require_natural_keys(conn, {gho.INDICATORS[indicator]['table'] for indicator in frames})
+    create_data_version_table(conn)
+    create_ingest_state_table(conn)
+    watermarks = read_watermarks(conn)
+    report = {}
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        for indicator, parts in frames.items():
+            parts = list(parts)
+            mark = published(parts)
+            previous = watermarks.get(indicator)
+            if not force and mark is not None and previous is not None and mark <= previous:
+                report[indicator] = Changes(0, 0, 0, 0, True)
+                continue
+            table = gho.INDICATORS[indicator]['table']
+            incoming = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=gho.TABLE_COLUMNS[table])
+            inserts, updates, unchanged, missing = diff_rows(incoming, stored_rows(conn, indicator))
+            upsert(cursor, table, pd.concat([inserts, updates], ignore_index=True))
+            save_watermark(cursor, indicator, mark, len(incoming))
+            report[indicator] = Changes(len(inserts), len(updates), unchanged, missing, False)
+        if any(c.inserted or c.updated for c in report.values()):
+            bump_data_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    materialize.ensure_fresh(conn)
+    return report
@@ -0,0 +1,178 @@
+"""Load the WHO GHO obesity/malnutrition indicators into MySQL.
+
+    python -m database.loader --source fixtures/           # <INDICATOR>.json files on disk
+    python -m database.loader --source https://ghoapi.azureedge.net/api --concurrency 8
+    python -m database.loader --source fixtures/ --method infile
+    python -m database.loader --incremental            # upsert only rows that changed
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import mysql.connector
+
+from database import gho, incremental, materialize
+from database.gho_fetch import FETCH_CONCURRENCY, GHOFetcher
+from database.cache import bump_data_version, create_data_version_table
+
+INSERT_BATCH_SIZE = int(os.getenv('DB_INSERT_BATCH_SIZE', '5000'))
+
+
+def load_connection(local_infile=False):
+    from database.db import DB_CONFIG
+
+    options = dict(DB_CONFIG)
+    if local_infile:
+        options['allow_local_infile'] = True
+    conn = mysql.connector.connect(**options)
+    conn.autocommit = False
+    return conn
+
+
+# ------------------------------
+# Sources
+# ------------------------------
+def iter_file_frames(source, indicator, batch_size=50000):
+    with open(os.path.join(source, f'{indicator}.json'), encoding='utf-8') as fp:
+        yield from gho.iter_clean_batches(fp, indicator, batch_size)
+
+
+def source_frames(source, indicators, batch_size=50000, concurrency=FETCH_CONCURRENCY):
+    """Cleaned frames per indicator from a directory or, concurrently, from the GHO API."""
+    if source.startswith(('http://', 'https://')):
+        return GHOFetcher(source, concurrency=concurrency).fetch(indicators)
+    return {indicator: iter_file_frames(source, indicator, batch_size) for indicator in indicators}
+
+
+# ------------------------------
+# Bulk Writers
+# ------------------------------
+def row_values(frame):
+    # executemany needs None, not NaN, for SQL NULL.
+    values = frame.astype(object).where(frame.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def insert_executemany(cursor, table, frame, batch_size=INSERT_BATCH_SIZE):
+    """Insert with batched executemany, which the connector rewrites into multi-row INSERTs."""
+    columns = list(frame.columns)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    for start in range(0, len(frame), batch_size):
+        cursor.executemany(sql, row_values(frame.iloc[start:start + batch_size]))
+
+
+def insert_infile(cursor, table, frame):
+    """Insert through LOAD DATA LOCAL INFILE from a temporary CSV file."""
+    columns = list(frame.columns)
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8') as f:
+        frame.to_csv(f, index=False, header=False, na_rep='\\N', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+        path = f.name
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+            f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+            (path,),
+        )
+    finally:
+        os.remove(path)
+
+
+WRITERS = {'executemany': insert_executemany, 'infile': insert_infile}
+
+
+# ------------------------------
+# Load
+# ------------------------------
+def load_indicators(conn, source, indicators=None, method='executemany', batch_size=50000,
+                    concurrency=FETCH_CONCURRENCY):
+    """Replace the rows of each indicator with a fresh copy from ``source``.
+
+    API downloads finish before the transaction starts, so a slow network
+    never holds locks. Everything else happens in one transaction: readers
+    see either the old or the new data, never a half-loaded table. Returns
+    rows loaded per indicator.
+    """
+    write = WRITERS[method]
+    indicators = indicators or list(gho.INDICATORS)
+    frames = source_frames(source, indicators, batch_size, concurrency)
+    counts = {}
+    create_data_version_table(conn)
+    incremental.create_ingest_state_table(conn)
+    cursor = conn.cursor()
+    try:
+        conn.start_transaction()
+        for indicator in indicators:
+            spec = gho.INDICATORS[indicator]
+            cursor.execute(f"DELETE FROM {spec['table']} WHERE age_group = %s", (spec['age_group'],))
+            counts[indicator] = 0
+            dates = []
+            for frame in frames[indicator]:
+                write(cursor, spec['table'], frame)
+                counts[indicator] += len(frame)
+                dates.append(frame.attrs.get('published'))
+            incremental.save_watermark(cursor, indicator, incremental.latest(dates), counts[indicator])
+        bump_data_version(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    materialize.ensure_fresh(conn)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source', default=gho.GHO_API, help='directory of <INDICATOR>.json files or the GHO API URL')
+    parser.add_argument('--indicators', nargs='+', choices=list(gho.INDICATORS))
+    parser.add_argument('--method', choices=list(WRITERS), default='executemany')
+    parser.add_argument('--incremental', action='store_true',
+                        help='diff against stored rows and upsert only changes (needs migration 5)')
+    parser.add_argument('--force', action='store_true', help='with --incremental, ignore the watermarks')
+    parser.add_argument('--concurrency', type=int, default=FETCH_CONCURRENCY,
+                        help='parallel API requests when --source is a URL')
+    args = parser.parse_args()
+
+    if args.incremental:
+        return main_incremental(args)
+
+    conn = load_connection(local_infile=args.method == 'infile')
+    try:
+        start = time.perf_counter()
+        counts = load_indicators(conn, args.source, args.indicators, args.method, concurrency=args.concurrency)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+    total = sum(counts.values())
+    for indicator, rows in counts.items():
+        print(f"{indicator:<16} {rows:>10} rows")
+    print(f"Loaded {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s)")
+
+
+def main_incremental(args):
+    from database.incremental import upsert_indicators
+
+    indicators = args.indicators or list(gho.INDICATORS)
+    conn = load_connection()
+    try:
+        start = time.perf_counter()
+        frames = source_frames(args.source, indicators, concurrency=args.concurrency)
+        report = upsert_indicators(conn, frames, force=args.force)
+        elapsed = time.perf_counter() - start
+    finally:
+        conn.close()
+    print(f"{'indicator':<16} {'inserted':>9} {'updated':>9} {'unchanged':>10} {'missing':>8}")
+    for indicator, changes in report.items():
+        if changes.skipped:
+            print(f"{indicator:<16} skipped: not newer than the stored watermark")
+        else:
+            print(f"{indicator:<16} {changes.inserted:>9} {changes.updated:>9} {changes.unchanged:>10} {changes.missing:>8}")
+    print(f"Done in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Maintain the materialized obesity x malnutrition join behind the Combined queries.
+
+    python -m database.materialize            # refresh if the source data changed
+    python -m database.materialize --force    # rebuild unconditionally
+"""
+import argparse
+
+from database.cache import bump_data_version, create_data_version_table, read_data_version
+
+COMBINED_TABLE = 'nutrition_combined'
+
+COMBINED_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {COMBINED_TABLE} (
+        Country VARCHAR(100),
+        Year SMALLINT,
+        Gender VARCHAR(10),
+        age_group VARCHAR(20),
+        obesity_region VARCHAR(50),
+        malnutrition_region VARCHAR(50),
+        obesity_estimate DOUBLE,
+        malnutrition_estimate DOUBLE,
+        obesity_ci_width DOUBLE,
+        malnutrition_ci_width DOUBLE,
+        INDEX ix_combined_filter (Gender, age_group, Year, obesity_region, malnutrition_region,
+                                  Country, obesity_estimate, malnutrition_estimate),
+        INDEX ix_combined_country (Country, Year, Gender, age_group)
+    )
+"""
+
+# The one place the four-column join still runs: at refresh time.
+COMBINED_SELECT = """
+    SELECT
+        o.Country, o.Year, o.Gender, o.age_group,
+        o.Region, m.Region,
+        o.Mean_Estimate, m.Mean_Estimate,
+        o.CI_Width, m.CI_Width
+    FROM obesity o
+    JOIN malnutrition m
+      ON o.Country = m.Country
+     AND o.Year = m.Year
+     AND o.Gender = m.Gender
+     AND o.age_group = m.age_group
+"""
+
+COMBINED_COLUMNS = (
+    "Country, Year, Gender, age_group, obesity_region, malnutrition_region, "
+    "obesity_estimate, malnutrition_estimate, obesity_ci_width, malnutrition_ci_width"
+)
+
+MATERIALIZED_VIEWS_DDL = """
+    CREATE TABLE IF NOT EXISTS materialized_views (
+        name VARCHAR(64) PRIMARY KEY,
+        source_version VARCHAR(255),
+        row_count BIGINT,
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    )
+"""
+
+
+def populate_statements():
+    return [
+        COMBINED_DDL,
+        MATERIALIZED_VIEWS_DDL,
+        f"INSERT INTO {COMBINED_TABLE} ({COMBINED_COLUMNS}) {COMBINED_SELECT}",
+    ]
+
+
+def refreshed_version(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(MATERIALIZED_VIEWS_DDL)
+        cursor.execute("SELECT source_version FROM materialized_views WHERE name = %s", (COMBINED_TABLE,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def refresh_nutrition_combined(conn):
+    """Rebuild the table off to the side and swap it in atomically.
+
+    Readers keep querying the previous copy until RENAME TABLE switches both
+    names in one step. The data version is bumped after the swap, so results
+    cached from the previous copy after a load's own bump are dropped too.
+    Returns the number of rows materialized.
+    """
+    create_data_version_table(conn)
+    next_table, old_table = f'{COMBINED_TABLE}_next', f'{COMBINED_TABLE}_old'
+    cursor = conn.cursor()
+    try:
+        cursor.execute(COMBINED_DDL)
+        cursor.execute(f"DROP TABLE IF EXISTS {next_table}, {old_table}")
+        cursor.execute(f"CREATE TABLE {next_table} LIKE {COMBINED_TABLE}")
+        cursor.execute(f"INSERT INTO {next_table} ({COMBINED_COLUMNS}) {COMBINED_SELECT}")
+        row_count = cursor.rowcount
+        cursor.execute(
+            f"RENAME TABLE {COMBINED_TABLE} TO {old_table}, {next_table} TO {COMBINED_TABLE}"
+        )
+        cursor.execute(f"DROP TABLE {old_table}")
+        cursor.execute(MATERIALIZED_VIEWS_DDL)
+        bump_data_version(conn)
+        version = repr(read_data_version(conn))
+        cursor.execute(
+            "INSERT INTO materialized_views (name, source_version, row_count) VALUES (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE source_version = VALUES(source_version), row_count = VALUES(row_count)",
+            (COMBINED_TABLE, version, row_count),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+    return row_count
+
+
+def ensure_fresh(conn, force=False):
+    """Refresh ``nutrition_combined`` if the source tables changed since the last build.
+
+    Returns the new row count, or None if the table was already current.
+    """
+    if not force and refreshed_version(conn) == repr(read_data_version(conn)):
+        return None
+    return refresh_nutrition_combined(conn)
+
+
+def main():
+    from database.db import get_connection
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the source data is unchanged')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        rows = ensure_fresh(conn, force=args.force)
+        print(f"{COMBINED_TABLE} is up to date." if rows is None else f"Materialized {rows} rows into {COMBINED_TABLE}.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
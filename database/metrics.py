@@ -0,0 +1,310 @@
+"""Timing spans for queries and chart renders, exported in Prometheus text format.
+
+Every run_query call and every dashboard chart render records a span: query
+id, category, SQL hash, rows, bytes and the time spent in the database,
+building the DataFrame and rendering. Spans feed per-query histograms and
+counters, and the latest ones are kept for the developer sidebar panel.
+With DB_REPLICAS set, backend call times and health checks are also
+recorded per database host.
+
+Export is off unless configured:
+
+    METRICS_PORT=9464          serve http://<host>:9464/metrics
+    METRICS_FILE=/var/lib/node_exporter/nutrition.prom   rewrite this file every METRICS_FLUSH seconds
+
+Only the standard library is imported here, so pages can record spans
+without pulling in pandas or the database stack.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))            # 0 = no scrape endpoint
+METRICS_FILE = os.getenv('METRICS_FILE')                      # textfile-collector path, unset = off
+METRICS_FLUSH = float(os.getenv('METRICS_FLUSH', '15'))       # seconds between file rewrites
+SPAN_HISTORY = int(os.getenv('METRICS_SPAN_HISTORY', '200'))  # spans kept for the dev panel
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+AD_HOC = 'adhoc'
+
+# name -> (type, help)
+METRICS = {
+    'nutrition_query_seconds': ('histogram', 'run_query wall time per phase (db, frame, total)'),
+    'nutrition_chart_render_seconds': ('histogram', 'Dashboard chart render time, PNG encode included'),
+    'nutrition_queries_total': ('counter', 'run_query calls by where the result came from'),
+    'nutrition_query_errors_total': ('counter', 'run_query calls that raised'),
+    'nutrition_query_rows_total': ('counter', 'Rows returned by run_query'),
+    'nutrition_query_bytes_total': ('counter', 'DataFrame bytes returned by run_query'),
+    'nutrition_db_host_seconds': ('histogram', 'Backend call time per database host (DB_REPLICAS)'),
+    'nutrition_db_host_errors_total': ('counter', 'Backend calls that raised, per database host'),
+    'nutrition_db_host_up': ('gauge', '1 if the last health check of the database host answered'),
+    'nutrition_db_replica_lag_seconds': ('gauge', 'Replication lag seen by the last health check'),
+}
+
+
+# ------------------------------
+# Recorder
+# ------------------------------
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class Recorder:
+    """Thread-safe store of recent spans and the aggregates derived from them."""
+
+    def __init__(self, history=SPAN_HISTORY):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=history)
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._counters = {}     # (name, labels) -> value, gauges included
+
+    def _observe(self, name, labels, value):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def _add(self, name, labels, value=1):
+        key = (name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def record(self, span):
+        query = (('query_id', span['query_id']), ('category', span['category']))
+        with self._lock:
+            self._spans.append(span)
+            if span['kind'] == 'render':
+                self._observe('nutrition_chart_render_seconds', query + (('chart', span['chart']),),
+                              span['render_seconds'])
+                return
+            if span.get('error'):
+                self._add('nutrition_query_errors_total', query)
+                return
+            self._add('nutrition_queries_total', query + (('source', span['source']),))
+            self._add('nutrition_query_rows_total', query, span['rows'])
+            self._add('nutrition_query_bytes_total', query, span['bytes'])
+            for phase in ('db', 'frame', 'total'):
+                seconds = span.get(f'{phase}_seconds')
+                if seconds is not None:
+                    self._observe('nutrition_query_seconds', query + (('phase', phase),), seconds)
+
+    def record_host(self, host, role, seconds, error):
+        labels = (('host', host), ('role', role))
+        with self._lock:
+            if error:
+                self._add('nutrition_db_host_errors_total', labels)
+            else:
+                self._observe('nutrition_db_host_seconds', labels, seconds)
+
+    def set_gauge(self, name, labels, value):
+        with self._lock:
+            self._counters[(name, labels)] = value
+
+    def recent(self, limit=None):
+        with self._lock:
+            spans = list(self._spans)
+        return spans[::-1][:limit]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+            self._counters.clear()
+
+    def prometheus_text(self):
+        with self._lock:
+            histograms = {key: (list(h.counts), h.count, h.sum) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind in ('counter', 'gauge'):
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_labels(labels)} {_value(value)}')
+                continue
+            for (metric, labels), (counts, count, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, counts):
+                    cumulative += bucket
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", repr(bound)),))} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{_labels(labels)} {total!r}')
+                lines.append(f'{name}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _value(value):
+    return '+Inf' if value == float('inf') else value
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+_recorder = Recorder()
+
+
+def recent_spans(limit=None):
+    """Latest spans first."""
+    return _recorder.recent(limit)
+
+
+def prometheus_text():
+    return _recorder.prometheus_text()
+
+
+def reset():
+    _recorder.clear()
+
+
+def record_host(host, role, seconds, error=False):
+    """One backend call on a database host, when reads are routed over replicas."""
+    _recorder.record_host(host, role, seconds, error)
+    if METRICS_PORT or METRICS_FILE:
+        _start_exporters()
+
+
+def set_host_state(host, role, up, lag=None):
+    """Outcome of a health check of a database host."""
+    labels = (('host', host), ('role', role))
+    _recorder.set_gauge('nutrition_db_host_up', labels, int(up))
+    if lag is not None:
+        _recorder.set_gauge('nutrition_db_replica_lag_seconds', labels, lag)
+
+
+# ------------------------------
+# Spans
+# ------------------------------
+def sql_hash(query):
+    from database.cache import normalize_sql
+
+    return hashlib.sha1(normalize_sql(query).encode('utf-8')).hexdigest()[:12]
+
+
+def _identify(query):
+    from database.catalog import QUERIES, lookup
+
+    query_id = lookup(query)
+    if query_id is None:
+        return AD_HOC, ''
+    return query_id, QUERIES[query_id].category
+
+
+@contextmanager
+def query_span(query):
+    """Span around one run_query call; the caller fills in source, rows, bytes and phase timings."""
+    query_id, category = _identify(query)
+    span = {'kind': 'query', 'query_id': query_id, 'category': category, 'sql_hash': sql_hash(query),
+            'source': 'backend', 'rows': 0, 'bytes': 0, 'db_seconds': None, 'frame_seconds': None,
+            'started_at': time.time()}
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException:
+        span['error'] = True
+        raise
+    finally:
+        span['total_seconds'] = time.perf_counter() - start
+        _finish(span)
+
+
+@contextmanager
+def render_span(query_id, chart):
+    """Span around rendering the chart of a catalog query; the caller may set ``bytes``."""
+    from database.catalog import QUERIES
+
+    query = QUERIES.get(query_id)
+    span = {'kind': 'render', 'query_id': query_id, 'category': query.category if query else '',
+            'chart': chart, 'bytes': 0, 'started_at': time.time()}
+    start = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span['render_seconds'] = time.perf_counter() - start
+        _finish(span)
+
+
+def _finish(span):
+    _recorder.record(span)
+    if METRICS_PORT or METRICS_FILE:
+        _start_exporters()
+
+
+# ------------------------------
+# Exporters
+# ------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_file(path):
+    """Write the current metrics atomically, as node_exporter's textfile collector expects."""
+    partial = f'{path}.{os.getpid()}.tmp'
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text())
+    os.replace(partial, path)
+
+
+def _flush_forever(path, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            write_file(path)
+        except OSError:
+            pass
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def _start_exporters():
+    # Streamlit imports this module once per process; start the exporters on first use.
+    global _exporters_started
+    if _exporters_started:
+        return
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+        if METRICS_PORT:
+            server = ThreadingHTTPServer(('', METRICS_PORT), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        if METRICS_FILE:
+            threading.Thread(target=_flush_forever, args=(METRICS_FILE, METRICS_FLUSH),
+                             name='metrics-file', daemon=True).start()
@@ -0,0 +1,289 @@
+"""Versioned schema migrations for the obesity and malnutrition tables.
+
+    python -m database.migrations                 # apply pending migrations, report EXPLAIN/timing changes
+    python -m database.migrations --status        # list applied and pending migrations
+    python -m database.migrations --report migration_report.json --repeat 5
+"""
+import argparse
+import json
+import statistics
+import time
+from collections import namedtuple
+
+from database import incremental, materialize
+from database.cache import NO_SUCH_TABLE
+from database.catalog import QUERIES, bind
+
+Migration = namedtuple('Migration', ['version', 'description', 'statements'])
+
+FACT_TABLES = {'obesity': 'obesity_level', 'malnutrition': 'malnutrition_level'}
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+# ------------------------------
+# Migrations
+# ------------------------------
+def _create_tables():
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            Year SMALLINT,
+            Gender VARCHAR(10),
+            Mean_Estimate DOUBLE,
+            LowerBound DOUBLE,
+            UpperBound DOUBLE,
+            age_group VARCHAR(20),
+            Country VARCHAR(100),
+            Region VARCHAR(50),
+            CI_Width DOUBLE,
+            {level} VARCHAR(10)
+        )
+        """
+        for table, level in FACT_TABLES.items()
+    ]
+
+
+def _typed_dimensions():
+    # Tables loaded through pandas end up with TEXT/BIGINT columns, which
+    # can't be indexed without prefixes; narrow them to indexable types.
+    return [
+        f"""
+        ALTER TABLE {table}
+            MODIFY Year SMALLINT,
+            MODIFY Gender VARCHAR(10),
+            MODIFY age_group VARCHAR(20),
+            MODIFY Country VARCHAR(100),
+            MODIFY Region VARCHAR(50),
+            MODIFY {level} VARCHAR(10)
+        """
+        for table, level in FACT_TABLES.items()
+    ]
+
+
+def _covering_indexes():
+    statements = []
+    for table, level in FACT_TABLES.items():
+        statements.append(f"""
+            ALTER TABLE {table}
+                -- Gender/age_group/Year equality filters, the common Region IS NOT NULL
+                -- predicate, then the measures so the top-k and per-country queries
+                -- never touch the clustered index.
+                ADD INDEX ix_{table}_filter (Gender, age_group, Year, Region, Country, Mean_Estimate, CI_Width),
+                -- Four-column join key for the Combined queries and Country = ... lookups.
+                ADD INDEX ix_{table}_join (Country, Year, Gender, age_group, Region, Mean_Estimate),
+                -- Region groupings and Region = 'Africa' style filters.
+                ADD INDEX ix_{table}_region (Region, Year, Gender, age_group, Mean_Estimate),
+                -- Level x age_group breakdowns.
+                ADD INDEX ix_{table}_level ({level}, age_group, Region, Country, CI_Width)
+        """)
+    return statements
+
+
+def _natural_keys(conn):
+    # Older loads may hold duplicate keys, which would make ADD UNIQUE fail.
+    # Copy into a keyed table (INSERT IGNORE keeps the first row per key),
+    # report what was dropped, and swap.
+    key = ', '.join(incremental.NATURAL_KEY)
+    cursor = conn.cursor()
+    try:
+        for table in FACT_TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}_keyed, {table}_unkeyed")
+            cursor.execute(f"CREATE TABLE {table}_keyed LIKE {table}")
+            cursor.execute(f"ALTER TABLE {table}_keyed ADD UNIQUE KEY "
+                           f"{incremental.NATURAL_KEY_INDEX.format(table=table)} ({key})")
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            rows = cursor.fetchone()[0]
+            cursor.execute(f"INSERT IGNORE INTO {table}_keyed SELECT * FROM {table}")
+            cursor.execute(f"SELECT COUNT(*) FROM {table}_keyed")
+            dropped = rows - cursor.fetchone()[0]
+            if dropped:
+                print(f"{table}: dropped {dropped} of {rows} rows repeating a ({key}) key")
+            cursor.execute(f"RENAME TABLE {table} TO {table}_unkeyed, {table}_keyed TO {table}")
+            cursor.execute(f"DROP TABLE {table}_unkeyed")
+    finally:
+        cursor.close()
+
+
+MIGRATIONS = [
+    Migration(1, 'Create obesity and malnutrition tables', _create_tables()),
+    Migration(2, 'Narrow dimension columns to indexable types', _typed_dimensions()),
+    Migration(3, 'Covering composite indexes for dashboard filters and joins', _covering_indexes()),
+    Migration(4, 'Materialized nutrition_combined join for the Combined queries',
+              [materialize.COMBINED_DDL, materialize.refresh_nutrition_combined]),
+    Migration(5, 'Unique natural keys and ingest watermarks for incremental upserts',
+              [_natural_keys, incremental.INGEST_STATE_DDL]),
+]
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SCHEMA_MIGRATIONS_DDL)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def fact_tables_exist(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('obesity', 'malnutrition')"
+        )
+        return cursor.fetchone()[0] == len(FACT_TABLES)
+    finally:
+        cursor.close()
+
+
+def pending_migrations(conn):
+    applied = applied_versions(conn)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def migrate(conn, target=None):
+    """Apply pending migrations up to ``target`` in order and return them."""
+    done = []
+    for migration in pending_migrations(conn):
+        if target is not None and migration.version > target:
+            break
+        cursor = conn.cursor()
+        try:
+            # MySQL commits DDL implicitly, so each migration is recorded
+            # right after its statements succeed. Steps that need more than
+            # one statement are given as callables taking the connection.
+            for statement in migration.statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (migration.version, migration.description),
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+        done.append(migration)
+    return done
+
+
+# ------------------------------
+# EXPLAIN Capture
+# ------------------------------
+PLAN_FIELDS = ['table', 'type', 'possible_keys', 'key', 'rows', 'filtered', 'Extra']
+
+
+def explain(conn, sql, params=()):
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute('EXPLAIN ' + sql.strip().rstrip(';'), params)
+        return [{field: row.get(field) for field in PLAN_FIELDS} for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def time_query(conn, sql, params, repeat):
+    cursor = conn.cursor()
+    timings = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            timings.append(time.perf_counter() - start)
+    finally:
+        cursor.close()
+    return statistics.median(timings)
+
+
+def capture_plans(conn, repeat=3):
+    """Plan and median time per catalog query; None for a query whose table doesn't exist yet."""
+    plans = {}
+    for query_id in QUERIES:
+        sql, params = bind(query_id)
+        try:
+            plans[query_id] = {'plan': explain(conn, sql, params), 'seconds': time_query(conn, sql, params, repeat)}
+        except Exception as e:
+            # The Combined queries read nutrition_combined, which a pending migration creates.
+            if getattr(e, 'errno', None) != NO_SUCH_TABLE:
+                raise
+            plans[query_id] = None
+    return plans
+
+
+def compare_plans(before, after):
+    report = {}
+    for query_id, old in before.items():
+        new = after[query_id]
+        seconds_before = old['seconds'] if old else None
+        seconds_after = new['seconds'] if new else None
+        report[query_id] = {
+            'before': old,
+            'after': new,
+            'seconds_before': seconds_before,
+            'seconds_after': seconds_after,
+            'speedup': seconds_before / seconds_after if seconds_before and seconds_after else None,
+            'keys_after': sorted({row['key'] for row in new['plan'] if row['key']}) if new else [],
+        }
+    return report
+
+
+def _ms(seconds):
+    return 'n/a' if seconds is None else f'{seconds * 1000:.2f}'
+
+
+def print_report(report):
+    print(f"{'query':<16} {'before ms':>10} {'after ms':>10} {'speedup':>8}  keys used")
+    for query_id, row in report.items():
+        speedup = f"{row['speedup']:.1f}x" if row['speedup'] else '-'
+        keys = ', '.join(row['keys_after']) or ('(none)' if row['after'] else 'n/a')
+        print(f"{query_id:<16} {_ms(row['seconds_before']):>10} {_ms(row['seconds_after']):>10} "
+              f"{speedup:>8}  {keys}")
+
+
+def main():
+    from database.db import get_connection
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--status', action='store_true', help='show applied and pending migrations')
+    parser.add_argument('--target', type=int, help='migrate up to this version')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per query (median is reported)')
+    parser.add_argument('--report', help='write the before/after EXPLAIN report to this JSON file')
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        if args.status:
+            applied = applied_versions(conn)
+            for m in MIGRATIONS:
+                print(f"{m.version:>3} {'applied' if m.version in applied else 'pending':<8} {m.description}")
+            return
+        if not pending_migrations(conn):
+            print('Schema is up to date.')
+            return
+        # A fresh database has nothing to compare against.
+        before = capture_plans(conn, args.repeat) if fact_tables_exist(conn) else None
+        for migration in migrate(conn, args.target):
+            print(f"Applied {migration.version}: {migration.description}")
+        if before is None:
+            return
+        report = compare_plans(before, capture_plans(conn, args.repeat))
+        print_report(report)
+        if args.report:
+            with open(args.report, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""Read routing over a MySQL primary and its replicas.
+
+With DB_REPLICAS set, database.db sends the dashboard's reads to replicas
+and keeps the primary for writes. The loader, migrations and the
+materialized table connect with DB_CONFIG, which is always the primary.
+
+One health-check thread per host looks at it every DB_REPLICA_CHECK
+seconds. It reads the host's replication lag (SHOW REPLICA STATUS) and its
+data_version row. A replica serves reads only while all of these hold:
+
+- it answers;
+- it is at most DB_REPLICA_MAX_LAG seconds behind;
+- it is on the primary's data version.
+
+So after a load, nothing is cached from a replica that hasn't replayed it
+yet. Reads go to the usable replica with the fewest queries running and a
+recent latency close to the best, taking turns among equals. With no
+usable replica they go to the primary. If the primary is down too, they go
+to the least lagging replica that answers. A query that can't reach its
+host marks it down and moves on to the next one. The health check puts the
+host back once it answers again.
+"""
+import math
+import threading
+import time
+
+from database import metrics
+from database.backends import ER_PARSE_ERROR
+from database.cache import read_data_version
+
+ER_SERVER_SHUTDOWN = 1053
+ER_SPECIFIC_ACCESS_DENIED = 1227    # SHOW REPLICA STATUS needs REPLICATION CLIENT
+
+# Client and server errors that mean the host is gone, not that the query failed.
+HOST_LOST = {ER_SERVER_SHUTDOWN, 2002, 2003, 2005, 2006, 2013, 2055}
+
+LATENCY_ALPHA = 0.2     # weight of the newest query in a host's latency average
+LATENCY_SLACK = 1.5     # replicas within this factor of the fastest take turns
+
+
+def host_lost(error):
+    return isinstance(error, OSError) or getattr(error, 'errno', None) in HOST_LOST
+
+
+def replication_lag(conn):
+    """Seconds ``conn``'s server is behind its source.
+
+    None if it isn't replicating, or the user may not look. Infinity if
+    replication is stopped.
+    """
+    cursor = conn.cursor()
+    try:
+        # SHOW REPLICA STATUS is MySQL 8.0.22+ and MariaDB 10.5.1+.
+        for statement in ('SHOW REPLICA STATUS', 'SHOW SLAVE STATUS'):
+            try:
+                cursor.execute(statement)
+                break
+            except Exception as e:
+                if getattr(e, 'errno', None) == ER_SPECIFIC_ACCESS_DENIED:
+                    return None
+                if getattr(e, 'errno', None) != ER_PARSE_ERROR or statement == 'SHOW SLAVE STATUS':
+                    raise
+        names = [column[0] for column in cursor.description or ()]
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if not rows:
+        return None
+    column = 'Seconds_Behind_Source' if 'Seconds_Behind_Source' in names else 'Seconds_Behind_Master'
+    # One row per replication channel; NULL while a channel is stopped.
+    lags = [row[names.index(column)] for row in rows]
+    return math.inf if any(lag is None for lag in lags) else float(max(lags))
+
+
+class Host:
+    """One server: its backend (pool and prepared statements), health and latency."""
+
+    def __init__(self, name, role, backend):
+        self.name = name
+        self.role = role                # 'primary' or 'replica'
+        self.backend = backend
+        self.up = True
+        self.checked_at = None          # monotonic time of the last health check that answered
+        self.lag = None
+        self.version = None
+        self.error = None
+        self.in_flight = 0
+        self.latency = None             # recent query seconds (exponential average)
+        self.used_at = None             # monotonic time of the last query that finished
+        self.probe = None               # connection used by the health checks
+        self.stats = {'queries': 0, 'errors': 0, 'seconds_total': 0.0, 'seconds_max': 0.0,
+                      'marked_down': 0, 'recovered': 0, 'checks': 0, 'check_errors': 0}
+
+    def score(self, now, horizon):
+        # An average older than ``horizon`` is dropped and restarted, so one slow spell doesn't keep a replica out.
+        latency = self.latency if self.used_at is not None and now - self.used_at < horizon else 0.0
+        return (self.in_flight + 1) * latency
+
+
+class ReplicatedBackend:
+    """The MySQL backend with reads spread over replicas and failed over between hosts.
+
+    ``primary`` and each of ``replicas`` are (name, MySQLBackend) pairs,
+    each backend with a pool of its own.
+    """
+
+    name = 'mysql'
+
+    def __init__(self, primary, replicas, max_lag, check_interval):
+        self.primary = Host(primary[0], 'primary', primary[1])
+        self.replicas = [Host(name, 'replica', backend) for name, backend in replicas]
+        self.hosts = [self.primary] + self.replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.primary_version = None
+        self._turn = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stats = {'failovers': 0, 'primary_fallbacks': 0}
+        for host in self.hosts:
+            threading.Thread(target=self._check_forever, args=(host,), name=f'db-check-{host.name}',
+                             daemon=True).start()
+
+    # ------------------------------
+    # Health
+    # ------------------------------
+    def _usable(self, host):
+        """A replica that may serve reads: answering, caught up and on the primary's data version."""
+        return (host.up and host.checked_at is not None
+                and (host.lag is None or host.lag <= self.max_lag)
+                and (self.primary_version is None or host.version == self.primary_version))
+
+    def _mark_down(self, host, error):
+        with self._lock:
+            if host.up:
+                host.stats['marked_down'] += 1
+            host.up = False
+            host.error = repr(error)
+
+    def check(self, host):
+        """Look at one host now; the health-check threads call this every ``check_interval``."""
+        try:
+            if host.probe is None:
+                host.probe = host.backend.pool.connect()
+            # The primary's lag is not looked at: it can be a replica of another site.
+            lag = replication_lag(host.probe) if host.role == 'replica' else None
+            version = read_data_version(host.probe)
+        except Exception as e:
+            if host.probe is not None:
+                host.backend.pool.close_quietly(host.probe)
+                host.probe = None
+            with self._lock:
+                host.stats['checks'] += 1
+                host.stats['check_errors'] += 1
+            self._mark_down(host, e)
+            metrics.set_host_state(host.name, host.role, up=False)
+            return
+        with self._lock:
+            host.stats['checks'] += 1
+            if not host.up:
+                host.stats['recovered'] += 1
+            host.up = True
+            host.error = None
+            host.lag = lag
+            host.version = version
+            host.checked_at = time.monotonic()
+            if host is self.primary:
+                self.primary_version = version
+        metrics.set_host_state(host.name, host.role, up=True, lag=lag)
+
+    def _check_forever(self, host):
+        while not self._stop.is_set():
+            self.check(host)
+            self._stop.wait(self.check_interval)
+
+    # ------------------------------
+    # Routing
+    # ------------------------------
+    def read_hosts(self):
+        """Hosts to try for a read, in order."""
+        now = time.monotonic()
+        with self._lock:
+            scores = {h: h.score(now, self.check_interval) for h in self.replicas if self._usable(h)}
+            usable = sorted(scores, key=scores.get)
+            if usable:
+                best = scores[usable[0]]
+                near = [h for h in usable if scores[h] <= best * LATENCY_SLACK]
+                self._turn += 1
+                first = near[self._turn % len(near)]
+                usable.remove(first)
+                usable.insert(0, first)
+            up = [h for h in self.replicas if h.up and h not in usable]
+            down = [h for h in self.hosts if not h.up]
+            lagging = sorted(up, key=lambda h: math.inf if h.lag is None else h.lag)
+            primary = [self.primary] if self.primary.up else []
+            if not usable:
+                self._stats['primary_fallbacks'] += 1
+        return usable + primary + lagging + down
+
+    def _run(self, call, hosts, record=True):
+        """``call(host)`` on the first host that can be reached."""
+        error = None
+        for host in hosts:
+            if error is not None:
+                with self._lock:
+                    self._stats['failovers'] += 1
+            with self._lock:
+                host.in_flight += 1
+            start = time.perf_counter()
+            try:
+                result = call(host)
+            except Exception as e:
+                seconds = time.perf_counter() - start
+                with self._lock:
+                    host.in_flight -= 1
+                    host.stats['errors'] += 1
+                metrics.record_host(host.name, host.role, seconds, error=True)
+                if not host_lost(e):
+                    raise
+                self._mark_down(host, e)
+                error = e
+                continue
+            seconds = time.perf_counter() - start
+            now = time.monotonic()
+            with self._lock:
+                host.in_flight -= 1
+                if record:
+                    host.stats['queries'] += 1
+                    host.stats['seconds_total'] += seconds
+                    host.stats['seconds_max'] = max(host.stats['seconds_max'], seconds)
+                    fresh = host.used_at is not None and now - host.used_at < self.check_interval
+                    host.latency = LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * host.latency if fresh else seconds
+                    host.used_at = now
+            if record:
+                metrics.record_host(host.name, host.role, seconds)
+            return result
+        raise error
+
+    # ------------------------------
+    # Backend Interface
+    # ------------------------------
+    def execute(self, query, params=None, timeout=None, cancel=None):
+        return self._run(lambda host: host.backend.execute(query, params, timeout=timeout, cancel=cancel),
+                         self.read_hosts())
+
+    def iter_batches(self, query, params=None, batch_size=None):
+        # Failing over is only possible until the first batch has been handed out.
+        error = None
+        for host in self.read_hosts():
+            batches = host.backend.iter_batches(query, params, batch_size)
+            try:
+                first = next(batches)
+            except StopIteration:
+                return
+            except Exception as e:
+                if not host_lost(e):
+                    raise
+                self._mark_down(host, e)
+                error = e
+                continue
+            yield first
+            yield from batches
+            return
+        raise error
+
+    def explain(self, query, params=None, analyze=False):
+        return self._run(lambda host: host.backend.explain(query, params, analyze), self.read_hosts(),
+                         record=False)
+
+    def data_version(self):
+        # Only the primary's version counts: a replica's may be behind.
+        version = self._run(lambda host: host.backend.data_version(), [self.primary], record=False)
+        with self._lock:
+            self.primary_version = version
+        return version
+
+    def host_stats(self):
+        """Per host: role, health, lag, data version, queries running and latency."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                'host': h.name, 'role': h.role, 'up': h.up,
+                'serving': self._usable(h) if h.role == 'replica' else h.up,
+                'lag_seconds': h.lag, 'version': h.version,
+                'checked_seconds_ago': None if h.checked_at is None else now - h.checked_at,
+                'in_flight': h.in_flight,
+                'latency_ms': None if h.latency is None else h.latency * 1000,
+                'latency_avg_ms': h.stats['seconds_total'] / h.stats['queries'] * 1000 if h.stats['queries'] else None,
+                'latency_max_ms': h.stats['seconds_max'] * 1000,
+                'error': h.error,
+                **{k: v for k, v in h.stats.items() if k not in ('seconds_total', 'seconds_max')},
+            } for h in self.hosts]
+
+    def stats(self):
+        with self._lock:
+            routing = dict(self._stats)
+        return {**self.primary.backend.stats(), **routing, 'hosts': self.host_stats()}
+
+    def close(self):
+        """Stop the health checks and close every host's connections."""
+        self._stop.set()
+        for host in self.hosts:
+            if host.probe is not None:
+                host.backend.pool.close_quietly(host.probe)
+                host.probe = None
+            host.backend.pool.close()
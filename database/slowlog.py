@@ -0,0 +1,138 @@
+"""Log dashboard queries slower than SLOW_QUERY_MS, with their plan.
+
+run_query hands every backend-executed query to ``observe``. A slow one is
+written as a JSON line to a rotating log along with its SQL, parameters,
+timings and the backend's EXPLAIN (or EXPLAIN ANALYZE) output. The plan is
+captured on a background thread, one at a time, so neither the user nor
+MySQL pays for a burst of slow queries. The same SQL is logged at most once
+per SLOW_QUERY_DEDUPE seconds; later entries say how many repeats were
+skipped in between.
+
+    python -m database.slowlog          # slowest logged queries, one line each
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '500'))                 # 0 = off
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', os.path.join(ROOT, 'logs', 'slow_queries.jsonl'))
+SLOW_QUERY_LOG_MB = float(os.getenv('SLOW_QUERY_LOG_MB', '10'))          # rotate at this size
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', '5'))
+SLOW_QUERY_DEDUPE = float(os.getenv('SLOW_QUERY_DEDUPE', '3600'))        # seconds between entries per SQL
+SLOW_QUERY_ANALYZE = os.getenv('SLOW_QUERY_ANALYZE', '0') == '1'         # EXPLAIN ANALYZE re-runs the query
+
+
+class SlowQueryLog:
+    def __init__(self, path=SLOW_QUERY_LOG, threshold_ms=SLOW_QUERY_MS, dedupe=SLOW_QUERY_DEDUPE,
+                 analyze=SLOW_QUERY_ANALYZE, max_bytes=int(SLOW_QUERY_LOG_MB * 1024 * 1024),
+                 backups=SLOW_QUERY_LOG_BACKUPS):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.dedupe = dedupe
+        self.analyze = analyze
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._seen = {}         # sql_hash -> [logged_at, repeats since]
+        self._logger = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slowlog')
+        self._stats = {'slow': 0, 'logged': 0, 'deduplicated': 0, 'explain_errors': 0}
+
+    def _get_logger(self):
+        if self._logger is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                          encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger = logging.getLogger(f'nutrition.slow_queries.{id(self)}')
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def observe(self, backend, query, params, span):
+        """Queue a log entry if ``span`` went over the threshold; returns the future or None."""
+        if not self.threshold or span.get('error') or span['total_seconds'] < self.threshold:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._stats['slow'] += 1
+            seen = self._seen.get(span['sql_hash'])
+            if seen is not None and now - seen[0] < self.dedupe:
+                seen[1] += 1
+                self._stats['deduplicated'] += 1
+                return None
+            repeats = seen[1] if seen is not None else 0
+            self._seen[span['sql_hash']] = [now, 0]
+        entry = {
+            'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'query_id': span['query_id'],
+            'sql_hash': span['sql_hash'],
+            'backend': backend.name,
+            'wall_ms': round(span['total_seconds'] * 1000, 2),
+            'db_ms': None if span['db_seconds'] is None else round(span['db_seconds'] * 1000, 2),
+            'frame_ms': None if span['frame_seconds'] is None else round(span['frame_seconds'] * 1000, 2),
+            'rows': span['rows'],
+            'repeats_skipped': repeats,
+            'params': list(params) if params else None,
+            'sql': query.strip(),
+        }
+        return self._executor.submit(self._write, backend, query, params, entry)
+
+    def _write(self, backend, query, params, entry):
+        entry['plan_kind'] = 'EXPLAIN ANALYZE' if self.analyze else 'EXPLAIN'
+        try:
+            entry['plan'] = backend.explain(query, params, analyze=self.analyze)
+        except Exception as e:
+            entry['plan'] = None
+            entry['plan_error'] = f'{type(e).__name__}: {e}'
+            with self._lock:
+                self._stats['explain_errors'] += 1
+        self._get_logger().info(json.dumps(entry, default=str))
+        with self._lock:
+            self._stats['logged'] += 1
+        return entry
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, distinct=len(self._seen))
+
+
+def read_entries(path=SLOW_QUERY_LOG, backups=SLOW_QUERY_LOG_BACKUPS):
+    """Entries from the log and its rotated backups, oldest first."""
+    paths = [f'{path}.{i}' for i in range(backups, 0, -1)] + [path]
+    entries = []
+    for name in paths:
+        if os.path.exists(name):
+            with open(name, encoding='utf-8') as f:
+                entries += [json.loads(line) for line in f if line.strip()]
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default=SLOW_QUERY_LOG)
+    parser.add_argument('--plans', action='store_true', help='print the captured plan under each query')
+    args = parser.parse_args()
+
+    latest = {}
+    for entry in read_entries(args.path):
+        latest[entry['sql_hash']] = entry
+    for entry in sorted(latest.values(), key=lambda e: e['wall_ms'], reverse=True):
+        print(f"{entry['wall_ms']:>10.1f}ms  {entry['query_id']:<16} {entry['sql_hash']}  {entry['backend']:<7} "
+              f"rows={entry['rows']}  last seen {entry['time']}")
+        if args.plans:
+            print('    ' + (entry.get('plan') or entry.get('plan_error', '')).replace('\n', '\n    '))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""Generate WHO-shaped obesity/malnutrition rows for load and scale testing.
+
+    python -m database.synthetic --to parquet --out synthetic/ --units 100
+    python -m database.synthetic --to csv --out synthetic/ --years 1990 2022 --age-groups 6
+    python -m database.synthetic --to mysql --units 10 --seed 7      # replaces the configured tables
+
+The real data is ~195 countries x 11 years x 3 genders x 2 age groups. Here
+each country can be split into ``units`` subnational units (unit 0 is the
+country itself and keeps its name), the year range can be widened and extra
+age bands added. Output is deterministic for a seed and produced in chunks
+of about ``chunk_rows`` rows, so the full dataset is never held in memory.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from database import gho
+
+CHUNK_ROWS = 200000
+# Units generated from one seed; fixed so the output doesn't depend on chunk size.
+SEED_UNITS = 100
+
+# WHO member states per region; the countries the dashboard queries by name keep their names.
+REGION_SIZES = {
+    'Africa': 47,
+    'Americas': 35,
+    'South-East Asia': 11,
+    'Europe': 53,
+    'Eastern Mediterranean': 21,
+    'Western Pacific': 27,
+}
+NAMED = {'India': 'South-East Asia', 'Nigeria': 'Africa', 'Brazil': 'Americas', 'USA': 'Americas',
+         'China': 'Western Pacific'}
+# Regional and global aggregates carry no Region, as in the GHO data.
+AGGREGATES = ['Global'] + list(REGION_SIZES)
+
+GENDERS = list(gho.GENDERS.values())
+AGE_GROUPS = ['Adult', 'Child/Adolescent']
+
+# Typical adult prevalence (%) per region: obesity is BMI >= 30, malnutrition BMI < 18.5.
+PREVALENCE = {
+    'obesity': {'Africa': 10.0, 'Americas': 28.0, 'South-East Asia': 5.0, 'Europe': 23.0,
+                'Eastern Mediterranean': 21.0, 'Western Pacific': 7.0},
+    'malnutrition': {'Africa': 9.0, 'Americas': 2.5, 'South-East Asia': 14.0, 'Europe': 2.0,
+                     'Eastern Mediterranean': 7.0, 'Western Pacific': 5.0},
+}
+# Relative yearly change, female/male log ratio and child/adult ratio per table.
+TREND = {'obesity': 0.025, 'malnutrition': -0.02}
+FEMALE_EXCESS = {'obesity': 0.2, 'malnutrition': 0.1}
+CHILD_RATIO = {'obesity': 0.35, 'malnutrition': 0.9}
+
+PARQUET_SCHEMA = {
+    table: pa.schema([
+        ('Year', pa.int16()), ('Gender', pa.string()), ('Mean_Estimate', pa.float64()),
+        ('LowerBound', pa.float64()), ('UpperBound', pa.float64()), ('age_group', pa.string()),
+        ('Country', pa.string()), ('Region', pa.string()), ('CI_Width', pa.float64()),
+        (f'{table}_level', pa.string()),
+    ])
+    for table in gho.TABLE_COLUMNS
+}
+
+
+# ------------------------------
+# Entities
+# ------------------------------
+def countries():
+    """[(name, region)] for the WHO member states, the named ones first in their region."""
+    result = []
+    for region, size in REGION_SIZES.items():
+        named = [name for name, where in NAMED.items() if where == region]
+        result += [(name, region) for name in named]
+        result += [(f'{region} {i:02d}', region) for i in range(len(named) + 1, size + 1)]
+    return result
+
+
+def age_groups(count=len(AGE_GROUPS)):
+    """The two GHO age groups, then five-year adult bands as extra demographic splits."""
+    extra = [f'Adult {low}-{low + 4}' for low in range(20, 20 + 5 * max(count - len(AGE_GROUPS), 0), 5)]
+    return (AGE_GROUPS + extra)[:count]
+
+
+def _age_ratio(table, group, rng):
+    if group == 'Adult':
+        return 1.0
+    if group == 'Child/Adolescent':
+        return CHILD_RATIO[table]
+    return rng.uniform(0.6, 1.3)
+
+
+# ------------------------------
+# Rows
+# ------------------------------
+def entity_rows(table, names, region, baseline, years, groups, rng):
+    """Every (entity, year, gender, age group) row for entities sharing a region."""
+    n = len(names)
+    year = np.arange(years[0], years[1] + 1)
+    shape = (n, len(year), len(GENDERS), len(groups))
+    # Log-scale prevalence: entity level and trend, female excess, age ratio, yearly noise.
+    level = np.log(baseline) + rng.normal(0.0, 0.5, n)
+    trend = rng.normal(TREND[table], 0.015, n)
+    female = rng.normal(FEMALE_EXCESS[table], 0.25, n)
+    ages = np.log([_age_ratio(table, group, rng) for group in groups])
+    sex = np.array([0.0, -0.5, 0.5])  # Both, Male, Female
+    log_mean = (level[:, None, None, None]
+                + trend[:, None, None, None] * (year - 2016)[None, :, None, None]
+                + sex[None, None, :, None] * female[:, None, None, None]
+                + ages[None, None, None, :]
+                + rng.normal(0.0, 0.04, shape))
+    mean = np.clip(np.exp(log_mean), 0.1, 90.0)
+    # Uncertainty intervals: wider where surveys are sparse, wider for children,
+    # and skewed upwards because prevalence can't go below zero.
+    relative = np.exp(rng.normal(np.log(0.45), 0.6, n))[:, None, None, None] * np.where(
+        np.array(groups) == 'Adult', 1.0, 1.3)[None, None, None, :]
+    width = mean * relative * rng.uniform(0.85, 1.15, shape)
+    below = rng.uniform(0.35, 0.5, shape)
+    mean = mean.round(1)
+    lower = np.clip(mean - width * below, 0.0, None).round(1)
+    upper = np.minimum(mean + width * (1 - below), 100.0).round(1)
+
+    size = mean.size
+    frame = pd.DataFrame({
+        'Year': np.broadcast_to(year[None, :, None, None], shape).reshape(size),
+        'Gender': np.broadcast_to(np.array(GENDERS, dtype=object)[None, None, :, None], shape).reshape(size),
+        'Mean_Estimate': mean.reshape(size),
+        'LowerBound': lower.reshape(size),
+        'UpperBound': upper.reshape(size),
+        'age_group': np.broadcast_to(np.array(groups, dtype=object)[None, None, None, :], shape).reshape(size),
+        'Country': np.repeat(np.asarray(names, dtype=object), size // n),
+        'Region': region if region is None else np.full(size, region, dtype=object),
+        'CI_Width': (upper - lower).round(1).reshape(size),
+    })
+    frame[f'{table}_level'] = gho.level_labels(frame['Mean_Estimate'].to_numpy(), table)
+    return frame[gho.TABLE_COLUMNS[table]]
+
+
+def iter_entity_blocks(table, seed=0, units=1, years=gho.YEARS, groups=None):
+    """Rows in blocks of up to SEED_UNITS units of one country, each block seeded by (seed, table, country, block)."""
+    groups = groups or AGE_GROUPS
+    table_id = list(gho.TABLE_COLUMNS).index(table)
+    prevalence = PREVALENCE[table]
+
+    rng = np.random.default_rng([seed, table_id, 0])
+    aggregate_baseline = [np.median(list(prevalence.values()))] + [prevalence[region] for region in REGION_SIZES]
+    yield entity_rows(table, AGGREGATES, None, np.array(aggregate_baseline), years, groups, rng)
+    for index, (country, region) in enumerate(countries(), start=1):
+        for start in range(0, units, SEED_UNITS):
+            rng = np.random.default_rng([seed, table_id, index, start // SEED_UNITS])
+            names = [country if unit == 0 else f'{country} / unit {unit}'
+                     for unit in range(start, min(start + SEED_UNITS, units))]
+            yield entity_rows(table, names, region, prevalence[region], years, groups, rng)
+
+
+def iter_frames(table, seed=0, units=1, years=gho.YEARS, groups=None, chunk_rows=CHUNK_ROWS):
+    """Yield the rows of ``table`` as DataFrames of about ``chunk_rows`` rows.
+
+    The rows are the same whatever the chunk size: blocks are seeded
+    independently and only regrouped here.
+    """
+    pending, size = [], 0
+    for block in iter_entity_blocks(table, seed, units, years, groups):
+        for start in range(0, len(block), chunk_rows):
+            part = block.iloc[start:start + chunk_rows]
+            pending.append(part)
+            size += len(part)
+            if size >= chunk_rows:
+                yield pd.concat(pending, ignore_index=True)
+                pending, size = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def row_count(units=1, years=gho.YEARS, groups=None):
+    per_entity = (years[1] - years[0] + 1) * len(GENDERS) * len(groups or AGE_GROUPS)
+    return per_entity * (len(AGGREGATES) + len(countries()) * units)
+
+
+# ------------------------------
+# Writers
+# ------------------------------
+def write_csv(path, frames):
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for frame in frames:
+            frame.to_csv(f, index=False, header=rows == 0, lineterminator='\n')
+            rows += len(frame)
+    return rows
+
+
+def write_parquet(path, frames, table):
+    import pyarrow.parquet as pq
+
+    rows = 0
+    with pq.ParquetWriter(path, PARQUET_SCHEMA[table]) as writer:
+        for frame in frames:
+            writer.write_table(pa.Table.from_pandas(frame, schema=PARQUET_SCHEMA[table], preserve_index=False))
+            rows += len(frame)
+    return rows
+
+
+def write_mysql(conn, table, frames, method='executemany'):
+    """Replace ``table`` with ``frames``, committing per chunk to keep transactions small."""
+    from database.loader import WRITERS
+
+    write = WRITERS[method]
+    rows = 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DELETE FROM {table}")
+        conn.commit()
+        for frame in frames:
+            write(cursor, table, frame)
+            conn.commit()
+            rows += len(frame)
+    finally:
+        cursor.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--to', choices=['csv', 'parquet', 'mysql'], default='parquet')
+    parser.add_argument('--out', default='synthetic', help='output directory for csv/parquet')
+    parser.add_argument('--tables', nargs='+', choices=list(gho.TABLE_COLUMNS), default=list(gho.TABLE_COLUMNS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--units', type=int, default=1, help='subnational units per country (1 = countries only)')
+    parser.add_argument('--years', type=int, nargs=2, default=list(gho.YEARS), metavar=('FIRST', 'LAST'))
+    parser.add_argument('--age-groups', type=int, default=len(AGE_GROUPS),
+                        help='age groups per entity; beyond 2 adds five-year adult bands')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--method', choices=['executemany', 'infile'], default='executemany',
+                        help='bulk insert method for --to mysql')
+    args = parser.parse_args()
+
+    groups = age_groups(args.age_groups)
+    years = tuple(args.years)
+    print(f"{row_count(args.units, years, groups):,} rows per table")
+    conn = None
+    if args.to == 'mysql':
+        from database.cache import bump_data_version, create_data_version_table
+        from database.loader import load_connection
+
+        conn = load_connection(local_infile=args.method == 'infile')
+        create_data_version_table(conn)
+    else:
+        os.makedirs(args.out, exist_ok=True)
+    try:
+        for table in args.tables:
+            start = time.perf_counter()
+            frames = iter_frames(table, args.seed, args.units, years, groups, args.chunk_rows)
+            if args.to == 'mysql':
+                rows = write_mysql(conn, table, frames, args.method)
+                target = table
+            else:
+                target = os.path.join(args.out, f'{table}.{args.to}')
+                rows = write_csv(target, frames) if args.to == 'csv' else write_parquet(target, frames, table)
+            elapsed = time.perf_counter() - start
+            print(f"{table:<14} {rows:>12,} rows -> {target} in {elapsed:.1f}s")
+        if conn is not None:
+            from database import materialize
+
+            bump_data_version(conn)
+            conn.commit()
+            materialize.ensure_fresh(conn)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Time limits and cancellation for queries in flight.
+
+A backend wraps each query in ``guard``, passing a function that
+interrupts it: KILL QUERY on MySQL, ``interrupt()`` on DuckDB. One daemon
+thread calls that function when the query passes its deadline or its
+cancel event is set. The blocked call then fails at once in the thread
+that issued it, and ``guard`` turns the failure into QueryTimeoutError or
+QueryCancelledError.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+CHECK_INTERVAL = 0.1        # seconds between looks at cancel events
+
+
+class QueryTimeoutError(RuntimeError):
+    pass
+
+
+class QueryCancelledError(RuntimeError):
+    pass
+
+
+class _Guard:
+    __slots__ = ('interrupt', 'timeout', 'deadline', 'cancel', 'reason', 'active', 'lock')
+
+    def __init__(self, interrupt, timeout, cancel):
+        self.interrupt = interrupt
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancel = cancel
+        self.reason = None          # 'timeout' or 'cancelled' once the watchdog fires
+        self.active = True
+        self.lock = threading.Lock()
+
+
+def timeout_error(timeout):
+    return QueryTimeoutError(f"The database didn't answer within {timeout:g}s.")
+
+
+def cancelled_error():
+    return QueryCancelledError("Query cancelled: a newer run of the page replaced it.")
+
+
+class Watchdog:
+    def __init__(self, interval=CHECK_INTERVAL):
+        self.interval = interval
+        self._guards = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats = {'timeouts': 0, 'cancelled': 0, 'interrupt_errors': 0}
+
+    @contextmanager
+    def guard(self, interrupt, timeout=None, cancel=None):
+        """Interrupt the body after ``timeout`` seconds or once ``cancel`` (a threading.Event) is set."""
+        if not timeout and cancel is None:
+            yield
+            return
+        if cancel is not None and cancel.is_set():
+            raise cancelled_error()
+        guard = _Guard(interrupt, timeout, cancel)
+        with self._cond:
+            self._guards.add(guard)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='query-watchdog', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        try:
+            yield
+        except Exception as e:
+            self._finish(guard)
+            if guard.reason == 'timeout':
+                raise timeout_error(timeout) from e
+            if guard.reason == 'cancelled':
+                raise cancelled_error() from e
+            raise
+        # A query that finished while being interrupted still has a good result.
+        self._finish(guard)
+
+    def _finish(self, guard):
+        # Waits for an interrupt in progress, so it can't land on the connection's next query.
+        with guard.lock:
+            guard.active = False
+        with self._cond:
+            self._guards.discard(guard)
+
+    def _due(self):
+        """Guards to fire now, and how long to sleep otherwise."""
+        now = time.monotonic()
+        due, waits = [], []
+        for guard in self._guards:
+            if guard.reason is not None:
+                continue
+            if guard.cancel is not None and guard.cancel.is_set():
+                guard.reason = 'cancelled'
+            elif guard.deadline is not None and now >= guard.deadline:
+                guard.reason = 'timeout'
+            if guard.reason is not None:
+                due.append(guard)
+                continue
+            if guard.cancel is not None:
+                waits.append(self.interval)
+            if guard.deadline is not None:
+                waits.append(guard.deadline - now)
+        return due, min(waits) if waits else None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                due, wait = self._due()
+                if not due:
+                    self._cond.wait(wait)
+                    continue
+            for guard in due:
+                self._fire(guard)
+
+    def _fire(self, guard):
+        with guard.lock:
+            if not guard.active:
+                return
+            try:
+                guard.interrupt()
+            except Exception:
+                with self._cond:
+                    self._stats['interrupt_errors'] += 1
+        with self._cond:
+            self._stats['timeouts' if guard.reason == 'timeout' else 'cancelled'] += 1
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, running=len(self._guards))
+
+
+_watchdog = Watchdog()
+
+
+def guard(interrupt, timeout=None, cancel=None):
+    return _watchdog.guard(interrupt, timeout, cancel)
+
+
+def watchdog_stats():
+    return _watchdog.stats()
@@ -1,25 +1,12 @@
 import streamlit as st
 
+from ui.layout import page_header
+
 # ----------------------------
 # Home Page Content
 # ----------------------------
-# Read the image as bytes
-with open("assets/who_logo.png", "rb") as f:
-    logo_bytes = f.read()
-
-# Convert to base64 string (safe for HTML)
-import base64
-logo_b64 = base64.b64encode(logo_bytes).decode()
-
 # Display logo + title in one line
-st.markdown(f"""
-    <div style="display: flex; align-items: flex-start; gap: 22px;">
-        <img src="data:image/png;base64,{logo_b64}" width="70" style="margin-top: -50px;" />
-        <h1 style="font-size: 36px; margin: 0; margin-top: -50px; line-height: 0.5;">
-            Nutrition Paradox: A Global View on Obesity and Malnutrition
-        </h1>
-    </div>
-""", unsafe_allow_html=True)
+page_header("Nutrition Paradox: A Global View on Obesity and Malnutrition")
 
 st.markdown("---")
     
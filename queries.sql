@@ -1,287 +1,389 @@
--- obesity queries 
+-- Every dashboard query, keyed by `-- name:`. pages/queries.py loads this file
+-- through database/catalog.py, so edit queries here rather than inline.
+--
+-- Values the dashboard lets users pick are declared after the description as
+--   -- param: <name> <type> = <default>
+-- and referenced as %(name)s. Types are year, country, region and number;
+-- a trailing [] takes a comma-separated list, for use with IN (%(name)s).
+--
+-- Queries that can be browsed in full, past their LIMIT, declare
+--   -- keyset: <column> [DESC], ..., <unique tie-breaker>
+-- with output columns that order the rows uniquely.
+--
+-- Queries get DB_QUERY_TIMEOUT seconds unless they declare their own limit:
+--   -- timeout: <seconds>
+-- The full-table aggregates below take longer; their result is cached for
+-- every session once it arrives, so it's worth waiting for.
+
+-- ------------------------------------------------------------
+-- obesity queries
+-- ------------------------------------------------------------
+
+-- name: obesity_1
 -- 1. Top 5 regions with the highest average obesity levels in the most recent year(2022)
+-- param: year year = 2022
 SELECT Region, AVG(Mean_Estimate) AS Avg_Obesity
 FROM obesity
-WHERE Year = 2022 AND Region IS NOT NULL
+WHERE Year = %(year)s AND Region IS NOT NULL
 GROUP BY Region
 ORDER BY Avg_Obesity DESC
 LIMIT 5;
+
+-- name: obesity_2
 -- 2. Top 5 countries with highest obesity estimates
+-- param: year year = 2022
+-- keyset: Mean_Estimate DESC, Country
 SELECT Country, Mean_Estimate
 FROM obesity
-WHERE Year = 2022 AND Gender = 'Both' AND age_group = 'Adult' AND Region IS NOT NULL
+WHERE Year = %(year)s
+AND Gender = 'Both'
+AND age_group = 'Adult'
+AND Region IS NOT NULL
 ORDER BY Mean_Estimate DESC
 LIMIT 5;
+
+-- name: obesity_3
 -- 3. Obesity trend in India over the years(Mean_estimate)
+-- param: country country = India
+-- keyset: Year
 SELECT Year, Mean_Estimate
 FROM obesity
-WHERE Country = 'India' AND Gender = 'Both' AND age_group = 'Adult'
-ORDER BY Year; 
+WHERE Country = %(country)s AND Gender = 'Both' AND age_group = 'Adult'
+ORDER BY Year;
+
+-- name: obesity_4
 -- 4. Average obesity by gender
 SELECT Gender, AVG(Mean_Estimate) AS Avg_Obesity
 FROM obesity
 WHERE Region IS NOT NULL
 GROUP BY Gender
 ORDER BY Avg_Obesity DESC;
+
+-- name: obesity_5
 -- 5. Country count by obesity level category and age group
-SELECT obesity_level, age_group, COUNT(DISTINCT Country) as Country_Count
+-- timeout: 90
+SELECT
+    obesity_level,
+    age_group,
+    COUNT(DISTINCT Country) as Country_Count
 FROM obesity
 WHERE Region IS NOT NULL
 GROUP BY obesity_level, age_group
 ORDER BY age_group, obesity_level;
--- 6. Top 5 countries least reliable countries(with highest CI_Width) and Top 5 most consistent countries (smallest average CI_Width)
+
+-- name: obesity_6a
+-- 6a. Top 5 least reliable countries (with highest CI_Width)
+-- param: year year = 2022
+-- keyset: CI_Width DESC, Country
 SELECT Country, CI_Width, Mean_Estimate
 FROM obesity
-WHERE Year = 2022 AND Gender = 'Both' AND age_group = 'Adult' AND Region IS NOT NULL
+WHERE Year = %(year)s
+AND Gender = 'Both'
+AND age_group = 'Adult'
+AND Region IS NOT NULL
 ORDER BY CI_Width DESC
 LIMIT 5;
-                        
+
+-- name: obesity_6b
+-- 6b. Top 5 most consistent countries (smallest average CI_Width)
 SELECT Country, AVG(CI_Width) as Avg_CI_Width
 FROM obesity
-WHERE Gender = 'Both' AND age_group = 'Adult'AND Region IS NOT NULL
+WHERE Gender = 'Both'
+AND age_group = 'Adult'
+AND Region IS NOT NULL
 GROUP BY Country
 ORDER BY Avg_CI_Width ASC
 LIMIT 5;
+
+-- name: obesity_7
 -- 7. Average obesity by age group
-SELECT age_group, AVG(Mean_Estimate) as Avg_Obesity
+-- timeout: 90
+SELECT
+    age_group,
+    AVG(Mean_Estimate) as Avg_Obesity
 FROM obesity
 WHERE Region IS NOT NULL
 GROUP BY age_group
 ORDER BY Avg_Obesity DESC;
+
+-- name: obesity_8
 -- 8. Top 10 Countries with consistent low obesity (low average + low CI)over the years
-SELECT 
-                        Country,
-                        AVG(Mean_Estimate) as Avg_Obesity,
-                        AVG(CI_Width) as Avg_CI_Width
-                    FROM obesity
-                    WHERE Region IS NOT NULL
-                    AND Gender = 'Both'
-                    AND age_group = 'Adult'
-                    GROUP BY Country
-                    HAVING Avg_Obesity < 5.0  -- Low average
-                    AND Avg_CI_Width < 1.0  -- Low variability
-                    ORDER BY Avg_Obesity ASC, Avg_CI_Width ASC
-                    LIMIT 10;
--- 9. Countries where female obesity exceeds male by large margin (same       year)
-SELECT 
-                        Country,
-                        Year,
-                        MAX(CASE WHEN Gender = 'Female' THEN Mean_Estimate END) as Female_Obesity,
-                        MAX(CASE WHEN Gender = 'Male' THEN Mean_Estimate END) as Male_Obesity,
-                        (MAX(CASE WHEN Gender = 'Female' THEN Mean_Estimate END) - 
-                        MAX(CASE WHEN Gender = 'Male' THEN Mean_Estimate END)) as Difference
-                    FROM obesity
-                    WHERE Region IS NOT NULL
-                    AND Gender IN ('Female', 'Male')
-                    AND age_group = 'Adult'
-                    GROUP BY Country, Year
-                    HAVING Difference > 5.0  -- Large margin
-                    ORDER BY Difference DESC
-                    LIMIT 10;
+-- param: max_obesity number = 5.0
+-- param: max_ci_width number = 1.0
+SELECT
+    Country,
+    AVG(Mean_Estimate) as Avg_Obesity,
+    AVG(CI_Width) as Avg_CI_Width
+FROM obesity
+WHERE Region IS NOT NULL
+AND Gender = 'Both'
+AND age_group = 'Adult'
+GROUP BY Country
+HAVING Avg_Obesity < %(max_obesity)s  -- Low average
+AND Avg_CI_Width < %(max_ci_width)s  -- Low variability
+ORDER BY Avg_Obesity ASC, Avg_CI_Width ASC
+LIMIT 10;
+
+-- name: obesity_9
+-- 9. Countries where female obesity exceeds male by large margin (same year)
+-- param: min_difference number = 5.0
+-- timeout: 90
+SELECT
+    Country,
+    Year,
+    MAX(CASE WHEN Gender = 'Female' THEN Mean_Estimate END) as Female_Obesity,
+    MAX(CASE WHEN Gender = 'Male' THEN Mean_Estimate END) as Male_Obesity,
+    (MAX(CASE WHEN Gender = 'Female' THEN Mean_Estimate END) -
+    MAX(CASE WHEN Gender = 'Male' THEN Mean_Estimate END)) as Difference
+FROM obesity
+WHERE Region IS NOT NULL
+AND Gender IN ('Female', 'Male')
+AND age_group = 'Adult'
+GROUP BY Country, Year
+HAVING Difference > %(min_difference)s  -- Large margin
+ORDER BY Difference DESC
+LIMIT 10;
+
+-- name: obesity_10
 -- 10. Global average obesity percentage per year
-SELECT 
-                        Year,
-                        AVG(Mean_Estimate) as Avg_Obesity
-                    FROM obesity
-                    WHERE Country = 'Global'
-                    AND Gender = 'Both'
-                    AND age_group = 'Adult'
-                    GROUP BY Year
-                    ORDER BY Year;
+SELECT
+    Year,
+    AVG(Mean_Estimate) as Avg_Obesity
+FROM obesity
+WHERE Country = 'Global'
+AND Gender = 'Both'
+AND age_group = 'Adult'
+GROUP BY Year
+ORDER BY Year;
 
-----------------------------------------------------------------
+-- ------------------------------------------------------------
 -- malnutrition queries
+-- ------------------------------------------------------------
+
+-- name: malnutrition_1
 -- 1. average malnutrition by age group
+-- timeout: 90
 SELECT age_group, AVG(Mean_Estimate) as Avg_Malnutrition
 FROM malnutrition
 WHERE Region IS NOT NULL
 GROUP BY age_group
 ORDER BY Avg_Malnutrition DESC;
 
+-- name: malnutrition_2
 -- 2. Top 5 countries with highest malnutrition (mean_estimate)
+-- param: year year = 2022
+-- keyset: Mean_Estimate DESC, Country
 SELECT Country, Mean_Estimate
 FROM malnutrition
-WHERE Year = 2022
-AND Gender = 'Both'
-AND age_group = 'Adult'
-AND Region IS NOT NULL
+WHERE Year = %(year)s
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
+  AND Region IS NOT NULL
 ORDER BY Mean_Estimate DESC
 LIMIT 5;
-				
+
+-- name: malnutrition_3
 -- 3. Malnutrition trend in African region over the years
-SELECT Year, AVG(Mean_Estimate) as Avg_Malnutrition
+-- param: region region = Africa
+SELECT
+    Year,
+    AVG(Mean_Estimate) as Avg_Malnutrition
 FROM malnutrition
-WHERE Region = 'Africa'
-AND Gender = 'Both'
-AND age_group = 'Adult' 
+WHERE Region = %(region)s
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
 GROUP BY Year
 ORDER BY Year;
 
+-- name: malnutrition_4
 -- 4. Gender-based average malnutrition
-SELECT Gender, AVG(Mean_Estimate) as Avg_Malnutrition
+SELECT
+    Gender,
+    AVG(Mean_Estimate) as Avg_Malnutrition
 FROM malnutrition
 WHERE Region IS NOT NULL
 GROUP BY Gender
 ORDER BY Avg_Malnutrition DESC;
 
+-- name: malnutrition_5
 -- 5. Malnutrition level-wise (average CI_Width by age group)
-SELECT malnutrition_level, age_group, AVG(CI_Width) as Avg_CI_Width
+SELECT
+    malnutrition_level,
+    age_group,
+    AVG(CI_Width) as Avg_CI_Width
 FROM malnutrition
 WHERE Region IS NOT NULL
 GROUP BY malnutrition_level, age_group
 ORDER BY age_group, malnutrition_level;
+
+-- name: malnutrition_6
 -- 6. Yearly malnutrition change in specific countries(India, Nigeria, Brazil)
-SELECT Country, Year, Mean_Estimate as Malnutrition
+-- param: countries country[] = India, Nigeria, Brazil
+-- keyset: Country, Year
+SELECT
+    Country,
+    Year,
+    Mean_Estimate as Malnutrition
 FROM malnutrition
-WHERE Country IN ('India', 'Nigeria', 'Brazil') AND Gender = 'Both' AND age_group = 'Adult'
+WHERE Country IN (%(countries)s)
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
 ORDER BY Country, Year;
 
+-- name: malnutrition_7
 -- 7. Regions with lowest malnutrition averages
-SELECT Region, AVG(Mean_Estimate) as Avg_Malnutrition
+SELECT
+    Region,
+    AVG(Mean_Estimate) as Avg_Malnutrition
 FROM malnutrition
-WHERE Region IS NOT NULL AND Gender = 'Both' AND age_group = 'Adult'
+WHERE Region IS NOT NULL
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
 GROUP BY Region
 ORDER BY Avg_Malnutrition ASC
 LIMIT 5;
 
--- 8. Countries with increasing malnutrition (💡 Hint: Use MIN() and MAX()   on Mean_Estimate per country to compare early vs. recent malnutrition levels, and filter where the difference is positive using HAVING.)
-SELECT Country, 
-	MIN(Year) as First_Year, MAX(Year) as Last_Year, 
+-- name: malnutrition_8
+-- 8. Countries with increasing malnutrition (MIN() and MAX() on Mean_Estimate per country, positive difference via HAVING)
+SELECT
+    Country,
+    MIN(Year) as First_Year,
+    MAX(Year) as Last_Year,
     MIN(Mean_Estimate) as Min_Malnutrition,
-	MAX(Mean_Estimate) as Max_Malnutrition,
-	(MAX(Mean_Estimate) - MIN(Mean_Estimate)) as Increase
+    MAX(Mean_Estimate) as Max_Malnutrition,
+    (MAX(Mean_Estimate) - MIN(Mean_Estimate)) as Increase
 FROM malnutrition
-WHERE Region IS NOT NULL AND Gender = 'Both' AND age_group = 'Adult'
+WHERE Region IS NOT NULL
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
 GROUP BY Country
 HAVING Increase > 0  -- Increasing trend
 ORDER BY Increase DESC
 LIMIT 10;
 
--- 9.   Min/Max malnutrition levels year-wise comparison
-SELECT Year, MIN(Mean_Estimate) as Min_Malnutrition, MAX(Mean_Estimate) as Max_Malnutrition
+-- name: malnutrition_9
+-- 9. Min/Max malnutrition levels year-wise comparison
+SELECT
+    Year,
+    MIN(Mean_Estimate) as Min_Malnutrition,
+    MAX(Mean_Estimate) as Max_Malnutrition
 FROM malnutrition
-WHERE Region IS NOT NULL AND Gender = 'Both' AND age_group = 'Adult'
+WHERE Region IS NOT NULL
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
 GROUP BY Year
 ORDER BY Year;
 
--- 10.  High CI_Width flags for monitoring(CI_width > 5)
-SELECT Country, Year, Mean_Estimate as Malnutrition, CI_Width 
+-- name: malnutrition_10
+-- 10. High CI_Width flags for monitoring(CI_width > 5)
+-- param: min_ci_width number = 5.0
+SELECT
+    Country,
+    MAX(Year) as Year,
+    AVG(Mean_Estimate) as Malnutrition,
+    MAX(CI_Width) as CI_Width
 FROM malnutrition
-WHERE Region IS NOT NULL AND Gender = 'Both' AND age_group = 'Adult' AND CI_Width > 5.0
+WHERE Region IS NOT NULL
+AND Gender = 'Both'
+AND age_group = 'Adult'
+AND CI_Width > %(min_ci_width)s
+GROUP BY Country
 ORDER BY CI_Width DESC
 LIMIT 10;
 
--- -- -- -- -- -- -- --
+-- ------------------------------------------------------------
 -- Combined obesity and malnutrition queries
--- 1. Obesity vs malnutrition comparison by country (any 5 countries)
+-- (served from nutrition_combined, see database/materialize.py)
+-- ------------------------------------------------------------
 
-SELECT 
-                        o.Country,
-                        o.Mean_Estimate as Obesity,
-                        m.Mean_Estimate as Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Year = 2022
-                      AND o.Gender = 'Both'
-                      AND o.age_group = 'Adult'
-                      AND o.Country IN ('India', 'Nigeria', 'Brazil', 'USA', 'China')
-                    ORDER BY o.Country;
+-- name: combined_1
+-- 1. Obesity vs malnutrition comparison by country (any 5 countries)
+-- param: year year = 2022
+-- param: countries country[] = India, Nigeria, Brazil, USA, China
+-- keyset: Country
+SELECT
+    Country,
+    obesity_estimate as Obesity,
+    malnutrition_estimate as Malnutrition
+FROM nutrition_combined
+WHERE Year = %(year)s
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
+  AND Country IN (%(countries)s)
+ORDER BY Country;
 
+-- name: combined_2
 -- 2. Gender-based disparity in both obesity and malnutrition
-SELECT 
-                        o.Gender,
-                        AVG(o.Mean_Estimate) as Avg_Obesity,
-                        AVG(m.Mean_Estimate) as Avg_Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Year = 2022
-                      AND o.Gender IN ('Male', 'Female')
-                      AND o.age_group = 'Adult'
-                      AND o.Region IS NOT NULL  -- ✅ Safety: Only real countries
-                      AND m.Region IS NOT NULL  -- ✅ Safety: Only real countries
-                    GROUP BY o.Gender
-                    ORDER BY o.Gender;
+-- param: year year = 2022
+SELECT
+    Gender,
+    AVG(obesity_estimate) as Avg_Obesity,
+    AVG(malnutrition_estimate) as Avg_Malnutrition
+FROM nutrition_combined
+WHERE Year = %(year)s
+  AND Gender IN ('Male', 'Female')
+  AND age_group = 'Adult'
+  AND obesity_region IS NOT NULL  -- ✅ Safety: Only real countries
+  AND malnutrition_region IS NOT NULL  -- ✅ Safety: Only real countries
+GROUP BY Gender
+ORDER BY Gender;
 
+-- name: combined_3
 -- 3. Region-wise avg estimates side-by-side (Africa and America)
+-- param: region region = Africa
+-- param: other_region region = Americas
+SELECT
+    %(region)s as Region,
+    AVG(obesity_estimate) as Avg_Obesity,
+    AVG(malnutrition_estimate) as Avg_Malnutrition
+FROM nutrition_combined
+WHERE obesity_region = %(region)s
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
+  AND malnutrition_region IS NOT NULL
 
-SELECT 
-                        'Africa' as Region,
-                        AVG(o.Mean_Estimate) as Avg_Obesity,
-                        AVG(m.Mean_Estimate) as Avg_Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Region = 'Africa'
-                      AND o.Gender = 'Both'
-                      AND o.age_group = 'Adult'
-                      AND o.Region IS NOT NULL
-                      AND m.Region IS NOT NULL
-                    
-                    UNION ALL
-                    
-                    SELECT 
-                        'Americas' as Region,
-                        AVG(o.Mean_Estimate) as Avg_Obesity,
-                        AVG(m.Mean_Estimate) as Avg_Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Region = 'Americas'
-                      AND o.Gender = 'Both'
-                      AND o.age_group = 'Adult'
-                      AND o.Region IS NOT NULL
-                      AND m.Region IS NOT NULL;
+UNION ALL
 
+SELECT
+    %(other_region)s as Region,
+    AVG(obesity_estimate) as Avg_Obesity,
+    AVG(malnutrition_estimate) as Avg_Malnutrition
+FROM nutrition_combined
+WHERE obesity_region = %(other_region)s
+  AND Gender = 'Both'
+  AND age_group = 'Adult'
+  AND malnutrition_region IS NOT NULL;
+
+-- name: combined_4
 -- 4. Countries with obesity up & malnutrition down
-SELECT 
-                        o.Country,
-                        AVG(o.Mean_Estimate) as Avg_Obesity,
-                        AVG(m.Mean_Estimate) as Avg_Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Gender = 'Both'
-                      AND o.age_group = 'Adult'
-                      AND o.Region IS NOT NULL
-                      AND m.Region IS NOT NULL
-                    GROUP BY o.Country
-                    HAVING AVG(o.Mean_Estimate) > 15.0  -- High obesity
-                       AND AVG(m.Mean_Estimate) < 10.0  -- Low malnutrition
-                    ORDER BY Avg_Obesity DESC, Avg_Malnutrition ASC
-                    LIMIT 10;
+-- param: min_obesity number = 15.0
+-- param: max_malnutrition number = 10.0
+SELECT
+    Country,
+    AVG(obesity_estimate) as Avg_Obesity,
+    AVG(malnutrition_estimate) as Avg_Malnutrition
+FROM nutrition_combined
+WHERE Gender = 'Both'
+  AND age_group = 'Adult'
+  AND obesity_region IS NOT NULL
+  AND malnutrition_region IS NOT NULL
+GROUP BY Country
+HAVING AVG(obesity_estimate) > %(min_obesity)s  -- High obesity
+   AND AVG(malnutrition_estimate) < %(max_malnutrition)s  -- Low malnutrition
+ORDER BY Avg_Obesity DESC, Avg_Malnutrition ASC
+LIMIT 10;
 
+-- name: combined_5
 -- 5. Age-wise trend analysis
-SELECT 
-                        o.Year,
-                        o.age_group,
-                        AVG(o.Mean_Estimate) as Avg_Obesity,
-                        AVG(m.Mean_Estimate) as Avg_Malnutrition
-                    FROM obesity o
-                    JOIN malnutrition m 
-                      ON o.Country = m.Country 
-                     AND o.Year = m.Year 
-                     AND o.Gender = m.Gender 
-                     AND o.age_group = m.age_group
-                    WHERE o.Gender = 'Both'
-                      AND o.age_group IN ('Adult', 'Child/Adolescent')
-                      AND o.Region IS NOT NULL
-                      AND m.Region IS NOT NULL
-                    GROUP BY o.Year, o.age_group
-                    ORDER BY o.Year, o.age_group;
\ No newline at end of file
+SELECT
+    Year,
+    age_group,
+    AVG(obesity_estimate) as Avg_Obesity,
+    AVG(malnutrition_estimate) as Avg_Malnutrition
+FROM nutrition_combined
+WHERE Gender = 'Both'
+  AND age_group IN ('Adult', 'Child/Adolescent')
+  AND obesity_region IS NOT NULL
+  AND malnutrition_region IS NOT NULL
+GROUP BY Year, age_group
+ORDER BY Year, age_group;
@@ -0,0 +1,82 @@
+"""Sidebar panel with the latest query and chart timings, for developers.
+
+Enabled with DEV_PANEL=1. Spans are process-wide, so with several sessions
+open the panel also shows the other sessions' queries. Once the database
+stack is loaded, a second table lists the memory held by each cached result,
+and with DB_REPLICAS set a third shows the health and latency of each host.
+"""
+import os
+import sys
+
+import streamlit as st
+
+from database import metrics
+
+DEV_PANEL = os.getenv('DEV_PANEL', '0') == '1'
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _row(span):
+    if span['kind'] == 'render':
+        return {'query': span['query_id'], 'step': f"chart ({span['chart']})", 'rows': None,
+                'KB': round(span['bytes'] / 1024, 1), 'db ms': None, 'frame ms': None,
+                'render ms': _ms(span['render_seconds']), 'total ms': _ms(span['render_seconds'])}
+    return {'query': span['query_id'], 'step': 'error' if span.get('error') else span['source'],
+            'rows': span['rows'], 'KB': round(span['bytes'] / 1024, 1), 'db ms': _ms(span['db_seconds']),
+            'frame ms': _ms(span['frame_seconds']), 'render ms': None, 'total ms': _ms(span['total_seconds'])}
+
+
+def _cache_row(entry):
+    saved = 1 - entry['bytes'] / entry['plain_bytes'] if entry['plain_bytes'] else 0.0
+    return {'query': entry['query'], 'params': ', '.join(map(str, entry['params'] or ())), 'rows': entry['rows'],
+            'KB': round(entry['bytes'] / 1024, 1), 'plain KB': round(entry['plain_bytes'] / 1024, 1),
+            'saved %': round(100 * saved), 'age s': round(entry['age_seconds']), 'stale': entry['stale']}
+
+
+def _cache_panel():
+    # Only once a query has loaded the database stack: the panel mustn't pull it in.
+    db = sys.modules.get('database.db')
+    if db is None:
+        return
+    with st.sidebar.expander("🧮 Cached results"):
+        report = db.cache_report()
+        if not report:
+            st.caption("Nothing cached yet.")
+            return
+        held = sum(entry['bytes'] for entry in report)
+        plain = sum(entry['plain_bytes'] for entry in report)
+        st.caption(f"{len(report)} results, {held / 1024 ** 2:.2f} MB held "
+                   f"({plain / 1024 ** 2:.2f} MB with plain dtypes), budget {db.CACHE_MAX_BYTES / 1024 ** 2:.0f} MB")
+        st.dataframe([_cache_row(entry) for entry in report], hide_index=True, width='stretch')
+
+
+def _host_row(host):
+    return {'host': host['host'], 'role': host['role'],
+            'state': 'serving' if host['serving'] else 'up' if host['up'] else 'down',
+            'lag s': host['lag_seconds'], 'queries': host['queries'], 'errors': host['errors'],
+            'running': host['in_flight'], 'recent ms': host['latency_ms'] and round(host['latency_ms'], 1),
+            'avg ms': host['latency_avg_ms'] and round(host['latency_avg_ms'], 1)}
+
+
+def _hosts_panel():
+    db = sys.modules.get('database.db')
+    if db is None or not db.REPLICAS:
+        return
+    with st.sidebar.expander("🗄️ Database hosts"):
+        st.dataframe([_host_row(host) for host in db.replica_stats()], hide_index=True, width='stretch')
+
+
+def dev_panel(limit=20):
+    if not DEV_PANEL:
+        return
+    _hosts_panel()
+    _cache_panel()
+    with st.sidebar.expander("⏱️ Latest timings", expanded=True):
+        spans = metrics.recent_spans(limit)
+        if not spans:
+            st.caption("No queries yet.")
+            return
+        st.dataframe([_row(span) for span in spans], hide_index=True, width='stretch')
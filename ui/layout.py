@@ -0,0 +1,56 @@
+"""Page chrome shared by app.py and the pages.
+
+Streamlit re-executes the page script on every interaction, so anything
+built here is built once per process and reused by every rerun and every
+session. This module imports only streamlit and the standard library;
+pandas, matplotlib and the database stack load when a query first runs.
+"""
+import base64
+import functools
+import os
+
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGO_PATH = os.path.join(ROOT, 'assets', 'who_logo.png')
+
+# WHO-style font and heading colours for every page.
+GLOBAL_CSS = """
+    <style>
+    body {
+        font-family: Frutiger Bold Condensed, 'Segoe UI',  Tahoma, Geneva, Verdana, sans-serif;
+        color: #0072BB ;
+    }
+    h1, h2, h3 {
+        color: #009EDB  !important;
+    }
+    </style>
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def asset_b64(path):
+    """Base64 of a file, read and encoded once per process."""
+    with open(path, 'rb') as f:
+        return base64.b64encode(f.read()).decode()
+
+
+@functools.lru_cache(maxsize=None)
+def header_html(title):
+    return f"""
+    <div style="display: flex; align-items: flex-start; gap: 22px;">
+        <img src="data:image/png;base64,{asset_b64(LOGO_PATH)}" width="70" style="margin-top: -50px;" />
+        <h1 style="font-size: 36px; margin: 0; margin-top: -50px; line-height: 0.5;">
+            {title}
+        </h1>
+    </div>
+"""
+
+
+def page_header(title):
+    """Logo + title in one line."""
+    st.markdown(header_html(title), unsafe_allow_html=True)
+
+
+def global_css():
+    st.markdown(GLOBAL_CSS, unsafe_allow_html=True)